@@ -0,0 +1,82 @@
+"""
+Round-trip latency of a single-file lint through the daemon, compared with
+starting a fresh CLI process for the same file.
+
+Usage: python benchmarks/bench_daemon.py [--requests N] [FILE]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pandas_lint.daemon import DaemonUnavailable, lint_via_daemon, send_request  # noqa: E402
+
+CLI = [sys.executable, "-c", "from pandas_lint.cli import main; main()"]
+
+
+def wait_for(socket_path, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            send_request({"op": "ping"}, socket_path)
+            return
+        except DaemonUnavailable:
+            time.sleep(0.05)
+    raise SystemExit("daemon did not start")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("file", nargs="?", default=os.path.join(ROOT, "tests", "bad_code.py"))
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pl-") as tmp:
+        socket_path = os.path.join(tmp, "bench.sock")
+        server = subprocess.Popen(CLI + ["daemon", "--socket", socket_path, "--jobs", "1"], cwd=ROOT)
+        try:
+            wait_for(socket_path)
+            lint_via_daemon([args.file], socket_path)  # warm the per-file result cache
+
+            warm = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                lint_via_daemon([args.file], socket_path)
+                warm.append((time.perf_counter() - start) * 1000)
+
+            cold = []
+            for _ in range(max(3, args.requests // 10)):
+                os.utime(args.file)  # force re-analysis
+                start = time.perf_counter()
+                lint_via_daemon([args.file], socket_path)
+                cold.append((time.perf_counter() - start) * 1000)
+        finally:
+            send_request({"op": "shutdown"}, socket_path)
+            server.wait(timeout=10)
+
+        cli = []
+        for _ in range(3):
+            start = time.perf_counter()
+            subprocess.run(CLI + [args.file, "--no-cache"], cwd=ROOT, stdout=subprocess.DEVNULL)
+            cli.append((time.perf_counter() - start) * 1000)
+
+    print(f"File: {args.file}")
+    print(f"{'mode':28}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    print(f"{'daemon, unchanged file':28}{statistics.median(warm):>10.2f}{percentile(warm, 0.95):>10.2f}")
+    print(f"{'daemon, modified file':28}{statistics.median(cold):>10.2f}{percentile(cold, 0.95):>10.2f}")
+    print(f"{'fresh CLI process':28}{statistics.median(cli):>10.2f}{percentile(cli, 0.95):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
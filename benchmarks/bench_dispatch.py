@@ -0,0 +1,99 @@
+"""
+Compares the legacy "every rule on every node" loop with the indexed
+dispatch table used by PandasVisitor.
+
+Usage: python benchmarks/bench_dispatch.py [--lines N] [--repeat N]
+"""
+import argparse
+import ast
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pandas_lint.analyzer import PandasVisitor  # noqa: E402
+from pandas_lint.rules import RuleRegistry  # noqa: E402
+
+TEMPLATE = """\
+def step_{i}(df, logger):
+    logger.info("step {i}")
+    total = len(df) + sum(range({i}))
+    values = [str(v) for v in df.columns]
+    print(values, total)
+    df['c{i}'] = df['a'].apply(lambda x: x + {i})
+    return max(total, 0)
+"""
+
+
+class LegacyVisitor(PandasVisitor):
+    """The pre-dispatch behaviour: every rule is offered every node."""
+
+    def _run_rules(self, node):
+        for rule in self.rules:
+            if rule.code in self.ignored_codes:
+                continue
+            issue = rule.check(node, self.context)
+            if issue and issue.code not in self.ignored_codes:
+                self.issues.append(issue)
+
+
+def count_invocations(tree, visitor_cls):
+    counter = {'n': 0}
+    patched = []
+    for rule in RuleRegistry.get_all():
+        original = rule.check
+        patched.append(rule)
+
+        def counted(node, context, _original=original):
+            counter['n'] += 1
+            return _original(node, context)
+
+        rule.check = counted
+    try:
+        visitor = visitor_cls()
+        visitor.visit(tree)
+    finally:
+        for rule in patched:
+            del rule.check
+    return counter['n'], len(visitor.issues)
+
+
+def time_visitor(tree, visitor_cls, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        visitor = visitor_cls()
+        visitor.visit(tree)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    source = "import pandas as pd\n" + "".join(
+        TEMPLATE.format(i=i) for i in range(args.lines // TEMPLATE.count("\n"))
+    )
+    tree = ast.parse(source)
+    nodes = sum(isinstance(n, (ast.Call, ast.For)) for n in ast.walk(tree))
+
+    legacy_calls, legacy_issues = count_invocations(tree, LegacyVisitor)
+    indexed_calls, indexed_issues = count_invocations(tree, PandasVisitor)
+    assert legacy_issues == indexed_issues, "dispatch changed the reported issues"
+
+    legacy_time = time_visitor(tree, LegacyVisitor, args.repeat)
+    indexed_time = time_visitor(tree, PandasVisitor, args.repeat)
+
+    print(f"Lines: {len(source.splitlines())}  Call/For nodes: {nodes}  Issues: {indexed_issues}")
+    print(f"{'':10}{'rule checks':>14}{'per node':>10}{'wall (ms)':>12}")
+    print(f"{'legacy':10}{legacy_calls:>14}{legacy_calls / nodes:>10.2f}{legacy_time * 1000:>12.1f}")
+    print(f"{'indexed':10}{indexed_calls:>14}{indexed_calls / nodes:>10.2f}{indexed_time * 1000:>12.1f}")
+    print(f"Speedup: {legacy_time / indexed_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
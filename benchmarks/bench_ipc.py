@@ -0,0 +1,63 @@
+"""
+Measures the pickled size of what a worker sends back per file: the old
+(path, issues, cell_mapping, file_content_lines) tuple against FileResult.
+
+Usage: python benchmarks/bench_ipc.py [PATH ...]
+Without paths, a synthetic module and notebook are generated.
+"""
+import json
+import os
+import pickle
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pandas_lint.engine import analyze_file  # noqa: E402
+from pandas_lint.notebook import parse_notebook  # noqa: E402
+
+
+def legacy_payload(file_path, result):
+    """Rebuilds the tuple analyze_file used to return, including every source line."""
+    issues = [tuple(issue)[:5] for issue in result.issues]
+    if file_path.endswith(".ipynb"):
+        content, cell_mapping = parse_notebook(file_path)
+    else:
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        cell_mapping = None
+    return file_path, issues, cell_mapping, content.splitlines()
+
+
+def synthetic_inputs(directory):
+    module = os.path.join(directory, "generated.py")
+    with open(module, "w") as f:
+        f.write("import pandas as pd\n")
+        for i in range(20000):
+            f.write(f"value_{i} = compute({i}, 'some moderately long argument string')\n")
+        f.write("df.iterrows()\n")
+
+    notebook = os.path.join(directory, "analysis.ipynb")
+    cells = [
+        {"cell_type": "code", "source": [f"x_{i} = {i}\n" for i in range(50)], "outputs": []}
+        for _ in range(200)
+    ]
+    cells.append({"cell_type": "code", "source": ["df.apply(lambda r: r)\n"], "outputs": []})
+    with open(notebook, "w") as f:
+        json.dump({"cells": cells}, f)
+    return [module, notebook]
+
+
+def main(paths):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = paths or synthetic_inputs(tmp)
+        print(f"{'file':40}{'before (B)':>14}{'after (B)':>12}{'ratio':>8}")
+        for file_path in paths:
+            result = analyze_file(file_path)
+            before = len(pickle.dumps(legacy_payload(file_path, result)))
+            after = len(pickle.dumps(result))
+            print(f"{os.path.basename(file_path):40}{before:>14}{after:>12}{before / after:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
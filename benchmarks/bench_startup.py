@@ -0,0 +1,68 @@
+"""
+Import-time cost of the CLI and of the modules a worker needs, measured
+with ``python -X importtime`` in fresh interpreters. Fails when the best
+of N runs exceeds the threshold or when a heavy optional dependency is
+imported eagerly.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--max-ms MS]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module -> packages it must not pull in at import time.
+TARGETS = {
+    "pandas_lint.cli": ("rich", "libcst", "pygments"),
+    "pandas_lint.engine": ("rich", "libcst", "pygments", "click"),
+}
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def import_profile(module):
+    """Runs ``import module`` in a fresh interpreter; returns {name: cumulative microseconds}."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True,
+    )
+    profile = {}
+    for line in completed.stderr.decode().splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            profile[match.group(4)] = int(match.group(2))
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=150.0,
+                        help="Fail when the best cumulative import time of a target exceeds this.")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':24}{'best (ms)':>10}{'worst (ms)':>11}")
+    for module, forbidden in TARGETS.items():
+        timings = []
+        for _ in range(args.runs):
+            profile = import_profile(module)
+            timings.append(profile[module] / 1000)
+            eager = sorted({name for name in profile if name.split(".")[0] in forbidden})
+            if eager:
+                print(f"{module} imports {', '.join(eager)} at startup")
+                failed = True
+        best = min(timings)
+        print(f"{module:24}{best:>10.1f}{max(timings):>11.1f}")
+        if best > args.max_ms:
+            print(f"{module}: {best:.1f} ms exceeds the {args.max_ms:.0f} ms threshold")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
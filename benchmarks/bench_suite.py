@@ -0,0 +1,178 @@
+"""
+End-to-end throughput of the CLI on a generated corpus (see corpus.py).
+
+Every scenario runs ``pandas-lint`` in a fresh process and reports wall
+time, files/sec, MB/sec and the peak RSS of the largest process in the
+tree (the CLI or one of its workers):
+
+- cold: the whole corpus with an empty result cache;
+- warm: the same run again, served from the cache;
+- fix: ``--fix`` over a copy of the small modules;
+- notebooks: the notebooks only, without cache;
+- single_file: median latency of linting one small module.
+
+Results can be written as JSON and compared with a baseline from the same
+machine; a scenario whose files/sec drops by more than the threshold fails
+the run.
+
+Usage:
+  python benchmarks/bench_suite.py [--scale small] [--output results.json]
+  python benchmarks/bench_suite.py --baseline benchmarks/baseline.json [--threshold 0.25]
+  python benchmarks/bench_suite.py --update-baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import SCALES, generate  # noqa: E402
+
+CLI = [sys.executable, "-c", "from pandas_lint.cli import main; main()"]
+
+
+def corpus_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+        for directory, _, names in os.walk(path):
+            files.extend(os.path.join(directory, n) for n in names if n.endswith((".py", ".ipynb")))
+    return files
+
+
+def run_cli(args, cwd):
+    """Runs the CLI once; returns (seconds, peak RSS in MB of the process tree)."""
+    start = time.perf_counter()
+    process = subprocess.Popen(CLI + args, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               env=dict(os.environ, PYTHONPATH=ROOT))
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    # os.waitstatus_to_exitcode needs Python 3.9.
+    process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    if process.returncode not in (0, 1):
+        raise SystemExit(f"pandas-lint {' '.join(args)} exited with {process.returncode}")
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return elapsed, usage.ru_maxrss / divisor
+
+
+def measure(name, paths, args, cwd, repeat=1):
+    files = corpus_files(paths)
+    size = sum(os.path.getsize(f) for f in files)
+    timings, peaks = [], []
+    for _ in range(repeat):
+        elapsed, peak = run_cli(paths + args, cwd)
+        timings.append(elapsed)
+        peaks.append(peak)
+    elapsed = statistics.median(timings)
+    return {
+        "scenario": name,
+        "files": len(files),
+        "megabytes": round(size / 1e6, 3),
+        "seconds": round(elapsed, 4),
+        "files_per_sec": round(len(files) / elapsed, 1),
+        "mb_per_sec": round(size / 1e6 / elapsed, 2),
+        "peak_rss_mb": round(max(peaks), 1),
+    }
+
+
+def run_scenarios(corpus, workdir, jobs, only):
+    cache_dir = os.path.join(workdir, "cache")
+    whole = [corpus[part] for part in ("small", "large", "deep", "notebooks")]
+    common = ["--jobs", str(jobs)] if jobs else []
+
+    fix_copy = os.path.join(workdir, "fix")
+    shutil.copytree(corpus["small"], fix_copy)
+    single = sorted(corpus_files([corpus["small"]]))[0]
+
+    scenarios = [
+        ("cold", whole, ["--cache-dir", cache_dir] + common, 1),
+        ("warm", whole, ["--cache-dir", cache_dir] + common, 1),
+        ("fix", [fix_copy], ["--fix", "--no-cache"] + common, 1),
+        ("notebooks", [corpus["notebooks"]], ["--no-cache"] + common, 1),
+        ("single_file", [single], ["--no-cache"] + common, 7),
+    ]
+    results = []
+    for name, paths, args, repeat in scenarios:
+        if only and name not in only:
+            continue
+        results.append(measure(name, paths, args, workdir, repeat))
+        print_row(results[-1])
+    return results
+
+
+def print_row(row):
+    print(f"{row['scenario']:12}{row['files']:>8}{row['seconds']:>10.3f}{row['files_per_sec']:>12.1f}"
+          f"{row['mb_per_sec']:>10.2f}{row['peak_rss_mb']:>11.1f}")
+
+
+def compare(results, baseline, threshold):
+    """Lists the scenarios that got slower than the baseline by more than ``threshold``."""
+    previous = {row["scenario"]: row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        old = previous.get(row["scenario"])
+        if old is None:
+            continue
+        change = row["files_per_sec"] / old["files_per_sec"] - 1
+        print(f"{row['scenario']:12}{old['files_per_sec']:>12.1f} -> {row['files_per_sec']:>10.1f}  ({change:+.0%})")
+        if change < -threshold:
+            regressions.append(row["scenario"])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--scenario", action="append", default=[], help="Run only this scenario (repeatable).")
+    parser.add_argument("--output", help="Write the results as JSON.")
+    parser.add_argument("--baseline", help="Compare against this results JSON.")
+    parser.add_argument("--update-baseline", metavar="PATH", help="Write the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative drop in files/sec before a scenario fails.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pl-bench-") as workdir:
+        corpus = generate(os.path.join(workdir, "corpus"), args.scale, args.seed)
+        print(f"{'scenario':12}{'files':>8}{'seconds':>10}{'files/sec':>12}{'MB/sec':>10}{'peak MB':>11}")
+        results = run_scenarios(corpus, workdir, args.jobs, set(args.scenario))
+
+    report = {
+        "scale": args.scale,
+        "seed": args.seed,
+        "jobs": args.jobs,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    for path in filter(None, (args.output, args.update_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != args.scale:
+            raise SystemExit(f"baseline was recorded at scale {baseline.get('scale')!r}, not {args.scale!r}")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Slower than baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compares the recursive ast.NodeVisitor traversal PandasVisitor used to
+rely on with its explicit-stack walk, on a very large module and on
+very deeply nested expressions.
+
+Usage: python benchmarks/bench_traversal.py [--lines N] [--depth N] [--repeat N]
+"""
+import argparse
+import ast
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pandas_lint.analyzer import PandasVisitor  # noqa: E402
+
+TEMPLATE = """\
+def step_{i}(df, logger):
+    logger.info("step {i}")
+    total = len(df) + sum(range({i}))
+    frame = pd.read_csv("part_{i}.csv")
+    for _, row in frame.iterrows():
+        total += row["a"] * {i}
+    df['c{i}'] = df['a'].apply(lambda x: x + {i})
+    return max(total, 0)
+"""
+
+
+class RecursiveVisitor(PandasVisitor):
+    """The previous traversal: ast.NodeVisitor recursion with getattr dispatch."""
+
+    def visit(self, node):
+        method = getattr(self, 'visit_' + node.__class__.__name__, None)
+        if method is not None:
+            return method(node)
+        return self.generic_visit(node)
+
+    def visit_Import(self, node):
+        self._track_import(node)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        self._run_rules(node)
+        self.generic_visit(node)
+
+
+def large_module(lines):
+    return "import pandas as pd\n" + "".join(
+        TEMPLATE.format(i=i) for i in range(lines // TEMPLATE.count("\n"))
+    )
+
+
+def deep_expression(depth):
+    """A left-nested BinOp chain ``depth`` deep, each operand a flagged call."""
+    return "x = " + " + ".join(["df.apply(f)"] * depth) + "\n"
+
+
+def time_visitor(tree, visitor_cls, repeat):
+    best = float('inf')
+    issues = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        visitor = visitor_cls()
+        try:
+            visitor.visit(tree)
+        except RecursionError:
+            return None, None
+        best = min(best, time.perf_counter() - start)
+        issues = visitor.issues
+    return best, issues
+
+
+def report(name, tree, repeat):
+    recursive_time, recursive_issues = time_visitor(tree, RecursiveVisitor, repeat)
+    iterative_time, iterative_issues = time_visitor(tree, PandasVisitor, repeat)
+    if recursive_issues is not None:
+        assert recursive_issues == iterative_issues, "the traversal changed the reported issues"
+    recursive = "RecursionError" if recursive_time is None else f"{recursive_time * 1000:.1f}"
+    speedup = "-" if recursive_time is None else f"{recursive_time / iterative_time:.2f}x"
+    print(f"{name:10}{recursive:>16}{iterative_time * 1000:>16.1f}{speedup:>10}  ({len(iterative_issues)} issues)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=100000)
+    parser.add_argument('--depth', type=int, default=2000,
+                        help="Nesting depth of the deep expression; ast.parse itself gives up around 2500.")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'':10}{'recursive (ms)':>16}{'iterative (ms)':>16}{'speedup':>10}")
+    report(f"{args.lines // 1000}k lines", ast.parse(large_module(args.lines)), args.repeat)
+    for depth in (200, args.depth):
+        report(f"depth {depth}", ast.parse(deep_expression(depth)), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
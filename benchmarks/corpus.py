@@ -0,0 +1,152 @@
+"""
+Deterministic synthetic corpora for the benchmarks.
+
+The same seed and scale always produce byte-identical files, so numbers
+from different runs and machines measure the same work:
+
+- ``small/``: many short modules, about a third of them using pandas;
+- ``large/``: a few 50k-line generated modules;
+- ``deep/``: deeply nested blocks and expressions;
+- ``notebooks/``: notebooks whose outputs (base64 images, long text) far
+  outweigh their code.
+
+Usage: python benchmarks/corpus.py DIRECTORY [--scale small|default|large] [--seed N]
+"""
+import argparse
+import base64
+import json
+import os
+import random
+from typing import Dict
+
+# Counts per scale: small modules, large modules, lines per large module,
+# nested files, notebooks, output bytes per notebook.
+SCALES: Dict[str, Dict[str, int]] = {
+    "small": {"small": 200, "large": 1, "large_lines": 50_000, "deep": 2, "notebooks": 5, "output_bytes": 256 * 1024},
+    "default": {"small": 2_000, "large": 3, "large_lines": 50_000, "deep": 10, "notebooks": 20, "output_bytes": 1024 * 1024},
+    "large": {"small": 20_000, "large": 10, "large_lines": 50_000, "deep": 50, "notebooks": 100, "output_bytes": 4 * 1024 * 1024},
+}
+
+PANDAS_SNIPPETS = [
+    "for idx, row in df.iterrows():\n    total += row['{col}']\n",
+    "df['{col}'] = df['{col}'].apply(lambda x: x.upper())\n",
+    "df['{col}_year'] = df['{col}'].apply(lambda x: x.year)\n",
+    "df = pd.read_csv('{col}.csv')\n",
+    "df = pd.read_csv('{col}.csv', usecols=['{col}'])\n",
+    "df.to_csv('{col}_out.csv')\n",
+    "df.drop(columns=['{col}'], inplace=True)\n",
+    "frame = pd.read_sql(f'SELECT * FROM {col} WHERE id = {{key}}', con)\n",
+    "df['{col}'] = df['{col}'] * 2\n",
+    "summary = df.groupby('{col}').agg('mean')\n",
+]
+
+PLAIN_SNIPPETS = [
+    "def {name}(values):\n    result = []\n    for value in values:\n        if value % 3:\n            result.append(value * {n})\n    return result\n",
+    "class {Name}:\n    def __init__(self, size={n}):\n        self.size = size\n\n    def grow(self, factor):\n        return {Name}(self.size * factor)\n",
+    "{name} = {{'key_{n}': [{n}, {n} + 1, {n} * 2], 'label': '{name}'}}\n",
+    "try:\n    {name} = int('{n}')\nexcept ValueError:\n    {name} = None\n",
+    "with open('{name}.txt') as handle:\n    {name}_lines = handle.read().splitlines()\n",
+]
+
+
+def _identifier(rng: random.Random, prefix: str = "v") -> str:
+    return prefix + "_" + "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(6))
+
+
+def small_module(rng: random.Random, uses_pandas: bool) -> str:
+    parts = ["import os\nimport json\n"]
+    if uses_pandas:
+        parts.append("import pandas as pd\n")
+    for _ in range(rng.randint(5, 25)):
+        if uses_pandas and rng.random() < 0.3:
+            parts.append(rng.choice(PANDAS_SNIPPETS).format(col=_identifier(rng, "c")))
+        else:
+            name = _identifier(rng)
+            parts.append(rng.choice(PLAIN_SNIPPETS).format(name=name, Name=name.title().replace("_", ""), n=rng.randint(1, 999)))
+        parts.append("\n")
+    return "".join(parts)
+
+
+def large_module(rng: random.Random, lines: int) -> str:
+    parts = ["import pandas as pd\n\n"]
+    written = 2
+    while written < lines:
+        if rng.random() < 0.02:
+            snippet = rng.choice(PANDAS_SNIPPETS).format(col=_identifier(rng, "c"))
+        else:
+            snippet = f"{_identifier(rng)} = compute({rng.randint(0, 10**6)}, '{_identifier(rng, 's')}')\n"
+        parts.append(snippet)
+        written += snippet.count("\n")
+    return "".join(parts)
+
+
+def deep_module(rng: random.Random, depth: int = 90) -> str:
+    """Nested blocks close to the indentation limit and nested calls close to the parser limit."""
+    lines = ["import pandas as pd\n", "def outer(df):\n"]
+    for level in range(1, depth):
+        lines.append("    " * level + f"if df.shape[0] > {level}:\n")
+    lines.append("    " * depth + "df.iterrows()\n")
+    calls = "df"
+    for _ in range(150):
+        calls = f"wrap({calls})"
+    lines.append(f"nested = {calls}.apply(lambda x: x)\n")
+    return "".join(lines)
+
+
+def notebook(rng: random.Random, output_bytes: int) -> str:
+    cells = []
+    image_cells = 4
+    for index in range(30):
+        source = small_module(rng, uses_pandas=index % 2 == 0).splitlines(keepends=True)
+        outputs = []
+        if index < image_cells:
+            size = output_bytes * 3 // 4 // image_cells
+            payload = base64.b64encode(rng.getrandbits(size * 8).to_bytes(size, "little")).decode("ascii")
+            outputs.append({"output_type": "display_data", "data": {"image/png": payload, "text/plain": ["<Figure>"]},
+                            "metadata": {}})
+        elif index % 3 == 0:
+            outputs.append({"output_type": "stream", "name": "stdout",
+                            "text": [f"row {i}: df.iterrows() {_identifier(rng)}\n" for i in range(200)]})
+        cells.append({"cell_type": "code", "execution_count": index + 1, "metadata": {},
+                      "source": source, "outputs": outputs})
+        cells.append({"cell_type": "markdown", "metadata": {}, "source": [f"## Step {index}\n"]})
+    return json.dumps({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5}, indent=1)
+
+
+def generate(directory: str, scale: str = "default", seed: int = 0) -> Dict[str, str]:
+    """Writes the corpus under ``directory`` and returns the path of each part."""
+    counts = SCALES[scale]
+    rng = random.Random(seed)
+    parts = {name: os.path.join(directory, name) for name in ("small", "large", "deep", "notebooks")}
+    for path in parts.values():
+        os.makedirs(path, exist_ok=True)
+
+    def write(path, content):
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(content)
+
+    for i in range(counts["small"]):
+        package = os.path.join(parts["small"], f"pkg_{i // 100:03d}")
+        os.makedirs(package, exist_ok=True)
+        write(os.path.join(package, f"module_{i:05d}.py"), small_module(rng, uses_pandas=i % 3 == 0))
+    for i in range(counts["large"]):
+        write(os.path.join(parts["large"], f"generated_{i:02d}.py"), large_module(rng, counts["large_lines"]))
+    for i in range(counts["deep"]):
+        write(os.path.join(parts["deep"], f"nested_{i:02d}.py"), deep_module(rng))
+    for i in range(counts["notebooks"]):
+        write(os.path.join(parts["notebooks"], f"analysis_{i:03d}.ipynb"), notebook(rng, counts["output_bytes"]))
+    return parts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="default")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for name, path in generate(args.directory, args.scale, args.seed).items():
+        print(f"{name:10} {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
+from pandas_lint import Linter
 from pandas_lint.notebook import parse_notebook
-import ast
-from pandas_lint.analyzer import PandasVisitor
 
 def debug():
     filepath = 'tests/test_notebook.ipynb'
@@ -10,11 +9,9 @@ def debug():
     print(f"DEBUG: Code Content:\n---\n{code}\n---")
     print(f"DEBUG: Mapping: {mapping}")
     
-    tree = ast.parse(code)
-    visitor = PandasVisitor()
-    visitor.visit(tree)
-    print(f"DEBUG: Issues found: {len(visitor.issues)}")
-    for issue in visitor.issues:
+    result = Linter().lint_file(filepath)
+    print(f"DEBUG: Issues found: {len(result.issues)}")
+    for issue in result.issues:
         print(f" - {issue}")
 
 if __name__ == "__main__":
@@ -0,0 +1,8 @@
+__version__ = "0.1.0"
+
+from .api import Linter  # noqa: E402
+from .config import Config  # noqa: E402
+from .engine import FileResult  # noqa: E402
+from .rules import Issue  # noqa: E402
+
+__all__ = ["Linter", "Config", "FileResult", "Issue", "__version__"]
@@ -1,71 +1,119 @@
 import ast
-import os
-from typing import List
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Type
 
-try:
-    import tomllib
-except ImportError:
-    try:
-        import toml as tomllib
-    except ImportError:
-        tomllib = None
+from .config import Config, resolve_config
+from .rules import RuleRegistry, Issue, dispatch_key
+from .stats import Stats
 
-from .rules import RuleRegistry, Issue
+# Fields that only ever hold operator or expression-context singletons
+# (ast.Add, ast.Load, ...). No rule inspects those, so they are not walked.
+SKIPPED_FIELDS = frozenset({"ctx", "op", "ops"})
+
+_child_fields: Dict[Type[ast.AST], Tuple[str, ...]] = {}
+
+
+def child_fields(node_type: Type[ast.AST]) -> Tuple[str, ...]:
+    """
+    The fields of ``node_type`` that can hold child nodes, last first:
+    pushed in this order, children come off the stack in ``_fields`` order.
+    """
+    fields = _child_fields.get(node_type)
+    if fields is None:
+        fields = _child_fields[node_type] = tuple(f for f in reversed(node_type._fields) if f not in SKIPPED_FIELDS)
+    return fields
 
 
 class PandasVisitor(ast.NodeVisitor):
-    def __init__(self):
+    """
+    Runs the registered rules over a tree. ``visit`` walks it with an
+    explicit stack instead of recursing, so nesting depth is bounded by
+    memory rather than the interpreter's recursion limit, and only calls
+    out for the node types rules subscribe to, plus imports to track the
+    pandas alias. Nodes are visited in the same preorder as
+    ``ast.NodeVisitor``.
+    """
+
+    def __init__(self, config: Optional[Config] = None, stats: Optional[Stats] = None):
         self.issues: List[Issue] = []
+        self.stats = stats
         self.pandas_alias = 'pd'
-        self.ignored_codes = self._load_config()
-        self.rules = RuleRegistry.get_all()
-
-    def _load_config(self) -> List[str]:
-        config_path = "pyproject.toml"
-        if not os.path.exists(config_path) or tomllib is None:
-            return []
-
-        try:
-            with open(config_path, "rb") as f:
-                if hasattr(tomllib, 'load'):
-                    try:
-                        data = tomllib.load(f)
-                    except TypeError:
-                        f.seek(0)
-                        import toml
-                        data = toml.loads(f.read().decode('utf-8'))
-                else:
-                    return []
-
-            return data.get("tool", {}).get("pandas-linter", {}).get("ignore", [])
-        except Exception:
-            return []
+        self.config = config if config is not None else resolve_config()
+        self.ignored_codes = self.config.ignore
+        self.dispatch = RuleRegistry.get_dispatch(self.ignored_codes)
+        self.handlers: Dict[Type[ast.AST], Callable[[ast.AST], None]] = {
+            node_type: self._run_rules for node_type, _ in self.dispatch
+        }
+        self.handlers[ast.Import] = self._track_import
+
+    def visit(self, node: ast.AST):
+        handlers = self.handlers
+        stack = [node]
+        pop, push = stack.pop, stack.append
+        while stack:
+            node = pop()
+            node_type = type(node)
+            handler = handlers.get(node_type)
+            if handler is not None:
+                handler(node)
+            for field in child_fields(node_type):
+                value = getattr(node, field, None)
+                if value is None:
+                    continue
+                if type(value) is list:
+                    # Lists may hold plain strings, e.g. ``global`` names.
+                    for item in reversed(value):
+                        if isinstance(item, ast.AST):
+                            push(item)
+                elif isinstance(value, ast.AST):
+                    push(value)
 
     @property
     def context(self) -> dict:
         return {'pandas_alias': self.pandas_alias}
 
     def _run_rules(self, node: ast.AST):
-        for rule in self.rules:
-            if rule.code in self.ignored_codes:
-                continue
-            issue = rule.check(node, self.context)
+        node_type, attr = dispatch_key(node)
+        rules = self.dispatch.get((node_type, attr))
+        if rules is None:
+            rules = self.dispatch.get((node_type, None), ())
+        if not rules:
+            return
+
+        context = self.context
+        if self.stats is not None:
+            self._run_rules_timed(node, rules, context)
+            return
+        for rule in rules:
+            issue = rule.check(node, context)
             if issue and issue.code not in self.ignored_codes:
                 self.issues.append(issue)
 
-    def visit_Import(self, node):
+    def _run_rules_timed(self, node: ast.AST, rules, context: dict):
+        for rule in rules:
+            start = time.perf_counter()
+            issue = rule.check(node, context)
+            self.stats.add_rule(rule.code, time.perf_counter() - start, issue is not None)
+            if issue and issue.code not in self.ignored_codes:
+                self.issues.append(issue)
+
+    def _track_import(self, node: ast.Import):
         for alias in node.names:
             if alias.name == "pandas":
                 self.pandas_alias = alias.asname or 'pandas'
-        self.generic_visit(node)
-
-    def visit_ImportFrom(self, node):
-        self.generic_visit(node)
-
-    def visit_Call(self, node):
         self._run_rules(node)
-        self.generic_visit(node)
 
-    def visit_For(self, node):
-        self._run_rules(node)
-        self.generic_visit(node)
+
+def analyze_code(source: str, config: Optional[Config] = None,
+                 pandas_alias: str = 'pd') -> Tuple[List[Issue], str]:
+    """
+    Runs the visitor over one piece of source, e.g. a notebook cell, starting
+    from ``pandas_alias``. Returns the issues and the alias in effect at the
+    end, to carry into the next cell. Raises SyntaxError on invalid source,
+    RecursionError or MemoryError when it is too deeply nested to parse.
+    """
+    tree = ast.parse(source)
+    visitor = PandasVisitor(config)
+    visitor.pandas_alias = pandas_alias
+    visitor.visit(tree)
+    return visitor.issues, visitor.pandas_alias
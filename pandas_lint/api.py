@@ -0,0 +1,123 @@
+import dataclasses
+import functools
+import os
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .cache import ResultCache
+from .config import Config, ConfigResolver, parse_size
+from .discovery import FileDiscoverer
+from .engine import Engine, FileResult, analyze_batch, analyze_guarded, analyze_notebook, analyze_source
+from .notebook import read_code_cells_string
+from .rules import Rule, RuleRegistry
+
+
+class Linter:
+    """
+    Lints sources, files and directory trees from Python code, without the
+    CLI. Create one and reuse it: it keeps the resolved configuration of
+    every directory it has seen, the rule set and, with ``jobs``, a worker
+    pool that lives until ``close`` (or the end of a ``with`` block).
+
+    Args:
+        config: Used for every file when given. Otherwise each file gets
+            the nearest ``pyproject.toml``, as on the command line.
+        jobs: Worker processes for ``lint_paths``. The default of 1 lints
+            in the calling process; None uses one per CPU.
+        cache_dir: Directory of the on-disk result cache (e.g.
+            ``".pandas_lint_cache"``). None disables caching.
+        max_file_size, timeout: Per-file limits in bytes (or a size such
+            as ``"2MB"``) and seconds, overriding the configuration. Files over them are returned with ``skipped``
+            set.
+
+    Example::
+
+        with Linter(jobs=None) as linter:
+            for result in linter.lint_paths(["src/", "notebooks/"]):
+                for issue in result.issues:
+                    print(result.path, issue.line, issue.code, issue.message)
+    """
+
+    def __init__(self, config: Optional[Config] = None, jobs: Optional[int] = 1,
+                 cache_dir: Optional[str] = None, max_file_size: Union[int, str, None] = None,
+                 timeout: Optional[float] = None):
+        if max_file_size is not None:
+            max_file_size = parse_size(max_file_size)
+        overrides = {"max_file_size": max_file_size, "timeout": timeout}
+        self.resolver = ConfigResolver(overrides=overrides)
+        self.config = dataclasses.replace(config, **self.resolver.overrides) if config is not None else None
+        self.rules: List[Rule] = RuleRegistry.get_all()
+        self.engine = Engine(jobs)
+        self.cache = ResultCache(cache_dir) if cache_dir is not None else None
+
+    def __enter__(self) -> "Linter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shuts the worker pool down, if one was started."""
+        self.engine.close()
+
+    def config_for(self, path: str) -> Config:
+        return self.config if self.config is not None else self.resolver.for_path(path)
+
+    def lint_source(self, source: str, path: str = "<string>") -> FileResult:
+        """
+        Lints source code held in memory. ``path`` names it in the result
+        and selects its configuration; a path ending in ``.ipynb`` means
+        ``source`` is notebook JSON.
+        """
+        config = self.config_for(os.path.abspath(path))
+        if path.endswith(".ipynb"):
+            try:
+                code_cells = read_code_cells_string(source)
+            except ValueError:
+                return FileResult(path, [])
+            return analyze_notebook(code_cells, path, config)
+        return analyze_source(source, path, config)
+
+    def lint_file(self, path: str) -> FileResult:
+        """Lints one ``.py`` or ``.ipynb`` file in the calling process."""
+        config = self.config_for(path)
+        if self.cache is None:
+            return analyze_guarded(path, config)
+        result, token = self.cache.lookup(path, config)
+        if result is None:
+            result = analyze_guarded(path, config, cell_cache=self.cache.cells)
+            self.cache.store(token, result)
+        return result
+
+    def lint_paths(self, paths: Iterable[str]) -> Iterator[FileResult]:
+        """
+        Lints files and directory trees, skipping excluded and ignored
+        files as the CLI does. Returns a generator that yields one result
+        per file as soon as it is available: cache hits as they are found,
+        the others in completion order, from the worker pool when ``jobs``
+        allows. Files are discovered while earlier ones are analyzed.
+        """
+        discoverer = FileDiscoverer(self.resolver)
+        tokens = {}
+
+        def pending_jobs() -> Iterator[Tuple[str, Config]]:
+            for file_path in discoverer.discover(paths):
+                config = self.config_for(file_path)
+                if self.cache is not None:
+                    result, tokens[file_path] = self.cache.lookup(file_path, config)
+                    if result is not None:
+                        cached.append(result)
+                        continue
+                yield file_path, config
+
+        cached: List[FileResult] = []
+        batch_func = analyze_batch
+        if self.cache is not None:
+            batch_func = functools.partial(analyze_batch, cell_cache=self.cache.cells)
+        for result in self.engine.run(pending_jobs(), batch_func):
+            # Cache hits found while producing jobs go out before the next result.
+            yield from cached
+            cached.clear()
+            if self.cache is not None:
+                self.cache.store(tokens.pop(result.path, None), result)
+            yield result
+        yield from cached
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from . import __version__
+from .config import DEFAULT_CONFIG, Config
+from .engine import FileResult
+from .rules import RuleRegistry
+
+DEFAULT_CACHE_DIR = ".pandas_lint_cache"
+
+CACHEDIR_TAG = (
+    "Signature: 8a477f597d28d172789f06886806bc55\n"
+    "# This file is a cache directory tag created by pandas-lint.\n"
+)
+
+_FINGERPRINT_RE = re.compile(r"[0-9a-f]{16}")
+
+
+def rules_fingerprint() -> str:
+    """
+    Fingerprint of the tool version and the registered rule set, including
+    the source of the modules defining the rules, so editing a rule
+    without a version bump still invalidates every cached result.
+    """
+    digest = hashlib.sha256(__version__.encode())
+    modules = []
+    for rule in RuleRegistry.get_all():
+        cls = type(rule)
+        digest.update(f"\0{rule.code}:{cls.__module__}.{cls.__qualname__}".encode())
+        if cls.__module__ not in modules:
+            modules.append(cls.__module__)
+    for name in modules:
+        source_file = getattr(sys.modules.get(name), "__file__", None)
+        try:
+            with open(source_file, "rb") as f:
+                digest.update(b"\0" + f.read())
+        except (OSError, TypeError):
+            digest.update(f"\0{name}:no source".encode())
+    return digest.hexdigest()[:16]
+
+
+def entry_name(file_path: str) -> str:
+    return hashlib.sha1(os.path.abspath(file_path).encode("utf-8", "surrogateescape")).hexdigest()
+
+
+def write_json_atomic(path: str, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+class ResultCache:
+    """
+    On-disk cache of analysis results, one JSON entry per source file.
+
+    Entries live in a sub-directory named after ``rules_fingerprint()`` and
+    are valid while the file content hash and the ignore configuration
+    match. A matching ``(mtime, size)`` pair skips hashing altogether.
+    Every entry looked up is remembered, so ``prune`` can tell which ones
+    the run no longer needed. ``cache_dir`` is only tagged, and stale
+    fingerprints in it only removed, when the tool created it.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.root = cache_dir
+        self.fingerprint = rules_fingerprint()
+        self.directory = os.path.join(cache_dir, self.fingerprint)
+        self.touched: Set[str] = set()
+        self._ensure_directory()
+
+    def _ensure_directory(self):
+        created = not os.path.exists(self.root)
+        os.makedirs(self.directory, exist_ok=True)
+        tag = os.path.join(self.root, "CACHEDIR.TAG")
+        if created:
+            with open(tag, "w") as f:
+                f.write(CACHEDIR_TAG)
+            with open(os.path.join(self.root, ".gitignore"), "w") as f:
+                f.write("*\n")
+
+    def _is_own_root(self) -> bool:
+        try:
+            with open(os.path.join(self.root, "CACHEDIR.TAG"), "r") as f:
+                return f.read() == CACHEDIR_TAG
+        except (OSError, ValueError):
+            return False
+
+    def _entry_path(self, file_path: str) -> str:
+        return os.path.join(self.directory, entry_name(file_path) + ".json")
+
+    @property
+    def cells(self) -> "CellCache":
+        """Per-cell results of notebooks, kept next to the file entries."""
+        return CellCache(self.directory)
+
+    def lookup(self, file_path: str, config: Config = DEFAULT_CONFIG) -> Tuple[Optional[FileResult], Optional[dict]]:
+        """
+        Returns ``(result, token)``. ``result`` is the cached
+        ``FileResult`` on a hit, ``None`` otherwise; ``token``
+        must be handed back to ``store`` once the file has been analyzed.
+        """
+        self.touched.add(entry_name(file_path))
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None, None
+        config_key = ",".join(sorted(config.ignore))
+        token = {"mtime": st.st_mtime_ns, "size": st.st_size, "config": config_key,
+                 "source": os.path.abspath(file_path)}
+
+        entry = self._read_entry(file_path)
+        if entry is not None and entry.get("config") == config_key:
+            if entry.get("mtime") == token["mtime"] and entry.get("size") == token["size"]:
+                return self._decode(file_path, entry), token
+
+        try:
+            with open(file_path, "rb") as f:
+                token["hash"] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None, None
+
+        if entry is not None and entry.get("config") == config_key and entry.get("hash") == token["hash"]:
+            # Touched but unchanged: refresh the stat signature for next time.
+            entry.update(token)
+            self._write_entry(file_path, entry)
+            return self._decode(file_path, entry), token
+        return None, token
+
+    def store(self, token: Optional[dict], result: FileResult):
+        # Skipped files were not analyzed: nothing to remember about them.
+        if token is None or "hash" not in token or result.skipped is not None:
+            return
+        entry = dict(token)
+        entry.update(result.to_json())
+        self._write_entry(result.path, entry)
+
+    def prune(self, scopes: Iterable[str] = ()):
+        """
+        Evicts entries written by other tool versions or rule sets, and the
+        entries not looked up in this run whose file is gone or lies under
+        one of ``scopes``, the paths the run linted in full: such a file was
+        deleted, renamed or excluded since. Other fingerprint directories
+        are only removed from a cache directory carrying our tag.
+        """
+        try:
+            names = os.listdir(self.root) if self._is_own_root() else []
+        except OSError:
+            names = []
+        for name in names:
+            path = os.path.join(self.root, name)
+            if (name != self.fingerprint and _FINGERPRINT_RE.fullmatch(name)
+                    and os.path.isdir(path) and not os.path.islink(path)):
+                shutil.rmtree(path, ignore_errors=True)
+
+        scopes = [os.path.abspath(scope) for scope in scopes]
+        try:
+            entries = [name[:-len(".json")] for name in os.listdir(self.directory)
+                       if name.endswith(".json") and not name.endswith(".cells.json")]
+        except OSError:
+            return
+        for name in entries:
+            if name in self.touched:
+                continue
+            try:
+                with open(os.path.join(self.directory, name + ".json"), "r", encoding="utf-8") as f:
+                    source = json.load(f).get("source")
+            except (OSError, ValueError, AttributeError):
+                source = None
+            if source is None or not os.path.isfile(source) or any(
+                    source == scope or source.startswith(os.path.join(scope, "")) for scope in scopes):
+                for suffix in (".json", ".cells.json"):
+                    try:
+                        os.remove(os.path.join(self.directory, name + suffix))
+                    except OSError:
+                        pass
+
+    def _read_entry(self, file_path: str) -> Optional[dict]:
+        try:
+            with open(self._entry_path(file_path), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_entry(self, file_path: str, entry: dict):
+        write_json_atomic(self._entry_path(file_path), entry)
+
+    @staticmethod
+    def _decode(file_path: str, entry: dict) -> FileResult:
+        entry["path"] = file_path
+        return FileResult.from_json(entry)
+
+
+class CellCache:
+    """
+    Per-cell analysis results of notebooks, one JSON file per notebook
+    mapping ``engine.cell_key`` to ``[outgoing pandas alias, issues]``.
+    Each save replaces the file with the notebook's current cells, so it
+    never grows beyond them. Only holds a directory name: it is shipped
+    to the workers along with the batch function.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, file_path: str) -> str:
+        return os.path.join(self.directory, entry_name(file_path) + ".cells.json")
+
+    def load(self, file_path: str) -> Dict[str, list]:
+        try:
+            with open(self._path(file_path), "r", encoding="utf-8") as f:
+                cells = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cells if isinstance(cells, dict) else {}
+
+    def save(self, file_path: str, cells: Dict[str, list]):
+        write_json_atomic(self._path(file_path), cells)
@@ -1,105 +1,298 @@
 import click
-import ast
+import contextlib
+import functools
+import json
 import os
-from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.syntax import Syntax
-from .analyzer import PandasVisitor
-from .notebook import parse_notebook
-from .fixer import fix_code
-import concurrent.futures
-
-console = Console()
-
-def analyze_file(file_path):
+import time
+from . import __version__
+from .cache import DEFAULT_CACHE_DIR, ResultCache
+from .config import ConfigResolver, parse_size
+from .discovery import FileDiscoverer
+from .git import GitError, changed_files, find_worktree, line_in_ranges
+from .notebook import read_code_cells_string
+from .reporters import FORMATS, TableReporter, make_reporter
+from .stats import PHASES, Stats, timed
+from .engine import Engine, FileResult, analyze_batch, analyze_file, analyze_notebook, analyze_source, fix_batch, fixable_codes  # noqa: F401  (analyze_file re-exported)
+
+# rich, libcst and pygments are imported where they are used: pre-commit
+# starts us on every commit, and most runs need none of them.
+
+
+class LazyConsole:
+    """Stands in for a rich Console and creates it on first use."""
+
+    def __init__(self):
+        self._console = None
+        self.stderr = False
+
+    def get(self):
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console(stderr=self.stderr)
+        return self._console
+
+    def use_stderr(self, enabled=True):
+        """Sends messages to stderr, leaving stdout to a machine-readable report."""
+        if enabled != self.stderr:
+            self.stderr = enabled
+            self._console = None
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+console = LazyConsole()
+
+
+class DefaultGroup(click.Group):
+    """A command group that runs ``default_command`` unless the first argument names a subcommand."""
+
+    def __init__(self, *args, default_command='lint', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if not args or args[0] not in self.commands:
+            args.insert(0, self.default_command)
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultGroup)
+def main():
     """
-    Analyzes a single file and returns a list of issues
-    This function must b top-level to be picklable for multiprocessing
+    Pandas-Linter: Static analyzer to optimize Data Science code
     """
-    issues = []
-    cell_mapping = None
-    file_content_lines = []
-    
-    try:
-        if file_path.endswith(".ipynb"):
-            code_content, cell_mapping = parse_notebook(file_path)
-            tree = ast.parse(code_content)
-            file_content_lines = code_content.splitlines()
-        else:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-                tree = ast.parse(content)
-                file_content_lines = content.splitlines()
-                
-        visitor = PandasVisitor()
-        visitor.visit(tree)
-        issues = visitor.issues
-    except (SyntaxError, ValueError) as e:
-        pass
-        
-    return file_path, issues, cell_mapping, file_content_lines
 
-@click.command()
-@click.argument('path', type=click.Path(exists=True))
-@click.version_option(version='0.1.0')
+
+@main.command(epilog="Other commands: 'pandas-lint daemon', 'pandas-lint client' and 'pandas-lint lsp' (see their --help).")
+@click.argument('paths', nargs=-1, type=click.Path(exists=True, allow_dash=True))
+@click.version_option(version=__version__)
 @click.option('--fix', is_flag=True, help="Automatically fix fixable issues (experimental).")
-def main(path, fix):
+@click.option('--no-cache', is_flag=True, help="Analyze every file, ignoring cached results.")
+@click.option('--cache-dir', type=click.Path(file_okay=False), default=DEFAULT_CACHE_DIR,
+              show_default=True, help="Directory for cached results of unchanged files.")
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=None,
+              help="Number of worker processes. Defaults to the CPU count; 1 disables the pool.")
+@click.option('--changed-since', metavar='REF',
+              help="Only lint files changed since the merge base with REF (plus untracked files).")
+@click.option('--staged', is_flag=True, help="Only lint files staged in the git index.")
+@click.option('--changed-lines-only', is_flag=True,
+              help="With --changed-since/--staged, only report issues on changed lines.")
+@click.option('--stdin-filename', metavar='NAME',
+              help="Lint source read from stdin, reported and configured as if it were NAME.")
+@click.option('--watch', is_flag=True,
+              help="After the first run, keep watching PATHS and report issues added or resolved by each change.")
+@click.option('--stats', 'show_stats', is_flag=True,
+              help="Print time per phase and per rule, rule invocations and hits, and bytes read.")
+@click.option('--stats-file', type=click.Path(dir_okay=False, writable=True),
+              help="Write the --stats figures as JSON to this file.")
+@click.option('--format', 'output_format', type=click.Choice(FORMATS), default='table', show_default=True,
+              help="Report format. All but 'table' are streamed to stdout as results arrive, "
+                   "with messages and the summary on stderr.")
+@click.option('--max-file-size', metavar='SIZE', callback=lambda ctx, param, value: size_option(value),
+              help="Skip files with more source than SIZE (e.g. 512KB, 2MB). Overrides max-file-size in pyproject.toml.")
+@click.option('--timeout', type=click.FloatRange(min=0, min_open=True), default=None, metavar='SECONDS',
+              help="Stop analyzing a file after SECONDS and skip it. Overrides timeout in pyproject.toml.")
+def lint(paths, fix, no_cache, cache_dir, jobs, changed_since, staged, changed_lines_only, stdin_filename, watch,
+         show_stats, stats_file, output_format, max_file_size, timeout):
     """
     Pandas-Linter: Static analyzer to optimize Data Science code
-    PATH can be a .py file or a directory
+    PATHS can be .py/.ipynb files or directories; '-' reads from stdin
     """
-    files_to_check = []
-    
-    if os.path.isdir(path):
-        for root, dirs, files in os.walk(path):
-            for file in files:
-                if file.endswith(".py") or file.endswith(".ipynb"):
-                    files_to_check.append(os.path.join(root, file))
+    started = time.perf_counter()
+    stats = Stats() if show_stats or stats_file else None
+    resolver = ConfigResolver(overrides={"max_file_size": max_file_size, "timeout": timeout})
+    line_filter = None
+
+    read_stdin = '-' in paths or (stdin_filename is not None and not paths)
+    paths = list(dict.fromkeys(p for p in paths if p != '-'))
+    if not paths and not read_stdin:
+        raise click.UsageError("Provide at least one PATH, or '-' to read from stdin.")
+    if read_stdin and fix:
+        raise click.UsageError("--fix cannot be used with source read from stdin.")
+    if watch and (read_stdin or fix or changed_since or staged):
+        raise click.UsageError("--watch cannot be combined with stdin, --fix, --changed-since or --staged.")
+    if watch and output_format == 'sarif':
+        raise click.UsageError("--watch cannot write a single SARIF document; use --format jsonl.")
+
+    reporter = make_reporter(output_format, click.get_text_stream('stdout'), console)
+    console.use_stderr(reporter.machine_readable)
+
+    if changed_since or staged:
+        files_to_check, changes = changed_files_under(paths, changed_since, staged, resolver)
+        if changed_lines_only:
+            line_filter = changes
+    elif changed_lines_only:
+        raise click.UsageError("--changed-lines-only requires --changed-since or --staged.")
     else:
-        files_to_check.append(path)
+        discoverer = FileDiscoverer(resolver)
+        files_to_check = discoverer.discover(paths)
+    if stats is not None:
+        files_to_check = timed(files_to_check, stats, "discovery")
 
-    if fix:
-        console.print("[bold blue]Running Auto-Fixer...[/bold blue]")
-        import libcst
-        fixed_count = 0
+    total_issues = 0
+    checked = 0
+    fixed_count = 0
+    cache = None
+    if not no_cache:
+        try:
+            cache = ResultCache(cache_dir)
+        except OSError as e:
+            # A read-only checkout must still be lintable.
+            console.print(f"Cannot use cache directory {cache_dir} ({e.strerror or e}); running without a cache.",
+                          style="yellow", markup=False, soft_wrap=True)
+    tokens = {}
+    # Latest result of every file, kept for --watch to diff against.
+    results = {}
+    skipped = []
+
+    def handle(result):
+        nonlocal total_issues, checked, fixed_count
+        if watch:
+            results[os.path.abspath(result.path)] = result
+        file_path, issues, cell_mapping = result.path, result.issues, result.cell_mapping
+        if result.skipped is not None:
+            skipped.append(result)
+        if result.error is not None:
+            console.print(f"Failed to fix {file_path}: {result.error}", style="red")
+        elif result.fixed:
+            console.print(f"Fixed: {file_path}", style="green")
+            fixed_count += 1
+        if line_filter is not None and not file_path.endswith(".ipynb"):
+            # Notebook line numbers do not correspond to lines of the .ipynb diff.
+            ranges = line_filter.get(file_path)
+            issues = [issue for issue in issues if line_in_ranges(issue.line, ranges)]
+        checked += 1
+        progress.update(task, description=f"Analyzing files... {checked} done")
+        if issues:
+            total_issues += len(issues)
+            if stats is not None:
+                stats.start()
+            reporter.report(file_path, issues, cell_mapping)
+            if stats is not None:
+                stats.lap("report")
+
+    def pending_jobs():
+        """Files still to analyze; cache hits are reported on the way."""
         for file_path in files_to_check:
-            if file_path.endswith(".ipynb"):
-                continue
-            
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    original_code = f.read()
-                
-                new_code = fix_code(original_code)
-                
-                if new_code != original_code:
-                    with open(file_path, "w", encoding="utf-8") as f:
-                        f.write(new_code)
-                    console.print(f"Fixed: {file_path}", style="green")
-                    fixed_count += 1
-            except Exception as e:
-                console.print(f"Failed to fix {file_path}: {e}", style="red")
-        
-        console.print(f"[bold green]Auto-fixed {fixed_count} files.[/bold green]\n")
+            config = resolver.for_path(file_path)
+            if cache is not None:
+                if stats is not None:
+                    stats.start()
+                result, tokens[file_path] = cache.lookup(file_path, config)
+                if stats is not None:
+                    stats.lap("cache")
+                if result is not None and not (fix and any(i.code in fixable_codes(config) for i in result.issues)):
+                    handle(result)
+                    continue
+            yield file_path, config
+
+    with Engine(jobs, stats=stats) as engine:
+        if fix:
+            console.print("[bold blue]Running Auto-Fixer...[/bold blue]")
+
+        reporter.start()
+        with progress_spinner() as progress:
+            task = progress.add_task("Analyzing files...", total=None)
+            if read_stdin:
+                handle(analyze_stdin(stdin_filename, resolver))
+            # With --fix each worker reads, fixes, writes and analyzes a file in one go.
+            batch_func = fix_batch if fix else analyze_batch
+            if cache is not None:
+                batch_func = functools.partial(batch_func, cell_cache=cache.cells)
+            for result in engine.run(pending_jobs(), batch_func):
+                token = tokens.pop(result.path, None)
+                if cache is not None and not result.fixed:
+                    cache.store(token, result)
+                handle(result)
+
+        if not watch:
+            reporter.finish()
+        report_skipped(skipped)
+        if fix:
+            console.print(f"[bold green]Auto-fixed {fixed_count} files.[/bold green]")
+        if cache is not None:
+            # With --changed-since/--staged the unchanged files under PATHS were not looked up.
+            cache.prune(() if changed_since or staged else paths)
+
+        if stats is not None:
+            report_stats(stats, time.perf_counter() - started, show_stats, stats_file)
+
+        if watch:
+            engine.stats = None
+            total_issues = watch_paths(paths, engine, discoverer, resolver, cache, results, reporter)
+            reporter.finish()
+
+    finish(total_issues)
+
+
+@main.command()
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), default=None,
+              help="Unix socket to listen on. Defaults to a per-user socket in the temp directory.")
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=None,
+              help="Number of worker processes kept warm by the daemon.")
+@click.option('--stop', is_flag=True, help="Stop the daemon listening on the socket.")
+def daemon(socket_path, jobs, stop):
+    """
+    Run a long-lived lint server that keeps rules, configuration, a worker
+    pool and per-file results in memory. Use 'pandas-lint client' to query it.
+    """
+    from .daemon import DaemonUnavailable, send_request, serve
+
+    if stop:
+        try:
+            send_request({"op": "shutdown"}, socket_path)
+        except DaemonUnavailable:
+            console.print("No daemon is running.", style="yellow")
+        return
+
+    try:
+        serve(socket_path, jobs)
+    except (DaemonUnavailable, RuntimeError, OSError) as e:
+        raise click.ClickException(str(e))
+    except KeyboardInterrupt:
+        pass
+
+
+@main.command()
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), default=None,
+              help="Unix socket of the daemon.")
+@click.pass_context
+def client(ctx, paths, socket_path):
+    """
+    Lint PATHS on a running daemon, or in-process when no daemon is running.
+    """
+    from .daemon import DaemonUnavailable, lint_via_daemon
+
+    try:
+        results = lint_via_daemon(paths, socket_path)
+    except DaemonUnavailable:
+        ctx.invoke(lint, paths=paths)
+        return
+    except (RuntimeError, OSError) as e:
+        raise click.ClickException(str(e))
 
     total_issues = 0
-    
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        transient=True
-    ) as progress:
-        task = progress.add_task(f"Analyzing {len(files_to_check)} files...", total=len(files_to_check))
-        with concurrent.futures.ProcessPoolExecutor() as executor:
-            results = executor.map(analyze_file, files_to_check)
-            
-            for file_path, issues, cell_mapping, file_content_lines in results:
-                progress.advance(task)
-                if issues:
-                    total_issues += len(issues)
-                    print_report(file_path, issues, cell_mapping, file_content_lines)
+    for result in results:
+        if result.issues:
+            total_issues += len(result.issues)
+            print_report(result.path, result.issues, result.cell_mapping)
+    finish(total_issues)
+
+
+@main.command()
+@click.option('--debounce', type=click.FloatRange(min=0), default=300, show_default=True,
+              help="Milliseconds to wait after the last edit before re-analyzing a document.")
+def lsp(debounce):
+    """
+    Run a Language Server Protocol server on stdin/stdout for editor integration.
+    """
+    from .lsp import serve_stdio
+    serve_stdio(debounce / 1000)
+
 
+def finish(total_issues):
     if total_issues > 0:
         console.print(f"\n[bold red] Found {total_issues} performance/memory issues.[/bold red]")
         exit(1)
@@ -107,34 +300,172 @@ def main(path, fix):
         console.print("\n[bold green] Clean code! Good job.[/bold green]")
         exit(0)
 
-def print_report(file_path, issues, cell_mapping=None, file_content_lines=None):
-    table = Table(title=f"Analyzing: {file_path}")
-
-    table.add_column("Rule", style="green")
-    table.add_column("Line", justify="right", style="cyan", no_wrap=True)
-    table.add_column("Code", style="magenta", overflow="fold")
-    table.add_column("Severity", style="bold")
-    table.add_column("Message", style="white")
-
-    for issue in issues:
-        severity_style = "red" if issue.severity == "CRITICAL" else "yellow"
-        
-        line_display = str(issue.line)
-        if cell_mapping and issue.line in cell_mapping:
-            cell_idx = cell_mapping[issue.line]
-            line_display = f"Cell {cell_idx + 1} : {issue.line}" 
-        code_snippet = ""
-        if file_content_lines and 0 <= issue.line - 1 < len(file_content_lines):
-            raw_code = file_content_lines[issue.line - 1].strip()
-            syntax = Syntax(raw_code, "python", theme="monokai", line_numbers=False)
-            code_snippet = syntax
-
-        table.add_row(
-            issue.code,
-            line_display,
-            code_snippet if code_snippet else "",
-            f"[{severity_style}]{issue.severity}[/{severity_style}]",
-            issue.message
-        )
-
-    console.print(table)
\ No newline at end of file
+def size_option(value):
+    if value is None:
+        return None
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--max-file-size'")
+
+
+def report_skipped(skipped):
+    """Lists the files that were not analyzed, and why, after the report."""
+    if not skipped:
+        return
+    console.print(f"\n[bold yellow]Skipped {len(skipped)} file(s):[/bold yellow]")
+    for result in sorted(skipped, key=lambda r: r.path):
+        console.print(f"  {result.path}: {result.skipped}", markup=False, highlight=False, soft_wrap=True)
+
+
+def report_stats(stats, wall_time, show, stats_file):
+    if stats_file:
+        with open(stats_file, "w", encoding="utf-8") as f:
+            json.dump(stats.to_json(wall_time), f, indent=2)
+            f.write("\n")
+    if not show:
+        return
+
+    from rich.table import Table
+
+    reused = f", {stats.cells_reused} notebook cells reused" if stats.cells_reused else ""
+    console.print(f"\n{stats.files} files read ({stats.bytes_read / 1e6:.2f} MB), {stats.skipped_by_prefilter} "
+                  f"skipped by the prefilter{reused}, {wall_time:.3f} s wall time.")
+    phases = Table(title="Phases")
+    phases.add_column("Phase", style="cyan")
+    phases.add_column("Seconds", justify="right")
+    for phase in PHASES:
+        if phase in stats.phases:
+            phases.add_row(phase, f"{stats.phases[phase]:.4f}")
+    console.print(phases)
+
+    rules = Table(title="Rules")
+    rules.add_column("Rule", style="green")
+    rules.add_column("Invocations", justify="right")
+    rules.add_column("Hits", justify="right")
+    rules.add_column("Seconds", justify="right")
+    for code, (calls, hits, seconds) in sorted(stats.rules.items(), key=lambda item: -item[1][2]):
+        rules.add_row(code, str(int(calls)), str(int(hits)), f"{seconds:.4f}")
+    console.print(rules)
+
+
+def watch_paths(paths, engine, discoverer, resolver, cache, results, reporter):
+    """
+    Re-lints files as they change until interrupted, reporting only the
+    issues each change added or resolved. ``results`` holds the latest
+    result per absolute path; unchanged files are never re-analyzed.
+    Returns the number of issues left.
+    """
+    from .watch import diff_issues, make_watcher, relevant_changes
+
+    watcher = make_watcher(discoverer, paths)
+    roots = [os.path.abspath(p) for p in paths if os.path.isdir(p)]
+    console.print(f"\n[bold blue]Watching {len(results)} files for changes (Ctrl-C to stop)...[/bold blue]")
+    try:
+        while True:
+            to_lint, deleted = relevant_changes(watcher.wait(), set(results), roots, discoverer)
+            for path in deleted:
+                del results[path]
+            if not to_lint and not deleted:
+                continue
+
+            jobs, tokens, fresh = [], {}, []
+            for path in to_lint:
+                display_path = results[path].path if path in results else os.path.relpath(path)
+                config = resolver.for_path(display_path)
+                if cache is not None:
+                    result, tokens[display_path] = cache.lookup(display_path, config)
+                    if result is not None:
+                        fresh.append(result)
+                        continue
+                jobs.append((display_path, config))
+            batch_func = analyze_batch if cache is None else functools.partial(analyze_batch, cell_cache=cache.cells)
+            for result in engine.run(jobs, batch_func):
+                if cache is not None:
+                    cache.store(tokens.pop(result.path, None), result)
+                fresh.append(result)
+
+            for result in sorted(fresh, key=lambda r: r.path):
+                previous = results.get(os.path.abspath(result.path))
+                added, resolved = diff_issues(previous.issues if previous else [], result.issues)
+                results[os.path.abspath(result.path)] = result
+                if result.skipped is not None:
+                    console.print(f"{result.path}: skipped, {result.skipped}", style="yellow", markup=False)
+                if added:
+                    reporter.report(result.path, added, result.cell_mapping)
+                if resolved:
+                    console.print(f"[green]{result.path}: {resolved} issue(s) resolved.[/green]")
+            total = sum(len(r.issues) for r in results.values())
+            console.print(f"[dim]{len(deleted)} removed, {len(fresh)} re-checked; "
+                          f"{total} issues in {len(results)} files.[/dim]")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return sum(len(r.issues) for r in results.values())
+
+
+def changed_files_under(paths, ref, staged, resolver):
+    """Changed files below ``paths`` that are not excluded by configuration, and their changed lines."""
+    scopes = [os.path.realpath(p) for p in paths]
+    # git reports the whole repository at once: ask once per repository,
+    # not once per path (pre-commit passes every staged file).
+    worktrees = {}
+    for scope in scopes:
+        cwd = scope if os.path.isdir(scope) else os.path.dirname(scope)
+        worktrees.setdefault(find_worktree(cwd) or cwd, cwd)
+    changes = {}
+    for cwd in worktrees.values():
+        try:
+            changes.update(changed_files(ref, staged, cwd=cwd))
+        except GitError as e:
+            raise click.UsageError(f"git: {e}")
+
+    discoverer = FileDiscoverer(resolver)
+    changes = {
+        p: ranges for p, ranges in changes.items()
+        if any(p == scope or p.startswith(scope + os.sep) for scope in scopes)
+        and not discoverer.is_excluded(p)
+    }
+    return sorted(changes), changes
+
+
+def analyze_stdin(stdin_filename, resolver):
+    """Lints source read from stdin in-process; ``stdin_filename`` names it and selects its config."""
+    display_name = stdin_filename or "-"
+    content = click.get_text_stream('stdin').read()
+    config = resolver.for_path(stdin_filename or os.getcwd())
+
+    if display_name.endswith(".ipynb"):
+        try:
+            code_cells = read_code_cells_string(content)
+        except ValueError:
+            return FileResult(display_name, [])
+        return analyze_notebook(code_cells, display_name, config)
+    return analyze_source(content, display_name, config)
+
+
+class NullProgress:
+    """Progress stand-in for non-interactive output, where a spinner would not be shown anyway."""
+
+    def add_task(self, description, **kwargs):
+        return None
+
+    def update(self, task, **kwargs):
+        pass
+
+
+def progress_spinner():
+    if not console.is_terminal:
+        return contextlib.nullcontext(NullProgress())
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console.get(),
+        transient=True
+    )
+
+
+def print_report(file_path, issues, cell_mapping=None):
+    TableReporter(console).report(file_path, issues, cell_mapping)
@@ -0,0 +1,155 @@
+import os
+import re
+from dataclasses import dataclass, replace
+from typing import Any, Dict, FrozenSet, Optional, Tuple, Union
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import toml as tomllib
+    except ImportError:
+        tomllib = None
+
+CONFIG_FILE = "pyproject.toml"
+
+
+@dataclass(frozen=True)
+class Config:
+    """Resolved ``[tool.pandas-linter]`` settings. Small and picklable, shipped to workers."""
+    ignore: FrozenSet[str] = frozenset()
+    # gitignore-style patterns, relative to the directory of ``source``.
+    exclude: Tuple[str, ...] = ()
+    # Per-file limits enforced by the workers; None means no limit. The size
+    # is that of the analyzed source: for notebooks, the code cells only.
+    max_file_size: Optional[int] = None
+    timeout: Optional[float] = None
+    source: Optional[str] = None
+
+    @property
+    def root(self) -> Optional[str]:
+        return os.path.dirname(self.source) if self.source else None
+
+
+DEFAULT_CONFIG = Config()
+
+
+def load_pyproject(config_path: str) -> Optional[dict]:
+    """
+    Returns the ``[tool.pandas-linter]`` table of ``config_path``, or None
+    when the file cannot be read or does not configure the linter.
+    """
+    if tomllib is None:
+        return None
+
+    try:
+        with open(config_path, "rb") as f:
+            if hasattr(tomllib, 'load'):
+                try:
+                    data = tomllib.load(f)
+                except TypeError:
+                    f.seek(0)
+                    import toml
+                    data = toml.loads(f.read().decode('utf-8'))
+            else:
+                return None
+    except Exception:
+        return None
+
+    section = data.get("tool", {}).get("pandas-linter")
+    return section if isinstance(section, dict) else None
+
+
+_SIZE = re.compile(r"\s*(\d+(?:\.\d+)?)\s*([kmg]?)i?b?\s*", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+
+
+def parse_size(value: Union[int, str]) -> int:
+    """Bytes in ``value``: an int, or a string such as ``"512KB"`` or ``"2M"``. Raises ValueError."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        size = value
+    else:
+        match = _SIZE.fullmatch(str(value))
+        if match is None:
+            raise ValueError(f"invalid size: {value!r}")
+        size = int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+    if size <= 0:
+        raise ValueError(f"size must be positive: {value!r}")
+    return size
+
+
+def _optional(table: dict, key: str, convert) -> Any:
+    # Invalid limits are ignored, like an unreadable pyproject.toml.
+    if table.get(key) is None:
+        return None
+    try:
+        value = convert(table[key])
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def config_from_table(table: dict, source: Optional[str] = None) -> Config:
+    return Config(
+        ignore=frozenset(table.get("ignore", [])),
+        exclude=tuple(table.get("exclude", [])),
+        max_file_size=_optional(table, "max-file-size", parse_size),
+        timeout=_optional(table, "timeout", float),
+        source=source,
+    )
+
+
+class ConfigResolver:
+    """
+    Finds the configuration that applies to a file: the nearest
+    ``pyproject.toml`` with a ``[tool.pandas-linter]`` table, searching from
+    the file's directory upwards. Results are memoized per directory, so
+    each ``pyproject.toml`` is parsed at most once per resolver.
+    ``overrides`` (e.g. from command-line options) replace the matching
+    fields of every resolved configuration.
+    """
+
+    def __init__(self, default: Config = DEFAULT_CONFIG, overrides: Optional[Dict[str, Any]] = None):
+        self.overrides = {k: v for k, v in (overrides or {}).items() if v is not None}
+        self.default = replace(default, **self.overrides)
+        self._by_directory: Dict[str, Config] = {}
+
+    def for_path(self, path: str) -> Config:
+        path = os.path.abspath(path)
+        directory = path if os.path.isdir(path) else os.path.dirname(path)
+        return self.for_directory(directory)
+
+    def for_directory(self, directory: str) -> Config:
+        visited = []
+        config = None
+        current = directory
+        while True:
+            config = self._by_directory.get(current)
+            if config is not None:
+                break
+            visited.append(current)
+
+            candidate = os.path.join(current, CONFIG_FILE)
+            if os.path.isfile(candidate):
+                table = load_pyproject(candidate)
+                if table is not None:
+                    config = replace(config_from_table(table, candidate), **self.overrides)
+                    break
+
+            parent = os.path.dirname(current)
+            if parent == current:
+                config = self.default
+                break
+            current = parent
+
+        for seen in visited:
+            self._by_directory[seen] = config
+        return config
+
+
+_default_resolver = ConfigResolver()
+
+
+def resolve_config(path: str = ".") -> Config:
+    """Resolves the configuration for ``path`` using a process-wide memoized resolver."""
+    return _default_resolver.for_path(path)
@@ -0,0 +1,201 @@
+import json
+import os
+import socket
+import socketserver
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import ConfigResolver
+from .discovery import discover_files
+from .engine import Engine, FileResult
+
+# Requests and responses are single lines of JSON.
+ENCODING = "utf-8"
+CONNECT_TIMEOUT = 0.5
+
+
+def default_socket_path() -> str:
+    """
+    ``$XDG_RUNTIME_DIR/pandas-lint.sock`` when set: that directory belongs
+    to the user alone. Otherwise a per-user name in the temp directory.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "pandas-lint.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"pandas-lint-{uid}.sock")
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening on the socket."""
+
+
+def send_request(request: dict, socket_path: Optional[str] = None,
+                 timeout: Optional[float] = None) -> dict:
+    """Sends one request to the daemon and returns its response."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailable("Unix domain sockets are not supported on this platform")
+    socket_path = socket_path or default_socket_path()
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(socket_path)
+    except OSError as e:
+        raise DaemonUnavailable(str(e))
+
+    with sock:
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(request).encode(ENCODING) + b"\n")
+        with sock.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise DaemonUnavailable("The daemon closed the connection")
+    response = json.loads(line.decode(ENCODING))
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response
+
+
+def lint_via_daemon(paths: Iterable[str], socket_path: Optional[str] = None) -> List[FileResult]:
+    """Lints ``paths`` on a running daemon. Raises DaemonUnavailable when there is none."""
+    response = send_request(
+        {"op": "lint", "paths": [os.path.abspath(p) for p in paths]}, socket_path
+    )
+    return [FileResult.from_json(data) for data in response["results"]]
+
+
+class LintDaemon:
+    """
+    Keeps the rule registry, resolved configuration, a warm worker pool and
+    the results of unchanged files in memory, and answers lint requests.
+    """
+
+    def __init__(self, jobs: Optional[int] = None):
+        self.engine = Engine(jobs)
+        self.resolver = ConfigResolver()
+        self._results: Dict[str, Tuple[tuple, FileResult]] = {}
+        self._config_stamps: Dict[str, Optional[int]] = {}
+
+    def close(self):
+        self.engine.close()
+
+    def _signature(self, file_path: str, config) -> Optional[tuple]:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, config
+
+    def _refresh_configs(self):
+        """Forgets resolved configuration when a pyproject.toml it came from changed."""
+        for source, stamp in self._config_stamps.items():
+            try:
+                current = os.stat(source).st_mtime_ns
+            except OSError:
+                current = None
+            if current != stamp:
+                self.reload()
+                return
+
+    def reload(self):
+        self.resolver = ConfigResolver()
+        self._results.clear()
+        self._config_stamps.clear()
+
+    def lint(self, paths: List[str]) -> List[FileResult]:
+        self._refresh_configs()
+        results = []
+        pending = []
+        signatures = {}
+        for file_path in discover_files(paths, self.resolver):
+            config = self.resolver.for_path(file_path)
+            if config.source and config.source not in self._config_stamps:
+                self._config_stamps[config.source] = os.stat(config.source).st_mtime_ns
+            signature = self._signature(file_path, config)
+            cached = self._results.get(file_path)
+            if cached is not None and signature is not None and cached[0] == signature:
+                results.append(cached[1])
+            else:
+                signatures[file_path] = signature
+                pending.append((file_path, config))
+
+        for result in self.engine.run(pending):
+            signature = signatures.get(result.path)
+            if signature is not None:
+                self._results[result.path] = (signature, result)
+            else:
+                self._results.pop(result.path, None)
+            results.append(result)
+        self._forget_missing(paths, {result.path for result in results})
+        return results
+
+    def _forget_missing(self, paths: List[str], seen: set):
+        """Drops results of files under ``paths`` that were not found this time: deleted, renamed or excluded."""
+        scopes = [os.path.join(p, "") if os.path.isdir(p) else p for p in paths]
+        for file_path in [p for p in self._results if p not in seen]:
+            if any(file_path == scope or file_path.startswith(scope) for scope in scopes) \
+                    or not os.path.exists(file_path):
+                del self._results[file_path]
+
+    def handle(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "lint":
+            results = self.lint(request.get("paths", []))
+            return {"results": [r.to_json() for r in results]}
+        if op == "reload":
+            self.reload()
+            return {"ok": True}
+        if op == "shutdown":
+            return {"ok": True}
+        return {"error": f"Unknown request: {op!r}"}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line.decode(ENCODING))
+            response = self.server.lint_daemon.handle(request)
+        except Exception as e:
+            request, response = {}, {"error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response).encode(ENCODING) + b"\n")
+        if request.get("op") == "shutdown":
+            self.server.shutdown_requested = True
+
+
+def serve(socket_path: Optional[str] = None, jobs: Optional[int] = None):
+    """Runs the daemon in the foreground until a shutdown request arrives."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailable("Unix domain sockets are not supported on this platform")
+    socket_path = socket_path or default_socket_path()
+
+    if os.path.exists(socket_path):
+        try:
+            send_request({"op": "ping"}, socket_path, timeout=CONNECT_TIMEOUT)
+        except (DaemonUnavailable, OSError, ValueError):
+            os.unlink(socket_path)
+        else:
+            raise RuntimeError(f"A daemon is already listening on {socket_path}")
+
+    daemon = LintDaemon(jobs)
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(socket_path, _RequestHandler)
+    finally:
+        os.umask(old_umask)
+    server.lint_daemon = daemon
+    server.shutdown_requested = False
+    try:
+        while not server.shutdown_requested:
+            server.handle_request()
+    finally:
+        server.server_close()
+        daemon.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
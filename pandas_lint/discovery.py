@@ -0,0 +1,281 @@
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Set, Tuple
+
+from .config import ConfigResolver
+
+SOURCE_SUFFIXES = (".py", ".ipynb")
+
+# Directories that never contain code worth linting.
+DEFAULT_EXCLUDES = frozenset({
+    ".git", ".hg", ".svn", ".bzr",
+    ".venv", "venv", ".tox", ".nox", ".eggs",
+    "__pycache__", ".mypy_cache", ".pytest_cache", ".ruff_cache", ".pandas_lint_cache",
+    ".ipynb_checkpoints", "node_modules", "build", "dist", "site-packages",
+})
+
+# Marker of a virtualenv, whatever its directory is called.
+VENV_MARKER = "pyvenv.cfg"
+
+
+def _translate(pattern: str) -> str:
+    """Translates one gitignore glob into a regular expression body."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(pattern[i]))
+                i += 1
+                continue
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreSpec:
+    """
+    A list of gitignore-style patterns anchored at ``base``. Supports
+    negation (``!``), directory-only patterns (trailing ``/``), anchoring
+    (a ``/`` anywhere but the end) and ``*``, ``?``, ``[...]``, ``**``.
+    """
+
+    def __init__(self, base: str, patterns: Iterable[str]):
+        self.base = base
+        self.rules: List[Tuple[Pattern, bool, bool, bool]] = []
+        for raw in patterns:
+            line = raw.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            line = line.lstrip("/")
+            regex = re.compile(_translate(line) + r"\Z", re.DOTALL)
+            self.rules.append((regex, negated, dir_only, anchored))
+
+    @classmethod
+    def from_file(cls, path: str) -> Optional["IgnoreSpec"]:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                spec = cls(os.path.dirname(path), f)
+        except OSError:
+            return None
+        return spec if spec.rules else None
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by a negation, None if no pattern applies."""
+        rel = os.path.relpath(path, self.base).replace(os.sep, "/")
+        if rel.startswith("../"):
+            return None
+        name = rel.rsplit("/", 1)[-1]
+        result = None
+        for regex, negated, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel if anchored else name):
+                result = not negated
+        return result
+
+
+def _is_ignored(specs: Iterable[IgnoreSpec], path: str, is_dir: bool) -> bool:
+    ignored = False
+    for spec in specs:
+        result = spec.match(path, is_dir)
+        if result is not None:
+            ignored = result
+    return ignored
+
+
+def _ancestor_gitignores(directory: str) -> List[IgnoreSpec]:
+    """The .gitignore files between the enclosing git work tree root and ``directory``."""
+    chain = []
+    current = directory
+    while True:
+        chain.append(current)
+        if os.path.exists(os.path.join(current, ".git")):
+            break
+        parent = os.path.dirname(current)
+        if parent == current:
+            return []
+        current = parent
+
+    specs = []
+    for ancestor in reversed(chain[1:]):
+        spec = IgnoreSpec.from_file(os.path.join(ancestor, ".gitignore"))
+        if spec is not None:
+            specs.append(spec)
+    return specs
+
+
+class FileDiscoverer:
+    """
+    Streams the ``.py``/``.ipynb`` files under a set of paths.
+
+    Directories are read with ``os.scandir`` and pruned before descending:
+    default excludes, virtualenvs, ``.gitignore`` rules and the ``exclude``
+    patterns of the applicable ``[tool.pandas-linter]`` table. Files given
+    explicitly are always yielded. Every file is yielded once, even when
+    reachable through several symlinks.
+    """
+
+    def __init__(self, resolver: Optional[ConfigResolver] = None, use_gitignore: bool = True):
+        self.resolver = resolver or ConfigResolver()
+        self.use_gitignore = use_gitignore
+        self._seen: Set[Tuple[int, int]] = set()
+        # Every directory walked so far, e.g. for watchers to subscribe to.
+        self.directories: List[str] = []
+        self._exclude_specs: Dict[str, Optional[IgnoreSpec]] = {}
+
+    def _first_visit(self, st: os.stat_result) -> bool:
+        key = (st.st_dev, st.st_ino)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def _exclude_spec(self, directory: str) -> Optional[IgnoreSpec]:
+        config = self.resolver.for_directory(directory)
+        if not config.exclude or config.root is None:
+            return None
+        if config.source not in self._exclude_specs:
+            self._exclude_specs[config.source] = IgnoreSpec(config.root, config.exclude)
+        return self._exclude_specs[config.source]
+
+    def _excluded(self, path: str, is_dir: bool, specs: List[IgnoreSpec]) -> bool:
+        if is_dir and os.path.basename(path) in DEFAULT_EXCLUDES:
+            return True
+        exclude = self._exclude_spec(os.path.dirname(path))
+        if exclude is not None and exclude.match(path, is_dir):
+            return True
+        return self.use_gitignore and _is_ignored(specs, path, is_dir)
+
+    def is_excluded(self, path: str) -> bool:
+        """
+        Whether an explicitly listed file matches the ``exclude`` patterns of
+        its configuration, directly or through one of its parent directories.
+        """
+        path = os.path.abspath(path)
+        exclude = self._exclude_spec(os.path.dirname(path))
+        if exclude is None:
+            return False
+        current, is_dir = path, False
+        while current.startswith(exclude.base + os.sep):
+            if exclude.match(current, is_dir):
+                return True
+            current, is_dir = os.path.dirname(current), True
+        return False
+
+    def skips(self, path: str, root: str) -> bool:
+        """
+        Whether walking the directory ``root`` leaves out ``path`` below it,
+        through the same checks as ``discover``: e.g. a file that shows up
+        after the walk, as watchers see them.
+        """
+        root, path = os.path.abspath(root), os.path.abspath(path)
+        if path == root:
+            return False
+        specs = _ancestor_gitignores(root) if self.use_gitignore else []
+        parts = os.path.relpath(path, root).split(os.sep)
+        directory = root
+        for depth, part in enumerate(parts):
+            if directory != root and os.path.exists(os.path.join(directory, VENV_MARKER)):
+                return True
+            if self.use_gitignore:
+                spec = IgnoreSpec.from_file(os.path.join(directory, ".gitignore"))
+                if spec is not None:
+                    specs = specs + [spec]
+            directory = os.path.join(directory, part)
+            is_dir = depth < len(parts) - 1 or os.path.isdir(directory)
+            if self._excluded(directory, is_dir, specs):
+                return True
+        return False
+
+    def discover(self, paths: Iterable[str]) -> Iterator[str]:
+        for path in paths:
+            if os.path.isdir(path):
+                yield from self._walk(path)
+            else:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if self._first_visit(st):
+                    yield path
+
+    def _walk(self, root: str) -> Iterator[str]:
+        abs_root = os.path.abspath(root)
+        base_specs = _ancestor_gitignores(abs_root) if self.use_gitignore else []
+        stack: List[Tuple[str, List[IgnoreSpec]]] = [(root, base_specs)]
+
+        while stack:
+            directory, specs = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+
+            if any(e.name == VENV_MARKER for e in entries) and directory != root:
+                continue
+            self.directories.append(os.path.abspath(directory))
+            if self.use_gitignore and any(e.name == ".gitignore" for e in entries):
+                spec = IgnoreSpec.from_file(os.path.abspath(os.path.join(directory, ".gitignore")))
+                if spec is not None:
+                    specs = specs + [spec]
+
+            abs_directory = os.path.abspath(directory)
+            subdirs = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                abs_path = os.path.join(abs_directory, entry.name)
+                if is_dir:
+                    if not self._excluded(abs_path, True, specs):
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(SOURCE_SUFFIXES):
+                    if self._excluded(abs_path, False, specs):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    if self._first_visit(st):
+                        yield entry.path
+
+            for subdir in reversed(subdirs):
+                stack.append((subdir, specs))
+
+
+def discover_files(paths: Iterable[str], resolver: Optional[ConfigResolver] = None) -> Iterator[str]:
+    """Yields the files to lint under ``paths``, as they are found."""
+    return FileDiscoverer(resolver).discover(paths)
@@ -0,0 +1,590 @@
+import ast
+import concurrent.futures
+import contextlib
+import hashlib
+import itertools
+import os
+import signal
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from .analyzer import PandasVisitor
+from .config import Config
+from .notebook import CellMap, CodeCells, join_cells, read_code_cells
+from .prefetch import Buffer, prefetched, release
+from .rules import Issue, RuleRegistry
+from .stats import Stats
+
+# Below these limits a run is cheaper in-process than spawning a pool.
+IN_PROCESS_MAX_FILES = 8
+IN_PROCESS_MAX_BYTES = 512 * 1024
+
+# Upper bounds for a single batch shipped to a worker.
+BATCH_MAX_BYTES = 256 * 1024
+BATCH_MAX_FILES = 64
+
+Job = Tuple[str, Optional[Config]]
+BatchFunc = Callable[..., List["FileResult"]]
+
+
+class FileResult(NamedTuple):
+    """What a worker sends back for one file. Kept small: it crosses a process boundary."""
+    path: str
+    issues: List[Issue]
+    # Line -> cell index for notebooks; only set when there are issues to report.
+    cell_mapping: Optional[Mapping[int, int]] = None
+    # With --fix: whether the file was rewritten, or why fixing it failed.
+    fixed: bool = False
+    error: Optional[str] = None
+    # Why the file was not analyzed (too large, out of time, crashed); never cached.
+    skipped: Optional[str] = None
+
+    def to_json(self) -> dict:
+        data = {
+            "path": self.path,
+            "issues": [list(issue) for issue in self.issues],
+            "cell_spans": cell_spans(self.cell_mapping) if self.cell_mapping else None,
+        }
+        if self.skipped is not None:
+            data["skipped"] = self.skipped
+        return data
+
+    @classmethod
+    def from_json(cls, data: dict) -> "FileResult":
+        cell_mapping = None
+        if data.get("cell_spans"):
+            cell_mapping = CellMap(data["cell_spans"])
+        return cls(data["path"], [Issue(*fields) for fields in data.get("issues", [])], cell_mapping,
+                   skipped=data.get("skipped"))
+
+
+def cell_spans(cell_mapping: Mapping[int, int]) -> List[Tuple[int, int, int]]:
+    """``(start, end, cell)`` runs of a line -> cell mapping, for storage."""
+    if isinstance(cell_mapping, CellMap):
+        return cell_mapping.spans()
+    spans = CellMap()
+    for line, cell in sorted(cell_mapping.items()):
+        if spans.cells and spans.cells[-1] == cell and spans.ends[-1] == line:
+            spans.ends[-1] = line + 1
+        else:
+            spans.add(line, line + 1, cell)
+    return spans.spans()
+
+
+def attach_snippets(issues: List[Issue], source: str) -> List[Issue]:
+    """Copies the text of each flagged line into its issue, so the source itself stays in the worker."""
+    if not issues:
+        return issues
+    lines = source.splitlines()
+    return [
+        issue._replace(snippet=lines[issue.line - 1].strip()) if 0 <= issue.line - 1 < len(lines) else issue
+        for issue in issues
+    ]
+
+
+def _visit(content: str, config: Optional[Config], stats: Optional[Stats],
+           pandas_alias: str = 'pd') -> Tuple[List[Issue], str]:
+    """Issues in ``content`` with snippets attached, and the pandas alias in effect at its end."""
+    issues = []
+    if stats is not None:
+        stats.start()
+    try:
+        tree = ast.parse(content)
+        if stats is not None:
+            stats.lap("parse")
+        visitor = PandasVisitor(config, stats)
+        visitor.pandas_alias = pandas_alias
+        visitor.visit(tree)
+        issues = attach_snippets(visitor.issues, content)
+        pandas_alias = visitor.pandas_alias
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        # The parser raises RecursionError (or MemoryError) on inputs too
+        # deeply nested to build a tree from; such a file has no issues
+        # rather than taking the worker down.
+        pass
+    if stats is not None:
+        stats.lap("analyze")
+    return issues, pandas_alias
+
+
+def analyze_source(content: str, file_path: str, config: Optional[Config] = None,
+                   cell_mapping: Optional[Mapping[int, int]] = None, stats: Optional[Stats] = None) -> FileResult:
+    """Analyzes source code already in memory. ``file_path`` is only used for reporting."""
+    issues, _ = _visit(content, config, stats)
+    return FileResult(file_path, issues, cell_mapping if issues else None)
+
+
+def cell_key(source: str, pandas_alias: str, config: Optional[Config]) -> str:
+    """Cache key of a notebook cell: everything its issues depend on besides the rule set."""
+    ignored = ",".join(sorted(config.ignore)) if config is not None else ""
+    return hashlib.sha1(f"{ignored}\0{pandas_alias}\0{source}".encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def analyze_notebook(code_cells: CodeCells, file_path: str, config: Optional[Config] = None,
+                     stats: Optional[Stats] = None, cell_cache=None) -> FileResult:
+    """
+    Analyzes notebook code cell by cell, carrying the pandas alias from one
+    cell to the next as if they were a single module. A cell's results
+    depend only on its source and the incoming alias, so with a
+    ``cell_cache`` (see cache.CellCache) unchanged cells are not parsed
+    again and only edited cells, or cells after a changed import, are.
+    Issues are stored relative to their cell and moved to the cell's
+    offset in the concatenated source.
+    """
+    _, cell_mapping = join_cells(code_cells)
+    previous = cell_cache.load(file_path) if cell_cache is not None else {}
+    current = {}
+    issues: List[Issue] = []
+    alias = 'pd'
+    for (_, source), start in zip(code_cells, cell_mapping.starts):
+        key = cell_key(source, alias, config)
+        entry = previous.get(key)
+        if entry is None:
+            cell_issues, alias_out = _visit(source, config, stats, alias)
+            entry = [alias_out, [list(issue) for issue in cell_issues]]
+        elif stats is not None:
+            stats.cells_reused += 1
+        current[key] = entry
+        alias = entry[0]
+        issues.extend(Issue(line + start - 1, *fields) for line, *fields in entry[1])
+    if cell_cache is not None and current != previous:
+        cell_cache.save(file_path, current)
+    return FileResult(file_path, issues, cell_mapping if issues else None)
+
+
+def analyze_file(file_path, config=None, fix=False, stats=None, cell_cache=None, data=None) -> FileResult:
+    """
+    Analyzes a single file and returns a list of issues
+    This function must b top-level to be picklable for multiprocessing
+    config is the resolved Config for the file, shipped from the parent
+    With fix, the file is read once, fixed in memory, written back
+    atomically and the fixed source analyzed, so the issues reported are
+    those left on disk
+    stats, if given, collects timings and counters for --stats
+    cell_cache, if given, keeps per-cell results of notebooks
+    data, if given, is the file's content prefetched by the caller
+    (bytes or a memory map; see prefetch.fetch), counted in its stats
+    """
+    code_cells = None
+    max_size = config.max_file_size if config is not None else None
+    if stats is not None:
+        stats.files += 1
+        stats.start()
+    prefilter = RuleRegistry.get_prefilter(config.ignore if config is not None else ())
+    try:
+        if file_path.endswith(".ipynb"):
+            # Notebooks are scanned in place; outputs are never read into memory.
+            code_cells = read_code_cells(file_path, data)
+            if fix:
+                # Windows cannot replace a file that is still mapped.
+                release(data)
+            if stats is not None:
+                if data is None:
+                    stats.bytes_read += file_size(file_path)
+                stats.lap("parse")
+            if max_size is not None:
+                code_size = sum(len(source) for _, source in code_cells)
+                if code_size > max_size:
+                    return FileResult(file_path, [], skipped=too_large(code_size, max_size))
+            may_match = prefilter is None or any(prefilter.may_match_text(source) for _, source in code_cells)
+            content = ""
+        else:
+            if data is not None:
+                if max_size is not None and len(data) > max_size:
+                    return FileResult(file_path, [], skipped=too_large(len(data), max_size))
+                # A memory map is only valid until the next file is requested,
+                # and Windows cannot replace a file that is still mapped.
+                mapped, data = data, bytes(data)
+                if fix:
+                    release(mapped)
+            else:
+                with open(file_path, "rb") as f:
+                    if max_size is not None:
+                        size = os.fstat(f.fileno()).st_size
+                        if size > max_size:
+                            return FileResult(file_path, [], skipped=too_large(size, max_size))
+                    data = f.read()
+                if stats is not None:
+                    stats.bytes_read += len(data)
+                    stats.lap("read")
+            # Files in which no rule could match are never decoded or parsed.
+            may_match = prefilter is None or prefilter.may_match(data)
+            content = data.decode("utf-8") if may_match else ""
+        if not may_match:
+            if stats is not None:
+                stats.skipped_by_prefilter += 1
+                stats.lap("prefilter")
+            return FileResult(file_path, [])
+        if stats is not None:
+            stats.lap("prefilter")
+    except (OSError, ValueError):
+        return FileResult(file_path, [])
+
+    if code_cells is not None:
+        result = analyze_notebook(code_cells, file_path, config, stats, cell_cache)
+        if fix:
+            if stats is not None:
+                stats.start()
+            result = fix_notebook_cells(result, config, cell_cache)
+            if stats is not None:
+                stats.lap("fix")
+        return result
+    result = analyze_source(content, file_path, config, None, stats)
+    if fix:
+        if stats is not None:
+            stats.start()
+        result = fix_source(content, result, config)
+        if stats is not None:
+            stats.lap("fix")
+    return result
+
+
+def too_large(size: int, limit: int) -> str:
+    return f"{size} bytes of source, over the {limit} byte limit"
+
+
+class FileTimeout(BaseException):
+    """
+    Raised by the SIGALRM handler of ``time_budget``. A BaseException, so
+    the ``except Exception`` of the fixer and the rules cannot swallow it.
+    """
+
+
+@contextlib.contextmanager
+def time_budget(seconds: Optional[float]):
+    """
+    Raises FileTimeout in the block once ``seconds`` have passed. Uses
+    ``setitimer``, so it is a no-op without a limit, on platforms without
+    it and outside the main thread (where signals cannot be handled). A
+    timer the process had set is suspended for the block and restored.
+    """
+    if not seconds or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expire(signum, frame):
+        raise FileTimeout()
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    # The host application's own timer, if any, is put back afterwards;
+    # if it fell due meanwhile it fires right after the block.
+    delay, interval = signal.setitimer(signal.ITIMER_REAL, seconds)
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        if delay:
+            signal.setitimer(signal.ITIMER_REAL, max(delay - (time.monotonic() - started), 1e-6), interval)
+
+
+def analyze_guarded(file_path, config=None, fix=False, stats=None, cell_cache=None, data=None) -> FileResult:
+    """
+    analyze_file within the time budget of ``config``. A file that runs
+    out of time or makes the analysis fail unexpectedly is reported as
+    skipped, with the reason, instead of failing the whole batch.
+    """
+    timeout = config.timeout if config is not None else None
+    try:
+        with time_budget(timeout):
+            return analyze_file(file_path, config, fix, stats, cell_cache, data)
+    except FileTimeout:
+        return FileResult(file_path, [], skipped=f"analysis took longer than {timeout:g} s")
+    except Exception as e:
+        return FileResult(file_path, [], skipped=f"internal error: {type(e).__name__}: {e}")
+
+
+def fixable_codes(config: Optional[Config]) -> FrozenSet[str]:
+    """Issue codes a fix can rewrite under ``config``; files without them are never parsed by libcst."""
+    return RuleRegistry.get_fixable(config.ignore if config is not None else ())
+
+
+def fix_source(content: str, result: FileResult, config: Optional[Config] = None) -> FileResult:
+    """
+    Applies the auto-fixes to a file whose analysis is ``result`` and
+    returns the analysis of the fixed source.
+
+    libcst is slow, so it only runs when the analysis found an issue a
+    rule can fix.
+    """
+    fixable = fixable_codes(config)
+    if not any(issue.code in fixable for issue in result.issues):
+        return result
+    # libcst takes about as long to import as a whole lint run; only load it when a file needs fixing.
+    from .fixer import fix_code, write_atomic
+
+    try:
+        new_content = fix_code(content, config.ignore if config is not None else ())
+        if new_content == content:
+            return result
+        write_atomic(result.path, new_content)
+    except Exception as e:
+        return result._replace(error=str(e))
+    return analyze_source(new_content, result.path, config)._replace(fixed=True)
+
+
+def fix_notebook_cells(result: FileResult, config: Optional[Config] = None, cell_cache=None) -> FileResult:
+    """
+    Same as fix_source for a notebook: only the cells with a fixable issue
+    are fixed and rewritten in place, then the notebook is analyzed again.
+    """
+    fixable = fixable_codes(config)
+    cells = {
+        result.cell_mapping[issue.line] for issue in result.issues
+        if issue.code in fixable and result.cell_mapping is not None and issue.line in result.cell_mapping
+    }
+    if not cells:
+        return result
+    from .fixer import fix_notebook
+
+    try:
+        if not fix_notebook(result.path, cells, config.ignore if config is not None else ()):
+            return result
+        code_cells = read_code_cells(result.path)
+    except Exception as e:
+        return result._replace(error=str(e))
+    return analyze_notebook(code_cells, result.path, config, cell_cache=cell_cache)._replace(fixed=True)
+
+
+def analyze_batch(jobs: Sequence[Job], stats: Optional[Stats] = None, cell_cache=None,
+                  buffers: Optional[Sequence[Optional[Buffer]]] = None) -> List[FileResult]:
+    """
+    Analyzes a batch of files in one worker round trip, reading ahead while
+    each is analyzed. ``buffers``, if given, are the jobs' files already
+    loaded by the caller's own prefetch.
+    """
+    return [
+        analyze_guarded(file_path, config, stats=stats, cell_cache=cell_cache, data=data)
+        for (file_path, config), data in with_buffers(jobs, buffers, stats)
+    ]
+
+
+def fix_batch(jobs: Sequence[Job], stats: Optional[Stats] = None, cell_cache=None,
+              buffers: Optional[Sequence[Optional[Buffer]]] = None) -> List[FileResult]:
+    """Fixes, then analyzes, a batch of files in one worker round trip."""
+    return [
+        analyze_guarded(file_path, config, fix=True, stats=stats, cell_cache=cell_cache, data=data)
+        for (file_path, config), data in with_buffers(jobs, buffers, stats)
+    ]
+
+
+def with_buffers(jobs: Sequence[Job], buffers: Optional[Sequence[Optional[Buffer]]],
+                 stats: Optional[Stats]) -> Iterable[Tuple[Job, Optional[Buffer]]]:
+    return prefetched(jobs, stats) if buffers is None else zip(jobs, buffers)
+
+
+def profiled_batch(batch_func: BatchFunc, jobs: Sequence[Job]) -> Tuple[List[FileResult], Stats, float]:
+    """Runs ``batch_func`` collecting Stats; also returns when the results were sent, to time the transfer."""
+    stats = Stats()
+    results = batch_func(jobs, stats=stats)
+    return results, stats, time.time()
+
+
+def init_worker():
+    """Pool initializer: imports the rule modules and builds the dispatch table once per worker."""
+    from . import rules  # noqa: F401
+    RuleRegistry.get_dispatch()
+
+
+def file_size(file_path: str) -> int:
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def iter_batches(sized_jobs: Iterable[Tuple[Job, int]],
+                 max_bytes: int = BATCH_MAX_BYTES, max_files: int = BATCH_MAX_FILES) -> Iterator[List[Job]]:
+    """
+    Groups a stream of ``(job, size)`` pairs into batches of at most
+    ``max_bytes`` (a larger file gets a batch of its own) or ``max_files``.
+    """
+    current: List[Job] = []
+    current_bytes = 0
+    for job, size in sized_jobs:
+        if current and (current_bytes + size > max_bytes or len(current) >= max_files):
+            yield current
+            current, current_bytes = [], 0
+        current.append(job)
+        current_bytes += size
+    if current:
+        yield current
+
+
+class Engine:
+    """
+    Runs analysis jobs either in-process or on a process pool.
+
+    Small runs (few files, few bytes) or ``jobs=1`` stay in the current
+    process. Larger runs are split into byte-sized batches as jobs arrive
+    and results are yielded as each batch completes. The pool is created
+    lazily and reused across ``run`` calls until ``close``. With ``stats``,
+    workers send their counters back with each batch and they are merged
+    into it. When a worker dies, the pool is replaced and the files it
+    took down with it are run again one per task, so only the file that
+    kills a worker is lost (reported as skipped).
+    """
+
+    def __init__(self, jobs: Optional[int] = None,
+                 in_process_max_files: int = IN_PROCESS_MAX_FILES,
+                 in_process_max_bytes: int = IN_PROCESS_MAX_BYTES,
+                 batch_max_bytes: int = BATCH_MAX_BYTES,
+                 stats: Optional[Stats] = None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.stats = stats
+        self.in_process_max_files = in_process_max_files
+        self.in_process_max_bytes = in_process_max_bytes
+        self.batch_max_bytes = batch_max_bytes
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _discard_executor(self):
+        """Drops a broken pool; the next submission starts a fresh one."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    @property
+    def executor(self) -> "concurrent.futures.ProcessPoolExecutor":
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.jobs, initializer=init_worker
+            )
+        return self._executor
+
+    def _submit(self, batch_func: BatchFunc, batch: List[Job]) -> concurrent.futures.Future:
+        if self.stats is None:
+            return self.executor.submit(batch_func, batch)
+        return self.executor.submit(profiled_batch, batch_func, batch)
+
+    def _results(self, future: concurrent.futures.Future) -> List[FileResult]:
+        if self.stats is None:
+            return future.result()
+        results, stats, sent = future.result()
+        self.stats.merge(stats)
+        # Pickling, the pipe, unpickling, and any wait until the parent got to it.
+        self.stats.add_time("transfer", max(0.0, time.time() - sent))
+        return results
+
+    def run(self, jobs: Iterable[Job], batch_func: BatchFunc = analyze_batch) -> Iterator[FileResult]:
+        """
+        Yields one result per job, in completion order. ``jobs`` may be a
+        lazy stream: work is handed to the pool while it is still being
+        produced. ``batch_func`` is the top-level function run on each
+        batch, ``analyze_batch`` or ``fix_batch``.
+        """
+        if self.jobs <= 1:
+            yield from self._run_in_process(jobs, batch_func)
+            return
+
+        sized_jobs = ((job, file_size(job[0])) for job in jobs)
+
+        head: List[Tuple[Job, int]] = []
+        head_bytes = 0
+        small = True
+        for job, size in sized_jobs:
+            head.append((job, size))
+            head_bytes += size
+            if len(head) > self.in_process_max_files or head_bytes > self.in_process_max_bytes:
+                small = False
+                break
+
+        if small:
+            yield from self._run_in_process((job for job, _ in itertools.chain(head, sized_jobs)), batch_func)
+            return
+
+        pending: Dict[concurrent.futures.Future, List[Job]] = {}
+        for batch in iter_batches(itertools.chain(head, sized_jobs), self.batch_max_bytes):
+            try:
+                pending[self._submit(batch_func, batch)] = batch
+            except concurrent.futures.BrokenExecutor:
+                # A worker died while jobs were still coming in.
+                yield from self._recover(batch, pending, batch_func)
+                continue
+            for future in [future for future in pending if future.done()]:
+                if future in pending:
+                    yield from self._collect(future, pending, batch_func)
+
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future in pending:
+                    yield from self._collect(future, pending, batch_func)
+
+    def _run_in_process(self, jobs: Iterable[Job], batch_func: BatchFunc) -> Iterator[FileResult]:
+        """
+        Runs ``jobs`` in this process one file at a time, so results stream
+        out, with the whole job stream going through one prefetch: the next
+        files are read while the current one is analyzed.
+        """
+        for job, data in prefetched(jobs, self.stats):
+            yield from batch_func([job], stats=self.stats, buffers=[data])
+
+    def _collect(self, future: concurrent.futures.Future, pending: Dict[concurrent.futures.Future, List[Job]],
+                 batch_func: BatchFunc) -> List[FileResult]:
+        """Results of a completed batch, removed from ``pending``; recovers the run if its worker died."""
+        batch = pending.pop(future)
+        try:
+            return self._results(future)
+        except concurrent.futures.BrokenExecutor:
+            return self._recover(batch, pending, batch_func)
+
+    def _recover(self, batch: List[Job], pending: Dict[concurrent.futures.Future, List[Job]],
+                 batch_func: BatchFunc) -> List[FileResult]:
+        """
+        Results of ``batch`` and of every batch in ``pending``, emptied,
+        once the pool broke: the batches that had finished are kept, the
+        others run again on a fresh pool.
+        """
+        results: List[FileResult] = []
+        lost = list(batch)
+        for other in list(pending):
+            other_batch = pending.pop(other)
+            if other.done() and other.exception() is None:
+                results.extend(self._results(other))
+            else:
+                lost.extend(other_batch)
+        self._discard_executor()
+        results.extend(self._run_isolated(lost, batch_func))
+        return results
+
+    def _run_isolated(self, jobs: List[Job], batch_func: BatchFunc) -> List[FileResult]:
+        """
+        Runs ``jobs`` one file per task. If the pool breaks again, the files
+        not done yet are retried one at a time on a fresh pool, and a file
+        that kills its worker on its own is skipped.
+        """
+        results: List[FileResult] = []
+        futures = {}
+        retry = []
+        for job in jobs:
+            try:
+                futures[self._submit(batch_func, [job])] = job
+            except concurrent.futures.BrokenExecutor:
+                retry.append(job)
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results.extend(self._results(future))
+            except concurrent.futures.BrokenExecutor:
+                retry.append(futures[future])
+        if retry:
+            self._discard_executor()
+        for job in retry:
+            try:
+                results.extend(self._results(self._submit(batch_func, [job])))
+            except concurrent.futures.BrokenExecutor:
+                self._discard_executor()
+                results.append(FileResult(job[0], [], skipped="the worker process died while analyzing it"))
+        return results
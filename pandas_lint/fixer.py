@@ -1,50 +1,147 @@
+import os
+import tempfile
 import libcst as cst
-from libcst import matchers as m
-from typing import Optional, Union
+from libcst.metadata import MetadataWrapper, PositionProvider
+from typing import Iterable, List, NamedTuple, Optional
+
+from .notebook import cell_sources, replace_sources
+from .rules import RuleRegistry
+from .rules.base import FixTable
+
+# A fix that keeps producing rewritable code must not loop forever.
+MAX_FIX_PASSES = 10
+
 
 class PandasAutoFixer(cst.CSTTransformer):
     """
-    Transforms Pandas code to use more efficient accessors
+    Applies the fixes registered with the rules in a single traversal.
+    Calls are routed by the attribute they call (``obj.<attr>(...)``) to
+    the fixes registered for that name, so most nodes cost one lookup.
     Ref: https://github.com/Instagram/LibCST
     """
 
+    def __init__(self, fixers: Optional[FixTable] = None):
+        super().__init__()
+        self.fixers = RuleRegistry.get_fixers() if fixers is None else fixers
+        self.changes = 0
+
     def leave_Call(self, original_node: cst.Call, updated_node: cst.Call) -> cst.BaseExpression:
-        if m.matches(updated_node, m.Call(func=m.Attribute(attr=m.Name("apply")))):
-            if len(updated_node.args) == 1 and m.matches(updated_node.args[0].value, m.Lambda()):
-                lambda_node = updated_node.args[0].value
-                if m.matches(lambda_node.body, m.Call(func=m.Attribute(attr=m.Name("upper")))):
-                    return self._transform_to_accessor(updated_node.func.value, "str", "upper")
-                
-                if m.matches(lambda_node.body, m.Call(func=m.Attribute(attr=m.Name("lower")))):
-                    return self._transform_to_accessor(updated_node.func.value, "str", "lower")
-                     
-                if m.matches(lambda_node.body, m.Call(func=m.Attribute(attr=m.Name("strip")))):
-                    return self._transform_to_accessor(updated_node.func.value, "str", "strip")
-
-                if m.matches(lambda_node.body, m.Attribute()):
-                    attr_name = lambda_node.body.attr.value
-                    if attr_name in ['year', 'month', 'day', 'hour', 'minute', 'second']:
-                        return self._transform_to_accessor(updated_node.func.value, "dt", attr_name, is_method=False)
-                        
+        func = updated_node.func
+        if not isinstance(func, cst.Attribute):
+            return updated_node
+        for fix in self.fixers.get(func.attr.value, ()):
+            replacement = fix(updated_node)
+            if replacement is not None:
+                self.changes += 1
+                return replacement
         return updated_node
 
-    def _transform_to_accessor(self, df_node: cst.BaseExpression, accessor: str, method: str, is_method: bool = True) -> cst.BaseExpression:
-        acc = cst.Attribute(
-            value=df_node,
-            attr=cst.Name(accessor)
-        )
-        final_attr = cst.Attribute(
-            value=acc,
-            attr=cst.Name(method)
-        )
-        
-        if is_method:
-            return cst.Call(func=final_attr)
-        else:
-            return final_attr
-
-def fix_code(code: str) -> str:
+
+def write_atomic(path: str, content: str):
+    """Replaces ``path`` with ``content`` without ever leaving a partially written file behind."""
+    write_chunks_atomic(path, [content.encode("utf-8")])
+
+
+def write_chunks_atomic(path: str, chunks: Iterable[bytes]):
+    """
+    Same as write_atomic, streaming the new content from ``chunks``. A
+    symlink is written through: its target is the file replaced.
+    """
+    path = os.path.realpath(path)
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".pandas-lint-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def fix_code(code: str, ignored_codes: Iterable[str] = ()) -> str:
+    """
+    Applies every fix of the rules not in ``ignored_codes``, one traversal
+    at a time until a traversal changes nothing (a rewrite can expose
+    another one around it).
+    """
     tree = cst.parse_module(code)
-    transformer = PandasAutoFixer()
-    modified_tree = tree.visit(transformer)
-    return modified_tree.code
+    fixers = RuleRegistry.get_fixers(ignored_codes)
+    for _ in range(MAX_FIX_PASSES):
+        transformer = PandasAutoFixer(fixers)
+        tree = tree.visit(transformer)
+        if not transformer.changes:
+            break
+    return tree.code
+
+
+def fix_notebook(path: str, cells: Iterable[int], ignored_codes: Iterable[str] = ()) -> bool:
+    """
+    Fixes the code cells at indices ``cells`` of the notebook at ``path``
+    and replaces the file atomically. Only the sources that changed are
+    re-encoded; the rest of the file, outputs and metadata included, is
+    copied over byte for byte. Cells libcst cannot parse (e.g. with
+    IPython magics) are left alone. Returns whether anything changed.
+    """
+    # Read rather than mapped: Windows cannot replace a file that is mapped.
+    with open(path, "rb") as f:
+        buf = f.read()
+    fixed = {}
+    for index, source in cell_sources(buf, cells).items():
+        try:
+            new_source = fix_code(source, ignored_codes)
+        except cst.ParserSyntaxError:
+            continue
+        if new_source != source:
+            fixed[index] = new_source
+    if fixed:
+        write_chunks_atomic(path, replace_sources(buf, fixed))
+    return bool(fixed)
+
+
+class Fix(NamedTuple):
+    """A single rewrite: replace the text between (start_line, start_col) and (end_line, end_col).
+    Lines are 1-based, columns 0-based character offsets."""
+    start_line: int
+    start_col: int
+    end_line: int
+    end_col: int
+    replacement: str
+
+
+class _FixCollector(cst.CSTVisitor):
+    METADATA_DEPENDENCIES = (PositionProvider,)
+
+    def __init__(self, module: cst.Module, ignored_codes: Iterable[str] = ()):
+        self.module = module
+        self.fixer = PandasAutoFixer(RuleRegistry.get_fixers(ignored_codes))
+        self.fixes: List[Fix] = []
+
+    def visit_Call(self, node: cst.Call) -> Optional[bool]:
+        replacement = self.fixer.leave_Call(node, node)
+        if replacement is node:
+            return True
+        position = self.get_metadata(PositionProvider, node)
+        self.fixes.append(Fix(
+            position.start.line, position.start.column,
+            position.end.line, position.end.column,
+            self.module.code_for_node(replacement),
+        ))
+        return False
+
+
+def collect_fixes(code: str, ignored_codes: Iterable[str] = ()) -> List[Fix]:
+    """Lists the individual rewrites fix_code would make, with their source positions."""
+    module = cst.parse_module(code)
+    wrapper = MetadataWrapper(module, unsafe_skip_copy=True)
+    collector = _FixCollector(module, ignored_codes)
+    wrapper.visit(collector)
+    return collector.fixes
@@ -0,0 +1,115 @@
+import os
+import re
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+from .discovery import SOURCE_SUFFIXES
+
+# Inclusive (start, end) line ranges; None means "the whole file".
+LineRanges = Optional[List[Tuple[int, int]]]
+
+_HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def _git(args: List[str], cwd: str) -> str:
+    try:
+        completed = subprocess.run(
+            ["git", *args], cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            check=False,
+        )
+    except OSError as e:
+        raise GitError(f"Could not run git: {e}")
+    if completed.returncode != 0:
+        message = completed.stderr.decode("utf-8", "replace").strip()
+        raise GitError(message or f"git {' '.join(args)} failed")
+    return completed.stdout.decode("utf-8", "surrogateescape")
+
+
+def repository_root(cwd: str = ".") -> str:
+    return os.path.realpath(_git(["rev-parse", "--show-toplevel"], cwd).strip())
+
+
+def find_worktree(path: str) -> Optional[str]:
+    """
+    The nearest directory at or above ``path`` holding a ``.git`` entry,
+    found without running git; None when there is none (git may still
+    find a repository, e.g. through ``GIT_DIR``).
+    """
+    path = os.path.realpath(path)
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _diff_args(ref: Optional[str], staged: bool, cwd: str) -> List[str]:
+    if staged:
+        return ["--cached"]
+    if ref is None:
+        raise ValueError("Either ref or staged must be given")
+    # Compare the working tree against the point where the branch forked from ref.
+    base = _git(["merge-base", ref, "HEAD"], cwd).strip()
+    return [base]
+
+
+def _parse_hunks(diff: str, names: List[str]) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Maps each of ``names`` to the line ranges its hunks add. The file
+    blocks of ``diff`` come in the order of ``names``, taken from
+    ``--name-only -z`` with the same arguments: unlike the ``+++`` headers,
+    which git quotes or pads for unusual file names, those are verbatim.
+    """
+    ranges: Dict[str, List[Tuple[int, int]]] = {name: [] for name in names}
+    current = None
+    index = -1
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            index += 1
+            current = names[index] if index < len(names) else None
+        elif current is not None and line.startswith("@@"):
+            match = _HUNK_RE.match(line)
+            if match:
+                start = int(match.group(1))
+                count = int(match.group(2)) if match.group(2) is not None else 1
+                if count > 0:
+                    ranges[current].append((start, start + count - 1))
+    return ranges
+
+
+def changed_files(ref: Optional[str] = None, staged: bool = False, cwd: str = ".") -> Dict[str, LineRanges]:
+    """
+    Returns the ``.py``/``.ipynb`` files changed since ``ref`` (or staged in
+    the index) mapped to the line ranges added or modified in them.
+    Untracked files count as entirely changed when comparing against a
+    ref. Paths are absolute; deleted files are left out.
+    """
+    root = repository_root(cwd)
+    args = ["diff", "--no-color", "--no-ext-diff", "--diff-filter=ACMR", *_diff_args(ref, staged, root)]
+    names = _git([*args, "--name-only", "-z", "--"], root).split("\0")
+    diff = _git([*args, "-U0", "--src-prefix=a/", "--dst-prefix=b/", "--"], root)
+    changes: Dict[str, LineRanges] = dict(_parse_hunks(diff, [name for name in names if name]))
+
+    if not staged:
+        untracked = _git(["ls-files", "--others", "--exclude-standard", "-z"], root)
+        for rel_path in filter(None, untracked.split("\0")):
+            changes[rel_path] = None
+
+    result: Dict[str, LineRanges] = {}
+    for rel_path, ranges in changes.items():
+        path = os.path.join(root, rel_path)
+        if path.endswith(SOURCE_SUFFIXES) and os.path.isfile(path):
+            result[os.path.normpath(path)] = ranges
+    return result
+
+
+def line_in_ranges(line: int, ranges: LineRanges) -> bool:
+    if ranges is None:
+        return True
+    return any(start <= line <= end for start, end in ranges)
@@ -0,0 +1,419 @@
+import json
+import os
+import re
+import sys
+import threading
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from .analyzer import analyze_code
+from .config import Config, ConfigResolver
+from .rules import Issue, RuleRegistry
+
+DEFAULT_DEBOUNCE = 0.3
+
+SEVERITY = {"CRITICAL": 1, "WARNING": 2, "INFO": 3}
+
+CODE_CELL = 2
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+MESSAGE_TYPE_ERROR = 1
+
+
+def read_message(stream: BinaryIO) -> Optional[dict]:
+    """Reads one ``Content-Length`` framed JSON-RPC message, or None at end of stream."""
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            length = int(value.strip())
+    if length is None:
+        return None
+    return json.loads(stream.read(length).decode("utf-8"))
+
+
+def write_message(stream: BinaryIO, payload: dict):
+    body = json.dumps(payload).encode("utf-8")
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    stream.flush()
+
+
+def uri_to_path(uri: str) -> Optional[str]:
+    parsed = urlparse(uri)
+    if parsed.scheme not in ("file", "vscode-notebook-cell"):
+        return None
+    return unquote(parsed.path)
+
+
+def _utf16_len(text: str) -> int:
+    return sum(2 if ord(ch) > 0xFFFF else 1 for ch in text)
+
+
+def _char_index(line_text: str, utf16_units: int) -> int:
+    units = index = 0
+    while index < len(line_text) and units < utf16_units:
+        units += 2 if ord(line_text[index]) > 0xFFFF else 1
+        index += 1
+    return index
+
+
+_LINE_BREAK = re.compile(r"(\r\n|\r|\n)")
+
+
+def split_lines(text: str, keepends: bool = False) -> List[str]:
+    """
+    Like ``str.splitlines``, but only breaks lines where LSP does, at
+    ``\\n``, ``\\r\\n`` and ``\\r``: not at form feeds or ``\\u2028``.
+    """
+    parts = _LINE_BREAK.split(text)
+    lines = [parts[i] + (parts[i + 1] if keepends else "") for i in range(0, len(parts) - 1, 2)]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+
+def position_to_offset(text: str, position: dict) -> int:
+    lines = split_lines(text, keepends=True)
+    line = position["line"]
+    offset = sum(len(item) for item in lines[:line])
+    if line < len(lines):
+        offset += _char_index(lines[line], position["character"])
+    return offset
+
+
+def apply_change(text: str, change: dict) -> str:
+    """Applies one TextDocumentContentChangeEvent, full or ranged."""
+    if "range" not in change:
+        return change["text"]
+    start = position_to_offset(text, change["range"]["start"])
+    end = position_to_offset(text, change["range"]["end"])
+    return text[:start] + change["text"] + text[end:]
+
+
+def issue_to_diagnostic(issue: Issue, lines: List[str]) -> dict:
+    line_text = lines[issue.line - 1] if 0 < issue.line <= len(lines) else ""
+    # ast column offsets count UTF-8 bytes; LSP positions count UTF-16 units.
+    prefix = line_text.encode("utf-8")[:issue.col].decode("utf-8", "ignore")
+    start = _utf16_len(prefix)
+    end = max(start, _utf16_len(line_text.rstrip()))
+    return {
+        "range": {
+            "start": {"line": issue.line - 1, "character": start},
+            "end": {"line": issue.line - 1, "character": end},
+        },
+        "severity": SEVERITY.get(issue.severity, 3),
+        "code": issue.code,
+        "source": "pandas-lint",
+        "message": issue.message,
+    }
+
+
+class LanguageServer:
+    """
+    Minimal LSP server over stdio. Keeps open documents and notebooks in
+    memory and re-analyzes a document only after its edits settle for
+    ``debounce`` seconds. Notebook cells are analyzed one by one with the
+    pandas alias carried from cell to cell, so only edited cells (or cells
+    whose incoming alias changed) are re-run.
+    """
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO, debounce: float = DEFAULT_DEBOUNCE):
+        self.reader = reader
+        self.writer = writer
+        self.debounce = debounce
+        self.resolver = ConfigResolver()
+        self.documents: Dict[str, str] = {}
+        self.notebooks: Dict[str, List[Tuple[str, int]]] = {}
+        # cell uri -> (text, incoming alias, config, issues, outgoing alias)
+        self.cell_results: Dict[str, Tuple[str, str, Config, List[Issue], str]] = {}
+        self.published: Dict[str, List[Issue]] = {}
+        self.timers: Dict[str, threading.Timer] = {}
+        self.lock = threading.RLock()
+        self.analysis_lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.running = True
+        self.shutdown_requested = False
+
+    # -- transport --
+
+    def send(self, payload: dict):
+        payload["jsonrpc"] = "2.0"
+        with self.write_lock:
+            write_message(self.writer, payload)
+
+    def notify(self, method: str, params: dict):
+        self.send({"method": method, "params": params})
+
+    def serve(self):
+        while self.running:
+            message = read_message(self.reader)
+            if message is None:
+                break
+            self.dispatch(message)
+        with self.lock:
+            for timer in self.timers.values():
+                timer.cancel()
+
+    def dispatch(self, message: dict):
+        method = message.get("method")
+        handler = getattr(self, "on_" + (method or "").replace("/", "_").replace("$", "_"), None)
+        is_request = "id" in message
+        if handler is None:
+            if is_request:
+                self.send({"id": message["id"], "error": {"code": METHOD_NOT_FOUND, "message": f"Unknown method {method}"}})
+            return
+        try:
+            result = handler(message.get("params") or {})
+        except Exception as e:
+            # A malformed message must not take the server down with it.
+            # Handlers index params directly, so lookup errors mean bad params.
+            bad_params = isinstance(e, (KeyError, IndexError, TypeError, ValueError, AttributeError))
+            text = f"{method} failed: {type(e).__name__}: {e}"
+            if is_request:
+                code = INVALID_PARAMS if bad_params else INTERNAL_ERROR
+                self.send({"id": message["id"], "error": {"code": code, "message": text}})
+            else:
+                self.notify("window/logMessage", {"type": MESSAGE_TYPE_ERROR, "message": text})
+            return
+        if is_request:
+            self.send({"id": message["id"], "result": result})
+
+    # -- lifecycle --
+
+    def on_initialize(self, params: dict) -> dict:
+        options = params.get("initializationOptions") or {}
+        if "debounce" in options:
+            self.debounce = float(options["debounce"])
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": 2},
+                "notebookDocumentSync": {
+                    "notebookSelector": [{"notebook": "jupyter-notebook", "cells": [{"language": "python"}]}],
+                },
+                "codeActionProvider": {"codeActionKinds": ["quickfix", "source.fixAll"]},
+            },
+            "serverInfo": {"name": "pandas-lint"},
+        }
+
+    def on_initialized(self, params: dict):
+        pass
+
+    def on_shutdown(self, params: dict):
+        self.shutdown_requested = True
+        return None
+
+    def on_exit(self, params: dict):
+        self.running = False
+
+    # -- text documents --
+
+    def on_textDocument_didOpen(self, params: dict):
+        document = params["textDocument"]
+        with self.lock:
+            self.documents[document["uri"]] = document["text"]
+        self.schedule(document["uri"], delay=0)
+
+    def on_textDocument_didChange(self, params: dict):
+        uri = params["textDocument"]["uri"]
+        with self.lock:
+            text = self.documents.get(uri, "")
+            for change in params["contentChanges"]:
+                text = apply_change(text, change)
+            self.documents[uri] = text
+        self.schedule(uri)
+
+    def on_textDocument_didClose(self, params: dict):
+        uri = params["textDocument"]["uri"]
+        with self.lock:
+            self.documents.pop(uri, None)
+            self._cancel(uri)
+        self.publish(uri, [], [])
+
+    # -- notebooks --
+
+    def on_notebookDocument_didOpen(self, params: dict):
+        notebook = params["notebookDocument"]
+        with self.lock:
+            for cell in params.get("cellTextDocuments", []):
+                self.documents[cell["uri"]] = cell["text"]
+            self.notebooks[notebook["uri"]] = [(c["document"], c["kind"]) for c in notebook.get("cells", [])]
+        self.schedule(notebook["uri"], delay=0)
+
+    def on_notebookDocument_didChange(self, params: dict):
+        uri = params["notebookDocument"]["uri"]
+        cells_change = (params.get("change") or {}).get("cells") or {}
+        with self.lock:
+            cells = self.notebooks.setdefault(uri, [])
+            structure = cells_change.get("structure")
+            if structure:
+                array = structure["array"]
+                new_cells = [(c["document"], c["kind"]) for c in array.get("cells") or []]
+                removed = cells[array["start"]:array["start"] + array["deleteCount"]]
+                cells[array["start"]:array["start"] + array["deleteCount"]] = new_cells
+                for document in structure.get("didOpen") or []:
+                    self.documents[document["uri"]] = document["text"]
+                for cell_uri, _ in removed:
+                    if all(cell_uri != c for c, _ in cells):
+                        self.documents.pop(cell_uri, None)
+                        self.cell_results.pop(cell_uri, None)
+                        self.published.pop(cell_uri, None)
+            for data in cells_change.get("data") or []:
+                cells[:] = [(c, data["kind"] if c == data["document"] else k) for c, k in cells]
+            for content in cells_change.get("textContent") or []:
+                cell_uri = content["document"]["uri"]
+                text = self.documents.get(cell_uri, "")
+                for change in content["changes"]:
+                    text = apply_change(text, change)
+                self.documents[cell_uri] = text
+        self.schedule(uri)
+
+    def on_notebookDocument_didClose(self, params: dict):
+        uri = params["notebookDocument"]["uri"]
+        with self.lock:
+            self._cancel(uri)
+            cells = self.notebooks.pop(uri, [])
+            for cell_uri, _ in cells:
+                self.documents.pop(cell_uri, None)
+                self.cell_results.pop(cell_uri, None)
+        for cell_uri, _ in cells:
+            self.publish(cell_uri, [], [])
+
+    # -- analysis --
+
+    def _cancel(self, uri: str):
+        timer = self.timers.pop(uri, None)
+        if timer is not None:
+            timer.cancel()
+
+    def schedule(self, uri: str, delay: Optional[float] = None):
+        """(Re)starts the debounce timer of a document or notebook."""
+        with self.lock:
+            self._cancel(uri)
+            timer = threading.Timer(self.debounce if delay is None else delay, self._run, (uri,))
+            timer.daemon = True
+            self.timers[uri] = timer
+            timer.start()
+
+    def _run(self, uri: str):
+        with self.lock:
+            if self.timers.get(uri) is threading.current_thread():
+                del self.timers[uri]
+            is_notebook = uri in self.notebooks
+        with self.analysis_lock:
+            if is_notebook:
+                self.lint_notebook(uri)
+            else:
+                self.lint_document(uri)
+
+    def config_for(self, uri: str) -> Config:
+        path = uri_to_path(uri)
+        return self.resolver.for_path(path if path else os.getcwd())
+
+    def lint_document(self, uri: str):
+        with self.lock:
+            text = self.documents.get(uri)
+        if text is None:
+            return
+        try:
+            issues, _ = analyze_code(text, self.config_for(uri))
+        except (SyntaxError, ValueError, RecursionError):
+            issues = []
+        self.publish(uri, issues, split_lines(text))
+
+    def lint_notebook(self, uri: str):
+        with self.lock:
+            cells = [
+                (cell_uri, self.documents.get(cell_uri, ""))
+                for cell_uri, kind in self.notebooks.get(uri, [])
+                if kind == CODE_CELL
+            ]
+        config = self.config_for(uri)
+        alias = 'pd'
+        for cell_uri, text in cells:
+            cached = self.cell_results.get(cell_uri)
+            if cached is not None and cached[:3] == (text, alias, config):
+                issues, alias_out = cached[3], cached[4]
+            else:
+                try:
+                    issues, alias_out = analyze_code(text, config, alias)
+                except (SyntaxError, ValueError, RecursionError):
+                    issues, alias_out = [], alias
+                self.cell_results[cell_uri] = (text, alias, config, issues, alias_out)
+            if self.published.get(cell_uri) != issues:
+                self.publish(cell_uri, issues, split_lines(text))
+            alias = alias_out
+
+    def publish(self, uri: str, issues: List[Issue], lines: List[str]):
+        self.published[uri] = issues
+        self.notify("textDocument/publishDiagnostics", {
+            "uri": uri,
+            "diagnostics": [issue_to_diagnostic(issue, lines) for issue in issues],
+        })
+
+    # -- quick fixes --
+
+    def on_textDocument_codeAction(self, params: dict) -> List[dict]:
+        uri = params["textDocument"]["uri"]
+        with self.lock:
+            text = self.documents.get(uri)
+        if text is None:
+            return []
+        ignored = self.config_for(uri).ignore
+        fixable = RuleRegistry.get_fixable(ignored)
+        diagnostics = [
+            d for d in (params.get("context") or {}).get("diagnostics", [])
+            if d.get("source") == "pandas-lint" and d.get("code") in fixable
+        ]
+        only = (params.get("context") or {}).get("only")
+        if not diagnostics and not (only and "source.fixAll" in only):
+            return []
+
+        from .fixer import collect_fixes
+        try:
+            fixes = collect_fixes(text, ignored)
+        except Exception:
+            return []
+
+        lines = split_lines(text)
+        edits = {}
+        for fix in fixes:
+            start_line = lines[fix.start_line - 1] if fix.start_line <= len(lines) else ""
+            end_line = lines[fix.end_line - 1] if fix.end_line <= len(lines) else ""
+            edits[(fix.start_line - 1, _utf16_len(start_line[:fix.start_col]))] = {
+                "range": {
+                    "start": {"line": fix.start_line - 1, "character": _utf16_len(start_line[:fix.start_col])},
+                    "end": {"line": fix.end_line - 1, "character": _utf16_len(end_line[:fix.end_col])},
+                },
+                "newText": fix.replacement,
+            }
+
+        actions = []
+        for diagnostic in diagnostics:
+            start = diagnostic["range"]["start"]
+            edit = edits.get((start["line"], start["character"]))
+            if edit is not None:
+                actions.append({
+                    "title": f"Replace with {edit['newText']}",
+                    "kind": "quickfix",
+                    "diagnostics": [diagnostic],
+                    "isPreferred": True,
+                    "edit": {"changes": {uri: [edit]}},
+                })
+        if edits and (not only or "source.fixAll" in only):
+            actions.append({
+                "title": "Fix all auto-fixable pandas-lint issues",
+                "kind": "source.fixAll",
+                "edit": {"changes": {uri: list(edits.values())}},
+            })
+        return actions
+
+
+def serve_stdio(debounce: float = DEFAULT_DEBOUNCE):
+    LanguageServer(sys.stdin.buffer, sys.stdout.buffer, debounce).serve()
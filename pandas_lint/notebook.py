@@ -1,53 +1,375 @@
 import json
-from typing import List, Dict, Tuple, Optional
+import mmap
+import re
+from bisect import bisect_right
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-def parse_notebook(filepath: str) -> Tuple[str, Dict[int, int]]:
+
+class CellMap(Mapping):
     """
-    Parses a Jupyter Notebook (.ipynb) and extracts code from code cells.
-    
-    Args:
-        filepath: Path to the .ipynb file.
+    Maps line numbers of the concatenated notebook code to cell indices.
 
-    Returns:
-        A tuple containing:
-        - The concatenated code source as a single string.
-        - A mapping dictionary where keys are line numbers in the concatenated source
-          and values are the original cell indices.
+    Behaves like the ``{line: cell_index}`` dict it replaces, but stores one
+    ``(start, end, cell)`` span per code cell and looks lines up with bisect,
+    so its size depends on the number of cells rather than lines.
     """
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            notebook = json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
-        raise ValueError(f"Failed to read notebook {filepath}: {e}")
 
-    cell_mapping: Dict[int, int] = {} 
-    
-    current_line = 1
-    final_code_parts = []
-    
-    for i, cell in enumerate(notebook.get('cells', [])):
-        if cell.get('cell_type') != 'code':
+    __slots__ = ("starts", "ends", "cells")
+
+    def __init__(self, spans: Iterable[Tuple[int, int, int]] = ()):
+        # Spans are sorted, non-overlapping [start, end) line ranges.
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.cells: List[int] = []
+        for start, end, cell in spans:
+            self.add(start, end, cell)
+
+    def add(self, start: int, end: int, cell: int):
+        """Appends the lines ``start`` to ``end - 1`` as belonging to ``cell``."""
+        if end > start:
+            self.starts.append(start)
+            self.ends.append(end)
+            self.cells.append(cell)
+
+    def spans(self) -> List[Tuple[int, int, int]]:
+        return list(zip(self.starts, self.ends, self.cells))
+
+    def __getitem__(self, line: int) -> int:
+        i = bisect_right(self.starts, line) - 1
+        if i < 0 or line >= self.ends[i]:
+            raise KeyError(line)
+        return self.cells[i]
+
+    def cell_start(self, line: int) -> int:
+        """First line of the cell holding ``line``."""
+        i = bisect_right(self.starts, line) - 1
+        if i < 0 or line >= self.ends[i]:
+            raise KeyError(line)
+        return self.starts[i]
+
+    def __contains__(self, line) -> bool:
+        i = bisect_right(self.starts, line) - 1
+        return i >= 0 and line < self.ends[i]
+
+    def __iter__(self) -> Iterator[int]:
+        for start, end in zip(self.starts, self.ends):
+            yield from range(start, end)
+
+    def __len__(self) -> int:
+        return sum(end - start for start, end in zip(self.starts, self.ends))
+
+    def __reduce__(self):
+        return CellMap, (self.spans(),)
+
+    def __repr__(self) -> str:
+        return f"CellMap({self.spans()!r})"
+
+
+CodeCells = List[Tuple[int, str]]
+
+
+def _code_cells(cells: Iterable[Tuple[int, Optional[str], object]]) -> CodeCells:
+    """``(index, source)`` of the code cells among ``(index, cell_type, source)``; sources end with a newline."""
+    code_cells = []
+    for i, cell_type, source_content in cells:
+        if cell_type != 'code':
             continue
-            
-        source_content = cell.get('source', [])
-        if isinstance(source_content, list):
-            source = "".join(source_content)
-        else:
-            source = str(source_content)
-            
+
+        source = source_text(source_content)
         if not source.endswith('\n'):
             source += '\n'
-            
+        code_cells.append((i, source))
+    return code_cells
+
+
+def join_cells(code_cells: CodeCells) -> Tuple[str, CellMap]:
+    """
+    Concatenates code cells, with a blank line after each. The CellMap has
+    one span per cell, in order, so ``cell_mapping.starts[k]`` is the first
+    line of ``code_cells[k]``.
+    """
+    cell_mapping = CellMap()
+    current_line = 1
+    final_code_parts = []
+
+    for i, source in code_cells:
         final_code_parts.append(source)
-        
+
         line_count = source.count('\n')
-        
-        for line_offset in range(line_count):
-            cell_mapping[current_line + line_offset] = i
-            
+        cell_mapping.add(current_line, current_line + line_count, i)
         current_line += line_count
-        
+
         final_code_parts.append('\n')
         current_line += 1
-            
+
     return "".join(final_code_parts), cell_mapping
+
+
+_STRUCTURAL = re.compile(rb'["\[\]{}]')
+_SCALAR_END = re.compile(rb'[,\]}\s]')
+_WHITESPACE = b" \t\r\n"
+
+
+class _Scanner:
+    """
+    Walks notebook JSON at the byte level. Values are decoded only on
+    request; everything else (outputs, attachments, metadata) is skipped by
+    searching for quotes and brackets, without building Python objects.
+    """
+
+    def __init__(self, buf: Union[bytes, mmap.mmap]):
+        self.buf = buf
+        self.pos = 0
+        self.size = len(buf)
+
+    def _error(self, message: str):
+        raise ValueError(f"Invalid notebook JSON at byte {self.pos}: {message}")
+
+    def skip_whitespace(self):
+        buf, pos = self.buf, self.pos
+        while pos < self.size and buf[pos] in _WHITESPACE:
+            pos += 1
+        self.pos = pos
+
+    def _peek(self) -> bytes:
+        self.skip_whitespace()
+        if self.pos >= self.size:
+            self._error("unexpected end of file")
+        return self.buf[self.pos:self.pos + 1]
+
+    def _expect(self, char: bytes):
+        if self._peek() != char:
+            self._error(f"expected {char.decode()!r}")
+        self.pos += 1
+
+    def _string_end(self, pos: int) -> int:
+        """Index after the string opening at ``pos``. A quote ends it unless escaped by an odd run of backslashes."""
+        buf = self.buf
+        while True:
+            end = buf.find(b'"', pos + 1)
+            if end == -1:
+                self._error("unterminated string")
+            backslashes = 0
+            k = end - 1
+            while buf[k] == 0x5C:
+                backslashes += 1
+                k -= 1
+            if backslashes % 2 == 0:
+                return end + 1
+            pos = end
+
+    def skip_value(self):
+        char = self._peek()
+        if char == b'"':
+            self.pos = self._string_end(self.pos)
+        elif char in (b'[', b'{'):
+            depth = 0
+            pos = self.pos
+            while True:
+                match = _STRUCTURAL.search(self.buf, pos)
+                if match is None:
+                    self.pos = self.size
+                    self._error("unterminated container")
+                pos = match.start()
+                found = self.buf[pos]
+                if found == 0x22:
+                    pos = self._string_end(pos)
+                    continue
+                depth += 1 if found in (0x5B, 0x7B) else -1
+                pos += 1
+                if depth == 0:
+                    break
+            self.pos = pos
+        else:
+            match = _SCALAR_END.search(self.buf, self.pos)
+            self.pos = match.start() if match else self.size
+
+    def read_value(self):
+        self.skip_whitespace()
+        start = self.pos
+        self.skip_value()
+        return json.loads(self.buf[start:self.pos])
+
+    def iter_object(self) -> Iterator[str]:
+        """Yields each key with the position on its value, which the caller must read or skip."""
+        self._expect(b'{')
+        if self._peek() == b'}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                self._error("expected a key")
+            self._expect(b':')
+            yield key
+            if self._peek() == b',':
+                self.pos += 1
+                continue
+            self._expect(b'}')
+            return
+
+    def iter_array(self) -> Iterator[int]:
+        """Yields the index of each element with the position on it; the caller must read or skip it."""
+        self._expect(b'[')
+        if self._peek() == b']':
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self._peek() == b',':
+                self.pos += 1
+                continue
+            self._expect(b']')
+            return
+
+
+def _scan_cell_spans(buf: Union[bytes, mmap.mmap]) -> Iterator[Tuple[int, Optional[str], int, int]]:
+    """Yields ``(index, cell_type, start, end)`` per cell; ``buf[start:end]`` is its "source" value, empty if none."""
+    scanner = _Scanner(buf)
+    for key in scanner.iter_object():
+        if key != "cells":
+            scanner.skip_value()
+            continue
+        for index in scanner.iter_array():
+            cell_type, start, end = None, 0, 0
+            for cell_key in scanner.iter_object():
+                if cell_key == "cell_type":
+                    cell_type = scanner.read_value()
+                elif cell_key == "source":
+                    scanner.skip_whitespace()
+                    start = scanner.pos
+                    scanner.skip_value()
+                    end = scanner.pos
+                else:
+                    scanner.skip_value()
+            yield index, cell_type, start, end
+
+
+def _scan_cells(buf: Union[bytes, mmap.mmap]) -> Iterator[Tuple[int, Optional[str], object]]:
+    for index, cell_type, start, end in _scan_cell_spans(buf):
+        yield index, cell_type, json.loads(buf[start:end]) if end > start else None
+
+
+def source_text(value: object) -> str:
+    """The text of a cell "source" value, a string or a list of lines."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "".join(value)
+    return str(value)
+
+
+def _encode_source(original: bytes, source: str) -> bytes:
+    """
+    JSON for ``source`` in the layout of the value it replaces: a list of
+    lines indented like the original (as Jupyter writes them), or a string.
+    """
+    if not original.startswith(b"["):
+        return json.dumps(source, ensure_ascii=False).encode("utf-8")
+    lines = [json.dumps(line, ensure_ascii=False).encode("utf-8") for line in source.splitlines(keepends=True)]
+    opening = re.match(rb"\[(\s*)", original).group(1)
+    closing = re.search(rb"(\s*)\]$", original).group(1)
+    if not lines:
+        return b"[]"
+    separator = b"," + opening if b"\n" in opening else b", "
+    return b"[" + opening + separator.join(lines) + closing + b"]"
+
+
+def _copy(buf: Union[bytes, mmap.mmap], start: int, end: int, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    for pos in range(start, end, chunk_size):
+        yield buf[pos:min(pos + chunk_size, end)]
+
+
+def cell_sources(buf: Union[bytes, mmap.mmap], indices: Iterable[int]) -> Dict[int, str]:
+    """The source text of the cells at ``indices``, read from the notebook JSON in ``buf``."""
+    wanted = set(indices)
+    return {
+        index: source_text(json.loads(buf[start:end]) if end > start else None)
+        for index, _, start, end in _scan_cell_spans(buf) if index in wanted
+    }
+
+
+def replace_sources(buf: Union[bytes, mmap.mmap], sources: Dict[int, str]) -> Iterator[bytes]:
+    """
+    Streams the notebook JSON in ``buf`` with the source of each cell in
+    ``sources`` replaced. Every other byte, outputs and metadata included,
+    is copied unchanged, in chunks. Cells without a "source" are left alone.
+    """
+    pos = 0
+    for index, _, start, end in _scan_cell_spans(buf):
+        if index in sources and end > start:
+            yield from _copy(buf, pos, start)
+            yield _encode_source(buf[start:end], sources[index])
+            pos = end
+    yield from _copy(buf, pos, len(buf))
+
+
+def read_code_cells(filepath: str, buf: Union[bytes, mmap.mmap, None] = None) -> CodeCells:
+    """
+    Reads the ``(index, source)`` code cells of a Jupyter Notebook (.ipynb).
+
+    The file is memory-mapped and only code-cell sources are decoded, so
+    large outputs (e.g. base64 images) never become Python objects. Cell
+    indices count every cell, markdown included. ``buf`` is the file's
+    content when the caller already has it (mapped or read). Raises
+    ValueError for files that cannot be read or are not notebook JSON.
+    """
+    if buf is not None:
+        try:
+            return _code_cells(_scan_cells(buf))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError(f"Failed to read notebook {filepath}: {e}")
+    try:
+        with open(filepath, 'rb') as f:
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped.
+                buf = f.read()
+            try:
+                return _code_cells(_scan_cells(buf))
+            finally:
+                if isinstance(buf, mmap.mmap):
+                    buf.close()
+    except (ValueError, UnicodeDecodeError, OSError) as e:
+        raise ValueError(f"Failed to read notebook {filepath}: {e}")
+
+
+def read_code_cells_string(content: str) -> CodeCells:
+    """Same as read_code_cells, for notebook JSON that is already in memory (e.g. read from stdin)."""
+    try:
+        notebook = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Failed to read notebook: {e}")
+    return _code_cells((i, cell.get('cell_type'), cell.get('source', [])) for i, cell in enumerate(notebook.get('cells', [])))
+
+
+def parse_notebook(filepath: str) -> Tuple[str, CellMap]:
+    """
+    Parses a Jupyter Notebook (.ipynb) and extracts code from code cells.
+
+    Args:
+        filepath: Path to the .ipynb file.
+
+    Returns:
+        A tuple containing:
+        - The concatenated code source as a single string.
+        - A CellMap from line numbers in the concatenated source to the
+          original cell indices.
+    """
+    return join_cells(read_code_cells(filepath))
+
+
+def parse_notebook_string(content: str) -> Tuple[str, CellMap]:
+    """Same as parse_notebook, for notebook JSON that is already in memory."""
+    return join_cells(read_code_cells_string(content))
+
+
+def extract_code(notebook: dict) -> Tuple[str, CellMap]:
+    """Concatenates the code cells of a loaded notebook. See parse_notebook."""
+    return join_cells(_code_cells(
+        (i, cell.get('cell_type'), cell.get('source', [])) for i, cell in enumerate(notebook.get('cells', []))
+    ))
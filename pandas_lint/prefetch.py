@@ -0,0 +1,114 @@
+import collections
+import concurrent.futures
+import mmap
+import os
+import time
+from typing import Deque, Iterable, Iterator, Optional, Tuple, Union
+
+from .config import Config
+from .stats import Stats
+
+# I/O threads per process; 0 turns prefetching off.
+PREFETCH_THREADS = 4
+# Files read ahead of the one being analyzed. Together with MMAP_MIN_BYTES
+# this caps the memory held by prefetched files.
+PREFETCH_AHEAD = 8
+# Larger files, and notebooks, are memory-mapped instead of read: the
+# kernel is asked to read them ahead, but their pages never count as heap.
+MMAP_MIN_BYTES = 1024 * 1024
+
+Buffer = Union[bytes, mmap.mmap]
+Job = Tuple[str, Optional[Config]]
+
+_io_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_io_pool_pid: Optional[int] = None
+
+
+def io_pool() -> concurrent.futures.ThreadPoolExecutor:
+    """
+    The process's I/O threads, started on first use and kept for later
+    batches. A forked worker does not inherit the parent's threads, so
+    it starts its own.
+    """
+    global _io_pool, _io_pool_pid
+    if _io_pool is None or _io_pool_pid != os.getpid():
+        _io_pool = concurrent.futures.ThreadPoolExecutor(PREFETCH_THREADS, thread_name_prefix="pandas-lint-io")
+        _io_pool_pid = os.getpid()
+    return _io_pool
+
+
+def fetch(file_path: str, max_size: Optional[int] = None) -> Tuple[Optional[Buffer], float]:
+    """
+    Loads ``file_path`` for analysis. Returns the buffer, or None when the
+    analysis should open the file itself (errors, files over ``max_size``),
+    and the seconds it took. Runs on an I/O thread: ``read`` releases the
+    GIL, so the analysis of the previous file goes on meanwhile.
+    """
+    start = time.perf_counter()
+    data: Optional[Buffer] = None
+    try:
+        with open(file_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            notebook = file_path.endswith(".ipynb")
+            if max_size is not None and size > max_size and not notebook:
+                pass
+            elif size and (notebook or size >= MMAP_MIN_BYTES):
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if hasattr(mmap, "MADV_WILLNEED"):
+                    data.madvise(mmap.MADV_WILLNEED)
+            else:
+                data = f.read()
+    except (OSError, ValueError):
+        data = None
+    return data, time.perf_counter() - start
+
+
+def release(data: Optional[Buffer]):
+    if isinstance(data, mmap.mmap):
+        data.close()
+
+
+def prefetched(jobs: Iterable[Job], stats: Optional[Stats] = None) -> Iterator[Tuple[Job, Optional[Buffer]]]:
+    """
+    Yields each ``(path, config)`` job with its file loaded by ``fetch``,
+    keeping up to PREFETCH_AHEAD files in flight on the I/O threads. A
+    buffer is valid until the next item is requested. With ``stats``, time spent
+    reading is charged to "read" and time spent waiting for a file that
+    was not ready yet to "io_wait".
+    """
+    jobs = iter(jobs)
+    if PREFETCH_THREADS <= 0:
+        for job in jobs:
+            yield job, None
+        return
+
+    pool = io_pool()
+    window: Deque[Tuple[Job, concurrent.futures.Future]] = collections.deque()
+
+    def submit():
+        for file_path, config in jobs:
+            max_size = config.max_file_size if config is not None else None
+            window.append(((file_path, config), pool.submit(fetch, file_path, max_size)))
+            return
+
+    for _ in range(PREFETCH_AHEAD):
+        submit()
+    try:
+        while window:
+            job, future = window.popleft()
+            submit()
+            start = time.perf_counter()
+            data, seconds = future.result()
+            if stats is not None:
+                stats.add_time("io_wait", time.perf_counter() - start)
+                stats.add_time("read", seconds)
+                if data is not None:
+                    stats.bytes_read += len(data)
+            try:
+                yield job, data
+            finally:
+                release(data)
+    finally:
+        # Abandoned early: drop what was read ahead.
+        for _, future in window:
+            release(future.result()[0])
@@ -0,0 +1,240 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from . import __version__
+from .rules import Issue, RuleRegistry
+
+FORMATS = ("table", "jsonl", "sarif", "github", "compact")
+
+SARIF_LEVELS = {"CRITICAL": "error", "WARNING": "warning", "INFO": "note"}
+GITHUB_LEVELS = {"CRITICAL": "error", "WARNING": "warning", "INFO": "notice"}
+
+
+def cell_number(issue: Issue, cell_mapping: Optional[Dict[int, int]]) -> Optional[int]:
+    """1-based notebook cell of an issue, or None outside notebooks."""
+    if cell_mapping and issue.line in cell_mapping:
+        return cell_mapping[issue.line] + 1
+    return None
+
+
+def cell_location(issue: Issue, cell_mapping: Optional[Dict[int, int]]) -> Optional[Tuple[int, int]]:
+    """
+    ``(cell, line)`` of an issue in a notebook, both 1-based, the line
+    counted within the cell; None outside notebooks. Issue lines count
+    lines of the joined notebook code, which match no line of the .ipynb.
+    """
+    cell = cell_number(issue, cell_mapping)
+    if cell is None:
+        return None
+    if hasattr(cell_mapping, "cell_start"):
+        start = cell_mapping.cell_start(issue.line)
+    else:
+        start = issue.line
+        while cell_mapping.get(start - 1) == cell - 1:
+            start -= 1
+    return cell, issue.line - start + 1
+
+
+class Reporter(ABC):
+    """
+    Writes results as they arrive. ``report`` is called once per file with
+    issues, in completion order; nothing is kept after it returns.
+    """
+
+    # Machine-readable output: progress and the summary go to stderr.
+    machine_readable = True
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def start(self):
+        pass
+
+    @abstractmethod
+    def report(self, file_path: str, issues: List[Issue], cell_mapping: Optional[Dict[int, int]] = None):
+        pass
+
+    def finish(self):
+        pass
+
+
+class TableReporter(Reporter):
+    """A rich table per file, with highlighted snippets. For people, not tools."""
+
+    machine_readable = False
+
+    def __init__(self, console):
+        self.console = console
+
+    def report(self, file_path, issues, cell_mapping=None):
+        from rich.syntax import Syntax
+        from rich.table import Table
+
+        table = Table(title=f"Analyzing: {file_path}")
+
+        table.add_column("Rule", style="green")
+        table.add_column("Line", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Code", style="magenta", overflow="fold")
+        table.add_column("Severity", style="bold")
+        table.add_column("Message", style="white")
+
+        for issue in issues:
+            severity_style = "red" if issue.severity == "CRITICAL" else "yellow"
+
+            line_display = str(issue.line)
+            cell = cell_number(issue, cell_mapping)
+            if cell is not None:
+                line_display = f"Cell {cell} : {issue.line}"
+            code_snippet = ""
+            if issue.snippet:
+                code_snippet = Syntax(issue.snippet, "python", theme="monokai", line_numbers=False)
+
+            table.add_row(
+                issue.code,
+                line_display,
+                code_snippet if code_snippet else "",
+                f"[{severity_style}]{issue.severity}[/{severity_style}]",
+                issue.message
+            )
+
+        self.console.print(table)
+
+
+class JsonLinesReporter(Reporter):
+    """One JSON object per issue and line."""
+
+    def report(self, file_path, issues, cell_mapping=None):
+        lines = []
+        for issue in issues:
+            lines.append(json.dumps({
+                "path": file_path,
+                "line": issue.line,
+                "col": issue.col,
+                "cell": cell_number(issue, cell_mapping),
+                "code": issue.code,
+                "severity": issue.severity,
+                "message": issue.message,
+                "snippet": issue.snippet,
+            }))
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+
+class CompactReporter(Reporter):
+    """``path:line:col: CODE [SEVERITY] message``, one issue per line."""
+
+    def report(self, file_path, issues, cell_mapping=None):
+        lines = []
+        for issue in issues:
+            cell = cell_number(issue, cell_mapping)
+            where = f" (cell {cell})" if cell is not None else ""
+            lines.append(f"{file_path}:{issue.line}:{issue.col + 1}: {issue.code} [{issue.severity}] {issue.message}{where}")
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+
+def _github_escape(value: str, property_value: bool = False) -> str:
+    value = value.replace("%", "%25").replace("\r", "%0D").replace("\n", "%0A")
+    if property_value:
+        value = value.replace(":", "%3A").replace(",", "%2C")
+    return value
+
+
+class GithubReporter(Reporter):
+    """GitHub Actions workflow commands, shown as annotations on the changed files."""
+
+    def report(self, file_path, issues, cell_mapping=None):
+        path = _github_escape(os.path.relpath(file_path).replace(os.sep, "/"), property_value=True)
+        lines = []
+        for issue in issues:
+            level = GITHUB_LEVELS.get(issue.severity, "warning")
+            title = _github_escape(issue.code, property_value=True)
+            location = cell_location(issue, cell_mapping)
+            if location is None:
+                lines.append(
+                    f"::{level} file={path},line={issue.line},col={issue.col + 1},"
+                    f"title={title}::{_github_escape(issue.message)}"
+                )
+            else:
+                # No line of the .ipynb JSON matches: annotate the file, name the cell.
+                message = f"{issue.message} (cell {location[0]}, line {location[1]})"
+                lines.append(f"::{level} file={path},title={title}::{_github_escape(message)}")
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+
+class SarifReporter(Reporter):
+    """
+    A SARIF 2.1.0 log. The document is streamed: the header is written by
+    ``start``, each result as it arrives and the closing brackets by
+    ``finish``.
+    """
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self._first = True
+
+    def start(self):
+        rules = [
+            {
+                "id": code,
+                "shortDescription": {"text": message},
+                "defaultConfiguration": {"level": SARIF_LEVELS.get(severity, "warning")},
+            }
+            for rule in RuleRegistry.get_all()
+            for code, (message, severity) in [(rule.code, (rule.message, rule.severity)), *rule.extra_codes.items()]
+        ]
+        driver = {
+            "name": "pandas-lint",
+            "version": __version__,
+            "informationUri": "https://github.com/Jean-EstevezT/pandas_lint",
+            "rules": rules,
+        }
+        header = json.dumps({
+            "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+            "version": "2.1.0",
+            "runs": [{"tool": {"driver": driver}, "results": []}],
+        })
+        # Everything up to and including the opening bracket of "results".
+        self.stream.write(header[:-len("]}]}")] + "\n")
+
+    def report(self, file_path, issues, cell_mapping=None):
+        uri = os.path.relpath(file_path).replace(os.sep, "/")
+        chunks = []
+        for issue in issues:
+            location = {"physicalLocation": {"artifactLocation": {"uri": uri}}}
+            result = {
+                "ruleId": issue.code,
+                "level": SARIF_LEVELS.get(issue.severity, "warning"),
+                "message": {"text": issue.message},
+                "locations": [location],
+            }
+            cell_line = cell_location(issue, cell_mapping)
+            if cell_line is None:
+                location["physicalLocation"]["region"] = {"startLine": issue.line, "startColumn": issue.col + 1}
+            else:
+                # No region: lines of the joined notebook code are not lines of the .ipynb.
+                cell, line = cell_line
+                location["logicalLocations"] = [{"name": f"cell {cell}", "kind": "notebookCell"}]
+                result["properties"] = {"cell": cell, "cellLine": line, "cellColumn": issue.col + 1}
+            chunks.append(("" if self._first else ",\n") + json.dumps(result))
+            self._first = False
+        self.stream.write("".join(chunks))
+        self.stream.flush()
+
+    def finish(self):
+        self.stream.write("\n]}]}\n")
+        self.stream.flush()
+
+
+def make_reporter(name: str, stream: TextIO, console=None) -> Reporter:
+    if name == "table":
+        return TableReporter(console)
+    return {
+        "jsonl": JsonLinesReporter,
+        "sarif": SarifReporter,
+        "github": GithubReporter,
+        "compact": CompactReporter,
+    }[name](stream)
@@ -1,4 +1,4 @@
-from .base import Rule, Issue, RuleRegistry
+from .base import Rule, Issue, Prefilter, RuleRegistry, build_dispatch, build_prefilter, dispatch_key
 
 from . import performance
 from . import memory
@@ -6,4 +6,4 @@ from . import security
 from . import style
 from . import io
 
-__all__ = ['Rule', 'Issue', 'RuleRegistry']
+__all__ = ['Rule', 'Issue', 'Prefilter', 'RuleRegistry', 'build_dispatch', 'build_prefilter', 'dispatch_key']
@@ -1,16 +1,18 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Pattern, Tuple, Type
 import ast
+import re
+import unicodedata
 
 
-@dataclass
-class Issue:
+class Issue(NamedTuple):
     line: int
     col: int
     code: str
     message: str
     severity: str
+    # Source text of the flagged line, attached by the worker for reporting.
+    snippet: str = ""
 
 
 class Rule(ABC):
@@ -18,24 +20,191 @@ class Rule(ABC):
     message: str
     severity: str
 
+    # Node types the rule inspects and, for calls, the attribute names
+    # (``obj.<attr>(...)``) it triggers on. ``attrs = None`` means the rule
+    # wants every node of the given types.
+    node_types: Tuple[Type[ast.AST], ...] = (ast.Call,)
+    attrs: Optional[Tuple[str, ...]] = None
+
+    # Identifiers at least one of which appears in any source the rule can
+    # flag. Defaults to ``attrs``; a rule with neither disables the prefilter.
+    triggers: Optional[Tuple[str, ...]] = None
+
+    # Codes the rule reports besides its own, mapped to their message and
+    # severity, e.g. for a more specific variant of its issue.
+    extra_codes: Dict[str, Tuple[str, str]] = {}
+
+    # Issue codes the rule's ``fixers`` rewrite away; empty when it has none.
+    fixable: FrozenSet[str] = frozenset()
+
+    def trigger_tokens(self) -> Optional[Tuple[str, ...]]:
+        return self.triggers if self.triggers is not None else self.attrs
+
     @abstractmethod
     def check(self, node: ast.AST, context: dict) -> Optional[Issue]:
         pass
 
+    def fixers(self, ignored_codes: FrozenSet[str] = frozenset()) -> Dict[str, "FixFunc"]:
+        """
+        The rule's libcst rewrites, keyed by the attribute name of the calls
+        they apply to (``obj.<attr>(...)``). Each takes a ``cst.Call`` and
+        returns its replacement, or None to leave it alone. Rewrites that
+        resolve a code in ``ignored_codes`` must be left out. Called once per
+        ignore set and process, when fixing starts: import libcst and build
+        matchers here, not per node.
+        """
+        return {}
+
+
+# Takes a libcst Call node, returns its replacement or None.
+FixFunc = Callable[[Any], Optional[Any]]
+FixTable = Dict[str, Tuple[FixFunc, ...]]
+
+DispatchKey = Tuple[Type[ast.AST], Optional[str]]
+DispatchTable = Dict[DispatchKey, Tuple[Rule, ...]]
+
+
+def dispatch_key(node: ast.AST) -> DispatchKey:
+    """Returns the (node type, call attribute name) key used to route a node."""
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        return type(node), node.func.attr
+    return type(node), None
+
+
+def build_dispatch(rules: Iterable[Rule]) -> DispatchTable:
+    """
+    Builds a table mapping (node type, attribute name) to the rules that can
+    match such a node. The ``(node type, None)`` entry holds the rules that
+    accept any node of that type and is the fallback for unknown attributes.
+    Rules keep their registration order within every entry.
+    """
+    rules = list(rules)
+    keys = set()
+    for rule in rules:
+        for node_type in rule.node_types:
+            keys.add((node_type, None))
+            for attr in rule.attrs or ():
+                keys.add((node_type, attr))
+
+    table: DispatchTable = {}
+    for node_type, attr in keys:
+        table[(node_type, attr)] = tuple(
+            rule for rule in rules
+            if node_type in rule.node_types
+            and (rule.attrs is None or (attr is not None and attr in rule.attrs))
+        )
+    return table
+
+
+class Prefilter:
+    """
+    Decides from the raw bytes of a file whether any rule could flag it, so
+    files that cannot are never parsed. Exact: a trigger identifier must
+    appear literally, except that Python folds identifiers with NFKC, so
+    non-ASCII sources are normalized before giving up on them.
+    """
+
+    def __init__(self, tokens: Iterable[str]):
+        # With no tokens at all nothing can match; "(?!)" never does.
+        alternatives = "|".join(re.escape(t) for t in sorted(set(tokens))) or "(?!)"
+        self.pattern: Pattern[bytes] = re.compile(rb"\b(?:" + alternatives.encode("ascii") + rb")\b")
+        self.text_pattern: Pattern[str] = re.compile(r"\b(?:" + alternatives + r")\b")
+
+    def may_match(self, data: bytes) -> bool:
+        if self.pattern.search(data):
+            return True
+        if data.isascii():
+            return False
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            return True
+        return self.may_match_text(text)
+
+    def may_match_text(self, text: str) -> bool:
+        """Same check on decoded source, e.g. the code extracted from a notebook."""
+        if self.text_pattern.search(text):
+            return True
+        if text.isascii():
+            return False
+        return self.text_pattern.search(unicodedata.normalize("NFKC", text)) is not None
+
+
+def build_prefilter(rules: Iterable[Rule]) -> Optional[Prefilter]:
+    """A Prefilter for the trigger tokens of ``rules``, or None when one of them has none."""
+    tokens = []
+    for rule in rules:
+        rule_tokens = rule.trigger_tokens()
+        if not rule_tokens:
+            return None
+        tokens.extend(rule_tokens)
+    return Prefilter(tokens)
+
 
 class RuleRegistry:
     _rules: List[Rule] = []
+    _dispatch_cache: Dict[FrozenSet[str], DispatchTable] = {}
+    _prefilter_cache: Dict[FrozenSet[str], Optional[Prefilter]] = {}
+    _fix_cache: Dict[FrozenSet[str], FixTable] = {}
 
     @classmethod
     def register(cls, rule_class):
         instance = rule_class()
         cls._rules.append(instance)
+        cls._dispatch_cache = {}
+        cls._prefilter_cache = {}
+        cls._fix_cache = {}
         return rule_class
 
     @classmethod
     def get_all(cls) -> List[Rule]:
         return cls._rules.copy()
 
+    @classmethod
+    def get_dispatch(cls, ignored_codes: Iterable[str] = ()) -> DispatchTable:
+        """Returns the dispatch table for all registered rules not in ``ignored_codes``."""
+        ignored = frozenset(ignored_codes)
+        table = cls._dispatch_cache.get(ignored)
+        if table is None:
+            table = build_dispatch(r for r in cls._rules if r.code not in ignored)
+            cls._dispatch_cache[ignored] = table
+        return table
+
+    @classmethod
+    def get_prefilter(cls, ignored_codes: Iterable[str] = ()) -> Optional[Prefilter]:
+        """Returns the prefilter for all registered rules not in ``ignored_codes``, None if there is none."""
+        ignored = frozenset(ignored_codes)
+        if ignored not in cls._prefilter_cache:
+            cls._prefilter_cache[ignored] = build_prefilter(r for r in cls._rules if r.code not in ignored)
+        return cls._prefilter_cache[ignored]
+
+    @classmethod
+    def get_fixable(cls, ignored_codes: Iterable[str] = ()) -> FrozenSet[str]:
+        """Returns the issue codes the rules not in ``ignored_codes`` can fix, without importing libcst."""
+        ignored = frozenset(ignored_codes)
+        return frozenset().union(*(r.fixable for r in cls._rules if r.code not in ignored)) - ignored
+
+    @classmethod
+    def get_fixers(cls, ignored_codes: Iterable[str] = ()) -> FixTable:
+        """
+        Returns the fixes of all registered rules not in ``ignored_codes``,
+        keyed by call attribute name, in registration order.
+        """
+        ignored = frozenset(ignored_codes)
+        table = cls._fix_cache.get(ignored)
+        if table is None:
+            fixes: Dict[str, List[FixFunc]] = {}
+            for rule in cls._rules:
+                if rule.code in ignored or not rule.fixable - ignored:
+                    continue
+                for attr, fix in rule.fixers(ignored).items():
+                    fixes.setdefault(attr, []).append(fix)
+            table = cls._fix_cache[ignored] = {attr: tuple(funcs) for attr, funcs in fixes.items()}
+        return table
+
     @classmethod
     def clear(cls):
         cls._rules = []
+        cls._dispatch_cache = {}
+        cls._prefilter_cache = {}
+        cls._fix_cache = {}
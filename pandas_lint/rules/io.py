@@ -8,6 +8,7 @@ class ToCsvRule(Rule):
     code = "IO001"
     message = "Are you saving intermediate data? 'to_parquet' is much faster and lighter than 'to_csv'."
     severity = "INFO"
+    attrs = ('to_csv',)
 
     def check(self, node: ast.AST, context: dict) -> Optional[Issue]:
         if not isinstance(node, ast.Call):
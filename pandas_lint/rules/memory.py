@@ -8,6 +8,7 @@ class ReadCsvUsecolsRule(Rule):
     code = "MEM001"
     message = "Loading CSV without 'usecols'. If the file is large, you are wasting RAM loading columns you don't use."
     severity = "WARNING"
+    attrs = ('read_csv',)
 
     def check(self, node: ast.AST, context: dict) -> Optional[Issue]:
         if not isinstance(node, ast.Call):
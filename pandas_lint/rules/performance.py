@@ -8,6 +8,7 @@ class IterrowsRule(Rule):
     code = "PERF001"
     message = "Usage of '.iterrows()' detected. It is extremely slow. Use vectorization or .itertuples()."
     severity = "CRITICAL"
+    attrs = ('iterrows',)
 
     def check(self, node: ast.AST, context: dict) -> Optional[Issue]:
         if not isinstance(node, ast.Call):
@@ -20,11 +21,23 @@ class IterrowsRule(Rule):
         return Issue(node.lineno, node.col_offset, self.code, self.message, self.severity)
 
 
+STR_METHODS = ['upper', 'lower', 'strip', 'replace', 'split']
+DT_FIELDS = ['year', 'month', 'day', 'hour', 'minute', 'second']
+# String methods whose .str counterpart takes the same arguments and is rewritten by --fix.
+FIXABLE_STR_METHODS = ['upper', 'lower', 'strip']
+
+
 @RuleRegistry.register
 class ApplyRule(Rule):
     code = "PERF002"
     message = "Usage of '.apply()'. If the operation is simple math, use direct vectorization to be 100x faster."
     severity = "WARNING"
+    attrs = ('apply',)
+    extra_codes = {
+        "PERF003": ("Use the vectorized accessor .str (e.g. df['col'].str.method()) instead of apply.", "WARNING"),
+        "PERF004": ("Use the vectorized accessor .dt (e.g. df['col'].dt.year) instead of apply.", "WARNING"),
+    }
+    fixable = frozenset(extra_codes)
 
     def check(self, node: ast.AST, context: dict) -> Optional[Issue]:
         if not isinstance(node, ast.Call):
@@ -38,21 +51,51 @@ class ApplyRule(Rule):
             lambda_body = node.args[0].body
 
             if isinstance(lambda_body, ast.Call) and isinstance(lambda_body.func, ast.Attribute):
-                if lambda_body.func.attr in ['upper', 'lower', 'strip', 'replace', 'split']:
-                    return Issue(
-                        node.lineno, node.col_offset,
-                        "PERF003",
-                        "Use the vectorized accessor .str (e.g. df['col'].str.method()) instead of apply.",
-                        "WARNING"
-                    )
+                if lambda_body.func.attr in STR_METHODS:
+                    return Issue(node.lineno, node.col_offset, "PERF003", *self.extra_codes["PERF003"])
 
             if isinstance(lambda_body, ast.Attribute):
-                if lambda_body.attr in ['year', 'month', 'day', 'hour', 'minute', 'second']:
-                    return Issue(
-                        node.lineno, node.col_offset,
-                        "PERF004",
-                        "Use the vectorized accessor .dt (e.g. df['col'].dt.year) instead of apply.",
-                        "WARNING"
-                    )
+                if lambda_body.attr in DT_FIELDS:
+                    return Issue(node.lineno, node.col_offset, "PERF004", *self.extra_codes["PERF004"])
 
         return Issue(node.lineno, node.col_offset, self.code, self.message, self.severity)
+
+    def fixers(self, ignored_codes=frozenset()):
+        import libcst as cst
+        from libcst import matchers as m
+
+        bodies = []
+        if "PERF003" not in ignored_codes:
+            bodies.append(m.Call(func=m.Attribute(attr=m.OneOf(*(m.Name(name) for name in FIXABLE_STR_METHODS)))))
+        if "PERF004" not in ignored_codes:
+            bodies.append(m.Attribute(attr=m.OneOf(*(m.Name(name) for name in DT_FIELDS))))
+        if not bodies:
+            return {}
+        pattern = m.Call(func=m.Attribute(), args=[m.Arg(value=m.Lambda(body=m.OneOf(*bodies)))])
+
+        def to_accessor(node: cst.Call) -> Optional[cst.BaseExpression]:
+            """
+            ``s.apply(lambda x: x.upper())`` -> ``s.str.upper()``, ``s.apply(lambda x: x.year)`` -> ``s.dt.year``.
+            Only when the lambda takes one parameter, the method or field is
+            taken from it, and the method's arguments do not use it.
+            """
+            if not m.matches(node, pattern):
+                return None
+            params = node.args[0].value.params
+            if len(params.params) != 1 or params.posonly_params or params.kwonly_params \
+                    or isinstance(params.star_arg, cst.Param) or params.star_kwarg is not None:
+                return None
+            name = m.Name(params.params[0].name.value)
+            body = node.args[0].value.body
+            receiver = body.func.value if isinstance(body, cst.Call) else body.value
+            if not m.matches(receiver, name):
+                return None
+            if isinstance(body, cst.Call) and any(m.findall(arg, name) for arg in body.args):
+                return None
+            if isinstance(body, cst.Call):
+                accessor = cst.Attribute(value=node.func.value, attr=cst.Name("str"))
+                return cst.Call(func=cst.Attribute(value=accessor, attr=body.func.attr), args=body.args)
+            accessor = cst.Attribute(value=node.func.value, attr=cst.Name("dt"))
+            return cst.Attribute(value=accessor, attr=body.attr)
+
+        return {'apply': to_accessor}
@@ -8,6 +8,7 @@ class SqlInjectionRule(Rule):
     code = "SEC001"
     message = "Potential SQL Injection detected. Use 'params' argument for dynamic queries instead of f-strings or concatenation."
     severity = "CRITICAL"
+    attrs = ('read_sql', 'read_sql_query')
 
     def check(self, node: ast.AST, context: dict) -> Optional[Issue]:
         if not isinstance(node, ast.Call):
@@ -8,6 +8,7 @@ class InplaceTrueRule(Rule):
     code = "STY001"
     message = "Avoid 'inplace=True'. It breaks method chaining and often doesn't save memory. Assign the result back to the variable."
     severity = "INFO"
+    triggers = ('inplace',)
 
     def check(self, node: ast.AST, context: dict) -> Optional[Issue]:
         if not isinstance(node, ast.Call):
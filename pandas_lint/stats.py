@@ -0,0 +1,92 @@
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Phases in reporting order. Worker phases are summed over all workers, so
+# with a pool their total can exceed the wall time. "transfer" runs from a
+# worker sending a batch to the parent picking it up, including any time
+# the parent was busy elsewhere. "read" runs on the I/O threads, overlapped
+# with analysis; "io_wait" is the part of it analysis had to wait for.
+PHASES = ("discovery", "cache", "read", "io_wait", "prefilter", "parse", "analyze", "fix", "transfer", "report")
+
+
+class Stats:
+    """
+    Counters and timings of one run, or of one worker batch to be merged
+    into the run's. Collected only with ``--stats``: every instrumented
+    call site checks ``stats is None`` first, so a normal run pays nothing.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        # Rule code -> [invocations, hits, seconds].
+        self.rules: Dict[str, List[float]] = {}
+        self.files = 0
+        self.bytes_read = 0
+        self.skipped_by_prefilter = 0
+        self.cells_reused = 0
+        self._mark = 0.0
+
+    def start(self):
+        self._mark = time.perf_counter()
+
+    def lap(self, phase: str):
+        """Charges the time since the previous ``start``/``lap`` to ``phase``."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._mark
+        self._mark = now
+
+    def add_time(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_rule(self, code: str, seconds: float, hit: bool):
+        entry = self.rules.get(code)
+        if entry is None:
+            entry = self.rules[code] = [0, 0, 0.0]
+        entry[0] += 1
+        entry[1] += hit
+        entry[2] += seconds
+
+    def merge(self, other: "Stats"):
+        for phase, seconds in other.phases.items():
+            self.add_time(phase, seconds)
+        for code, (calls, hits, seconds) in other.rules.items():
+            entry = self.rules.setdefault(code, [0, 0, 0.0])
+            entry[0] += calls
+            entry[1] += hits
+            entry[2] += seconds
+        self.files += other.files
+        self.bytes_read += other.bytes_read
+        self.skipped_by_prefilter += other.skipped_by_prefilter
+        self.cells_reused += other.cells_reused
+
+    def to_json(self, wall_time: Optional[float] = None) -> dict:
+        data = {
+            "files": self.files,
+            "bytes_read": self.bytes_read,
+            "skipped_by_prefilter": self.skipped_by_prefilter,
+            "cells_reused": self.cells_reused,
+            "phases": {phase: round(self.phases[phase], 6) for phase in PHASES if phase in self.phases},
+            "rules": {
+                code: {"invocations": int(calls), "hits": int(hits), "seconds": round(seconds, 6)}
+                for code, (calls, hits, seconds) in sorted(self.rules.items())
+            },
+        }
+        if wall_time is not None:
+            data["wall_time"] = round(wall_time, 6)
+        return data
+
+
+def timed(iterable: Iterable[T], stats: Stats, phase: str) -> Iterator[T]:
+    """Yields from ``iterable``, charging the time spent producing each item to ``phase``."""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            stats.add_time(phase, time.perf_counter() - start)
+            return
+        stats.add_time(phase, time.perf_counter() - start)
+        yield item
@@ -0,0 +1,201 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .discovery import DEFAULT_EXCLUDES, SOURCE_SUFFIXES, FileDiscoverer
+from .rules import Issue
+
+POLL_INTERVAL = 0.5
+# Events arriving this close together are reported as one batch.
+SETTLE_TIME = 0.05
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+class PollingWatcher:
+    """
+    Portable fallback: rescans the tree every ``interval`` seconds and
+    compares ``(mtime, size)`` signatures with the previous scan.
+    """
+
+    def __init__(self, scan: Callable[[], Iterable[str]], interval: float = POLL_INTERVAL):
+        self.scan = scan
+        self.interval = interval
+        self.snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Snapshot:
+        snapshot = {}
+        for path in self.scan():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[os.path.abspath(path)] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Blocks until something changed (or ``timeout`` expires) and returns the changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval if deadline is None else max(0, min(self.interval, deadline - time.monotonic())))
+            current = self._take_snapshot()
+            changed = {p for p, sig in current.items() if self.snapshot.get(p) != sig}
+            changed |= set(self.snapshot) - set(current)
+            self.snapshot = current
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watcher over a set of directories, driven through ctypes."""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, directories: Iterable[str]):
+        libc_name = ctypes.util.find_library("c")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories: Dict[int, str] = {}
+        self.overflowed = False
+        for directory in directories:
+            self.add(directory)
+
+    def add(self, directory: str):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd >= 0:
+            self.directories[wd] = directory
+
+    def _read_events(self) -> Set[str]:
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & self.IN_IGNORED:
+                self.directories.pop(wd, None)
+                continue
+            directory = self.directories.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if os.fsdecode(name) in DEFAULT_EXCLUDES:
+                    continue
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self.add(path)
+            changed.add(path)
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Blocks until something changed (or ``timeout`` expires) and returns
+        the changed paths. After a queue overflow every watched directory is
+        returned, so the caller rescans them all.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = self._read_events()
+        # Editors write files in several steps; collect the whole burst.
+        while select.select([self.fd], [], [], SETTLE_TIME)[0]:
+            changed |= self._read_events()
+        if self.overflowed:
+            self.overflowed = False
+            changed |= set(self.directories.values())
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(discoverer: FileDiscoverer, paths: List[str], poll: bool = False):
+    """An inotify watcher where available, otherwise a polling one."""
+    if not poll and sys.platform.startswith("linux"):
+        directories = set(discoverer.directories)
+        directories.update(os.path.dirname(os.path.abspath(p)) for p in paths if not os.path.isdir(p))
+        try:
+            return InotifyWatcher(sorted(directories))
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(lambda: FileDiscoverer(discoverer.resolver).discover(paths))
+
+
+def relevant_changes(changed: Iterable[str], known: Set[str], roots: List[str],
+                     discoverer: FileDiscoverer) -> Tuple[List[str], List[str]]:
+    """
+    Splits raw watcher paths into files to re-lint and known files that
+    disappeared. New files count only below one of the watched directories
+    ``roots``, and only if walking it would have found them (``.gitignore``,
+    ``exclude``, default excludes); changed directories are rescanned for
+    the files they contain. ``known``, ``roots`` and the returned paths are
+    absolute.
+    """
+    to_lint, deleted = set(), set()
+    for path in changed:
+        path = os.path.abspath(path)
+        in_scope = any(
+            (path == root or path.startswith(root + os.sep)) and not discoverer.skips(path, root) for root in roots
+        )
+        if os.path.isdir(path):
+            if not in_scope:
+                continue
+            to_lint.update(os.path.abspath(p) for p in FileDiscoverer(discoverer.resolver).discover([path]))
+            deleted.update(k for k in known if k.startswith(path + os.sep) and not os.path.exists(k))
+        elif os.path.isfile(path):
+            if path in known or (in_scope and path.endswith(SOURCE_SUFFIXES)):
+                to_lint.add(path)
+        else:
+            # A deleted file, or a directory moved away with everything in it.
+            deleted.update(k for k in known if k == path or k.startswith(path + os.sep))
+    return sorted(to_lint), sorted(deleted)
+
+
+def _issue_key(issue: Issue) -> Tuple[str, str, str]:
+    # Line numbers shift with every edit above an issue; code and snippet do not.
+    return issue.code, issue.snippet, issue.message
+
+
+def diff_issues(old: List[Issue], new: List[Issue]) -> Tuple[List[Issue], int]:
+    """Returns the issues of ``new`` not present in ``old`` and the number of resolved ones."""
+    remaining = Counter(_issue_key(i) for i in old)
+    added = []
+    for issue in new:
+        key = _issue_key(issue)
+        if remaining[key] > 0:
+            remaining[key] -= 1
+        else:
+            added.append(issue)
+    return added, sum(remaining.values())
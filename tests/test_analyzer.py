@@ -114,3 +114,42 @@ class TestAnalyzerEdgeCases:
         
         assert len(issues) == 1
         assert issues[0].code == "PERF004"
+
+
+class RecursiveVisitor(PandasVisitor):
+    """The ast.NodeVisitor traversal PandasVisitor.visit replaced, as a reference."""
+
+    def visit(self, node):
+        handler = self.handlers.get(type(node))
+        if handler is not None:
+            handler(node)
+        for child in ast.iter_child_nodes(node):
+            self.visit(child)
+
+
+class TestTraversal:
+    def test_matches_recursive_visit_order(self):
+        with open("tests/bad_code.py") as f:
+            tree = ast.parse(f.read() + """
+def later():
+    import pandas as pandas_alias
+    global frame
+    return pandas_alias.read_csv('a.csv'), pd.read_csv('b.csv'), [x.apply(f) for x in frame.iterrows()]
+""")
+        iterative, recursive = PandasVisitor(), RecursiveVisitor()
+        iterative.visit(tree)
+        recursive.visit(tree)
+
+        assert iterative.issues == recursive.issues
+        assert iterative.pandas_alias == "pandas_alias"
+
+    def test_alias_applies_from_the_import_on(self):
+        issues = analyze_code("datos.read_csv('a.csv')\nimport pandas as datos\ndatos.read_csv('b.csv')\n")
+
+        assert [(i.code, i.line) for i in issues] == [("MEM001", 3)]
+
+    def test_deeply_nested_expression(self):
+        # Parses, but exceeds the recursion limit of a recursive visitor.
+        issues = analyze_code("x = " + " + ".join(["df.apply(f)"] * 1500) + "\n")
+
+        assert len(issues) == 1500
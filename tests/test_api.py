@@ -0,0 +1,69 @@
+import json
+import pandas_lint
+from pandas_lint import Config, FileResult, Linter
+
+
+def write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return str(path)
+
+
+class TestLinter:
+    def test_is_exported(self):
+        assert set(pandas_lint.__all__) >= {"Linter", "Config", "FileResult", "Issue"}
+
+    def test_lint_source(self):
+        result = Linter(Config()).lint_source("import pandas as pd\ndf.iterrows()\n", "snippet.py")
+
+        assert isinstance(result, FileResult)
+        assert result.path == "snippet.py"
+        assert [(i.line, i.code) for i in result.issues] == [(2, "PERF001")]
+
+    def test_lint_source_notebook(self):
+        notebook = json.dumps({"cells": [{"cell_type": "markdown", "source": "# x"},
+                                         {"cell_type": "code", "source": "df.iterrows()"}]})
+
+        result = Linter(Config()).lint_source(notebook, "analysis.ipynb")
+
+        assert [i.code for i in result.issues] == ["PERF001"]
+        assert result.cell_mapping[1] == 1
+
+    def test_lint_file_uses_nearest_pyproject(self, tmp_path):
+        write(tmp_path / "pyproject.toml", '[tool.pandas-linter]\nignore = ["PERF001"]\n')
+        path = write(tmp_path / "mod.py", "df.iterrows()\ndf.apply(f)\n")
+
+        result = Linter().lint_file(path)
+
+        assert [i.code for i in result.issues] == ["PERF002"]
+
+    def test_lint_paths_streams_results(self, tmp_path):
+        for i in range(12):
+            write(tmp_path / "pkg" / f"m{i}.py", "df.iterrows()\n")
+        write(tmp_path / "pkg" / "__pycache__" / "skip.py", "df.iterrows()\n")
+
+        with Linter(Config(), jobs=2) as linter:
+            results = linter.lint_paths([str(tmp_path)])
+            first = next(results)
+            rest = list(results)
+
+        assert first.issues
+        assert len(rest) == 11
+
+    def test_lint_paths_with_cache(self, tmp_path):
+        write(tmp_path / "src" / "a.py", "df.iterrows()\n")
+        write(tmp_path / "src" / "b.py", "x = 1\n")
+        linter = Linter(Config(), cache_dir=str(tmp_path / "cache"))
+
+        cold = sorted(linter.lint_paths([str(tmp_path / "src")]))
+        warm = sorted(linter.lint_paths([str(tmp_path / "src")]))
+
+        assert [r.path for r in cold] == [r.path for r in warm]
+        assert [r.issues for r in cold] == [r.issues for r in warm]
+
+    def test_limits(self, tmp_path):
+        path = write(tmp_path / "big.py", "df.iterrows()\n" * 100)
+
+        result = Linter(Config(), max_file_size="1KB").lint_file(path)
+
+        assert result.skipped and not result.issues
@@ -0,0 +1,177 @@
+import os
+from click.testing import CliRunner
+from pandas_lint.cache import ResultCache, rules_fingerprint
+from pandas_lint.cli import analyze_file, main
+from pandas_lint.config import Config
+from pandas_lint.rules import Issue
+
+
+def write(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+class TestResultCache:
+    def test_miss_then_hit(self, tmp_path):
+        source = tmp_path / "a.py"
+        write(source, "df.iterrows()\n")
+        cache = ResultCache(str(tmp_path / "cache"))
+
+        result, token = cache.lookup(str(source))
+        assert result is None
+
+        cache.store(token, analyze_file(str(source)))
+        result, _ = cache.lookup(str(source))
+
+        assert result is not None
+        assert [i.code for i in result.issues] == ["PERF001"]
+        assert isinstance(result.issues[0], Issue)
+        assert result.issues[0].snippet == "df.iterrows()"
+
+    def test_content_change_invalidates(self, tmp_path):
+        source = tmp_path / "a.py"
+        write(source, "df.iterrows()\n")
+        cache = ResultCache(str(tmp_path / "cache"))
+        _, token = cache.lookup(str(source))
+        cache.store(token, analyze_file(str(source)))
+
+        write(source, "df.to_csv('x.csv')\n# changed\n")
+        result, _ = cache.lookup(str(source))
+
+        assert result is None
+
+    def test_touch_without_change_is_a_hit(self, tmp_path):
+        source = tmp_path / "a.py"
+        write(source, "df.iterrows()\n")
+        cache = ResultCache(str(tmp_path / "cache"))
+        _, token = cache.lookup(str(source))
+        cache.store(token, analyze_file(str(source)))
+
+        st = os.stat(source)
+        os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        result, _ = cache.lookup(str(source))
+
+        assert result is not None
+
+    def test_ignore_config_is_part_of_the_key(self, tmp_path):
+        source = tmp_path / "a.py"
+        write(source, "df.iterrows()\n")
+        cache = ResultCache(str(tmp_path / "cache"))
+        _, token = cache.lookup(str(source))
+        cache.store(token, analyze_file(str(source)))
+
+        result, _ = cache.lookup(str(source), Config(ignore=frozenset(["PERF001"])))
+
+        assert result is None
+
+    def test_prune_evicts_other_fingerprints(self, tmp_path):
+        cache = ResultCache(str(tmp_path / "cache"))
+        stale = tmp_path / "cache" / "0000000000000000"
+        stale.mkdir()
+
+        cache.prune()
+
+        assert not stale.exists()
+        assert os.path.isdir(cache.directory)
+
+    def test_prune_evicts_entries_of_files_no_longer_linted(self, tmp_path):
+        project, elsewhere = tmp_path / "project", tmp_path / "elsewhere"
+        project.mkdir()
+        elsewhere.mkdir()
+        paths = [project / "kept.py", project / "deleted.py", project / "renamed.py", elsewhere / "other.py"]
+        cache = ResultCache(str(tmp_path / "cache"))
+        for path in paths:
+            write(path, "df.iterrows()\n")
+            cache.store(cache.lookup(str(path))[1], analyze_file(str(path)))
+        os.remove(paths[1])
+        os.rename(paths[2], project / "moved.py")
+
+        cache = ResultCache(str(tmp_path / "cache"))
+        for path in (paths[0], project / "moved.py"):
+            cache.store(cache.lookup(str(path))[1], analyze_file(str(path)))
+        cache.prune([str(project)])
+
+        assert cache.lookup(str(paths[0]))[0] is not None
+        assert cache.lookup(str(project / "moved.py"))[0] is not None
+        # Not linted this time, but outside the run's paths: kept.
+        assert cache.lookup(str(paths[3]))[0] is not None
+        assert len(os.listdir(cache.directory)) == 3
+
+    def test_fingerprint_covers_rule_sources(self, tmp_path, monkeypatch):
+        import pandas_lint.rules.performance as performance
+        copy = tmp_path / "performance.py"
+        write(copy, open(performance.__file__).read())
+        monkeypatch.setattr(performance, "__file__", str(copy))
+        before = rules_fingerprint()
+
+        with open(copy, "a") as f:
+            f.write("# edited\n")
+
+        assert rules_fingerprint() != before
+
+
+def test_cli_uses_cache_dir(tmp_path):
+    source = tmp_path / "a.py"
+    write(source, "df.iterrows()\n")
+    cache_dir = tmp_path / "cache"
+    runner = CliRunner()
+
+    first = runner.invoke(main, [str(source), '--cache-dir', str(cache_dir)])
+    second = runner.invoke(main, [str(source), '--cache-dir', str(cache_dir)])
+
+    assert first.exit_code == second.exit_code == 1
+    assert "PERF001" in second.output
+    assert os.listdir(cache_dir)
+
+
+def test_cli_no_cache(tmp_path):
+    source = tmp_path / "a.py"
+    write(source, "df.iterrows()\n")
+    cache_dir = tmp_path / "cache"
+
+    result = CliRunner().invoke(main, [str(source), '--no-cache', '--cache-dir', str(cache_dir)])
+
+    assert result.exit_code == 1
+    assert not cache_dir.exists()
+
+
+def test_cli_leaves_a_foreign_cache_dir_alone(tmp_path):
+    project = tmp_path / "project"
+    (project / "important" / "data").mkdir(parents=True)
+    (project / "0123456789abcdef").mkdir()
+    write(project / "important" / "data" / "x.txt", "keep me\n")
+    write(project / ".gitignore", "*.pyc\n")
+    source = project / "a.py"
+    write(source, "df.iterrows()\n")
+
+    result = CliRunner().invoke(main, [str(source), '--cache-dir', str(project)])
+
+    assert result.exit_code == 1
+    assert (project / "important" / "data" / "x.txt").read_text() == "keep me\n"
+    assert (project / "0123456789abcdef").is_dir()
+    assert (project / ".gitignore").read_text() == "*.pyc\n"
+    assert not (project / "CACHEDIR.TAG").exists()
+
+
+def test_cli_tags_the_cache_dir_it_creates(tmp_path):
+    source = tmp_path / "a.py"
+    write(source, "df.iterrows()\n")
+    cache_dir = tmp_path / "cache"
+
+    CliRunner().invoke(main, [str(source), '--cache-dir', str(cache_dir)])
+
+    assert (cache_dir / "CACHEDIR.TAG").read_text().startswith("Signature: 8a477f597d28d172789f06886806bc55")
+    assert (cache_dir / ".gitignore").read_text() == "*\n"
+
+
+def test_cli_runs_without_cache_when_dir_is_unusable(tmp_path):
+    source = tmp_path / "a.py"
+    write(source, "df.iterrows()\n")
+    blocker = tmp_path / "file"
+    write(blocker, "")
+
+    result = CliRunner().invoke(main, [str(source), '--cache-dir', str(blocker / "cache")])
+
+    assert result.exit_code == 1
+    assert "running without a cache" in result.output
+    assert "PERF001" in result.output
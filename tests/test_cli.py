@@ -16,3 +16,33 @@ def test_lint_file_exists():
         result = runner.invoke(main, ['test.py'])
         assert result.exit_code in [0, 1]
         assert "Found" in result.output and "issues" in result.output
+
+def test_lints_many_paths_once(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("df.iterrows()\n")
+    (tmp_path / "b.py").write_text("df.to_csv('x.csv')\n")
+    runner = CliRunner()
+
+    result = runner.invoke(main, [
+        str(tmp_path / "pkg"), str(tmp_path / "pkg" / "a.py"), str(tmp_path / "b.py"), str(tmp_path / "b.py"),
+        '--no-cache',
+    ])
+
+    assert result.exit_code == 1
+    assert "Found 2" in result.output
+
+def test_requires_a_path():
+    result = CliRunner().invoke(main, [])
+    assert result.exit_code == 2
+
+def test_reads_stdin():
+    runner = CliRunner()
+    result = runner.invoke(main, ['-', '--no-cache'], input="df.iterrows()\n")
+    assert result.exit_code == 1
+    assert "PERF001" in result.output
+
+def test_stdin_filename_names_the_source():
+    runner = CliRunner()
+    result = runner.invoke(main, ['--stdin-filename', 'pipeline.py', '--no-cache'], input="df.iterrows()\n")
+    assert result.exit_code == 1
+    assert "pipeline.py" in result.output
@@ -0,0 +1,87 @@
+from click.testing import CliRunner
+from pandas_lint import config as config_module
+from pandas_lint.cli import main
+import pytest
+from pandas_lint.config import DEFAULT_CONFIG, ConfigResolver, parse_size
+
+
+def write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+class TestConfigResolver:
+    def test_nearest_pyproject_wins(self, tmp_path):
+        write(tmp_path / "pyproject.toml", '[tool.pandas-linter]\nignore = ["IO001"]\n')
+        write(tmp_path / "sub" / "pyproject.toml", '[tool.pandas-linter]\nignore = ["PERF001"]\n')
+        resolver = ConfigResolver()
+
+        assert resolver.for_path(str(tmp_path / "a.py")).ignore == {"IO001"}
+        assert resolver.for_path(str(tmp_path / "sub" / "pkg" / "b.py")).ignore == {"PERF001"}
+
+    def test_pyproject_without_section_is_skipped(self, tmp_path):
+        write(tmp_path / "pyproject.toml", '[tool.pandas-linter]\nignore = ["IO001"]\n')
+        write(tmp_path / "sub" / "pyproject.toml", '[project]\nname = "sub"\n')
+
+        config = ConfigResolver().for_path(str(tmp_path / "sub" / "b.py"))
+
+        assert config.ignore == {"IO001"}
+        assert config.source == str(tmp_path / "pyproject.toml")
+
+    def test_defaults_without_pyproject(self, tmp_path):
+        assert ConfigResolver().for_path(str(tmp_path / "a.py")) == DEFAULT_CONFIG
+
+    def test_parses_each_pyproject_once(self, tmp_path, monkeypatch):
+        write(tmp_path / "pyproject.toml", '[tool.pandas-linter]\nignore = ["IO001"]\n')
+        calls = []
+        original = config_module.load_pyproject
+        monkeypatch.setattr(config_module, "load_pyproject", lambda p: calls.append(p) or original(p))
+        resolver = ConfigResolver()
+
+        for name in ("a.py", "b.py", "deep/c.py", "deep/d.py"):
+            resolver.for_path(str(tmp_path / name))
+
+        assert calls == [str(tmp_path / "pyproject.toml")]
+
+    def test_limits(self, tmp_path):
+        write(tmp_path / "pyproject.toml", '[tool.pandas-linter]\nmax-file-size = "2MB"\ntimeout = 5\n')
+        write(tmp_path / "bad" / "pyproject.toml", '[tool.pandas-linter]\nmax-file-size = "huge"\ntimeout = -1\n')
+        resolver = ConfigResolver()
+
+        config = resolver.for_path(str(tmp_path / "a.py"))
+        bad = resolver.for_path(str(tmp_path / "bad" / "a.py"))
+
+        assert (config.max_file_size, config.timeout) == (2 * 1024 ** 2, 5.0)
+        assert (bad.max_file_size, bad.timeout) == (None, None)
+
+    def test_overrides_apply_everywhere(self, tmp_path):
+        write(tmp_path / "sub" / "pyproject.toml", '[tool.pandas-linter]\nmax-file-size = 10\ntimeout = 5\n')
+        resolver = ConfigResolver(overrides={"timeout": 1.5, "max_file_size": None})
+
+        config = resolver.for_path(str(tmp_path / "sub" / "a.py"))
+
+        assert (config.max_file_size, config.timeout) == (10, 1.5)
+        assert resolver.for_path(str(tmp_path / "a.py")).timeout == 1.5
+
+
+@pytest.mark.parametrize("value, size", [(100, 100), ("100", 100), ("512KB", 512 * 1024), ("1.5 MiB", 1536 * 1024), ("2g", 2 * 1024 ** 3)])
+def test_parse_size(value, size):
+    assert parse_size(value) == size
+
+
+@pytest.mark.parametrize("value", ["", "big", "0", "-1", "5TB", True])
+def test_parse_size_rejects(value):
+    with pytest.raises(ValueError):
+        parse_size(value)
+
+
+def test_cli_applies_subproject_ignore(tmp_path):
+    write(tmp_path / "pyproject.toml", '[tool.pandas-linter]\nignore = []\n')
+    write(tmp_path / "legacy" / "pyproject.toml", '[tool.pandas-linter]\nignore = ["PERF001"]\n')
+    write(tmp_path / "legacy" / "old.py", "df.iterrows()\n")
+    write(tmp_path / "new.py", "df.iterrows()\n")
+
+    result = CliRunner().invoke(main, [str(tmp_path), '--no-cache'])
+
+    assert "new.py" in result.output
+    assert "old.py" not in result.output
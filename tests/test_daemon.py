@@ -0,0 +1,143 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import pytest
+from click.testing import CliRunner
+from pandas_lint.cli import main
+from pandas_lint.daemon import DaemonUnavailable, LintDaemon, default_socket_path, lint_via_daemon, send_request, serve
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "getuid"), reason="Unix domain sockets required")
+
+
+@pytest.fixture
+def socket_path():
+    directory = tempfile.mkdtemp(prefix="pl-")
+    yield os.path.join(directory, "d.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def running_daemon(socket_path):
+    thread = threading.Thread(target=serve, args=(socket_path, 1), daemon=True)
+    thread.start()
+    for _ in range(100):
+        try:
+            send_request({"op": "ping"}, socket_path)
+            break
+        except DaemonUnavailable:
+            time.sleep(0.02)
+    yield socket_path
+    send_request({"op": "shutdown"}, socket_path)
+    thread.join(timeout=5)
+
+
+class TestLintDaemon:
+    def test_reuses_results_of_unchanged_files(self, tmp_path, monkeypatch):
+        source = tmp_path / "a.py"
+        source.write_text("df.iterrows()\n")
+        daemon = LintDaemon(jobs=1)
+        runs = []
+        original = daemon.engine.run
+        monkeypatch.setattr(daemon.engine, "run", lambda jobs: runs.append(list(jobs)) or original(runs[-1]))
+
+        first = daemon.lint([str(source)])
+        second = daemon.lint([str(source)])
+
+        assert first == second
+        assert [len(r) for r in runs] == [1, 0]
+
+    def test_reanalyzes_modified_files(self, tmp_path):
+        source = tmp_path / "a.py"
+        source.write_text("df.iterrows()\n")
+        daemon = LintDaemon(jobs=1)
+        daemon.lint([str(source)])
+
+        source.write_text("df.to_csv('x.csv')\n\n")
+        result = daemon.lint([str(source)])
+
+        assert [i.code for i in result[0].issues] == ["IO001"]
+
+    def test_forgets_deleted_files(self, tmp_path):
+        for name in ("a.py", "b.py"):
+            (tmp_path / name).write_text("df.iterrows()\n")
+        daemon = LintDaemon(jobs=1)
+        daemon.lint([str(tmp_path)])
+
+        (tmp_path / "b.py").unlink()
+        result = daemon.lint([str(tmp_path)])
+
+        assert [r.path for r in result] == [str(tmp_path / "a.py")]
+        assert list(daemon._results) == [str(tmp_path / "a.py")]
+
+    def test_socket_prefers_the_runtime_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        assert default_socket_path() == str(tmp_path / "pandas-lint.sock")
+
+        monkeypatch.delenv("XDG_RUNTIME_DIR")
+        assert default_socket_path().startswith(tempfile.gettempdir())
+
+    def test_unknown_request(self):
+        assert "error" in LintDaemon(jobs=1).handle({"op": "nope"})
+
+
+class TestDaemonSocket:
+    def test_lint_round_trip(self, running_daemon, tmp_path):
+        source = tmp_path / "a.py"
+        source.write_text("df.iterrows()\n")
+
+        results = lint_via_daemon([str(source)], running_daemon)
+
+        assert results[0].path == str(source)
+        assert results[0].issues[0].code == "PERF001"
+        assert results[0].issues[0].snippet == "df.iterrows()"
+
+    def test_client_command_uses_daemon(self, running_daemon, tmp_path):
+        source = tmp_path / "a.py"
+        source.write_text("df.iterrows()\n")
+
+        result = CliRunner().invoke(main, ["client", str(source), "--socket", running_daemon])
+
+        assert result.exit_code == 1
+        assert "PERF001" in result.output
+
+    def test_client_reports_daemon_errors(self, running_daemon, tmp_path, monkeypatch):
+        source = tmp_path / "a.py"
+        source.write_text("df.iterrows()\n")
+
+        def fail(self, paths):
+            raise ValueError("boom")
+
+        monkeypatch.setattr(LintDaemon, "lint", fail)
+        result = CliRunner().invoke(main, ["client", str(source), "--socket", running_daemon])
+
+        assert result.exit_code == 1
+        assert "Error: ValueError: boom" in result.output
+        assert not isinstance(result.exception, RuntimeError)
+
+    def test_client_falls_back_without_daemon(self, socket_path, tmp_path, monkeypatch):
+        source = tmp_path / "a.py"
+        source.write_text("df.iterrows()\n")
+        # The fallback lints with the default cache, in the working directory.
+        monkeypatch.chdir(tmp_path)
+
+        result = CliRunner().invoke(main, ["client", str(source), "--socket", socket_path])
+
+        assert result.exit_code == 1
+        assert "PERF001" in result.output
+
+    def test_stop(self, socket_path):
+        thread = threading.Thread(target=serve, args=(socket_path, 1), daemon=True)
+        thread.start()
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.02)
+
+        result = CliRunner().invoke(main, ["daemon", "--stop", "--socket", socket_path])
+        thread.join(timeout=5)
+
+        assert result.exit_code == 0
+        assert not thread.is_alive()
+        assert not os.path.exists(socket_path)
@@ -0,0 +1,101 @@
+import os
+import pytest
+from pandas_lint.config import ConfigResolver
+from pandas_lint.discovery import IgnoreSpec, discover_files
+
+
+def touch(path, content="x = 1\n"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def found(root, **kwargs):
+    return sorted(os.path.relpath(p, root) for p in discover_files([str(root)], **kwargs))
+
+
+class TestIgnoreSpec:
+    @pytest.mark.parametrize("pattern,path,is_dir,expected", [
+        ("*.py", "a/b/c.py", False, True),
+        ("/build", "build", True, True),
+        ("/build", "src/build", True, None),
+        ("docs/", "docs", False, None),
+        ("docs/", "docs", True, True),
+        ("src/**/gen_*.py", "src/x/y/gen_a.py", False, True),
+        ("**/fixtures", "a/b/fixtures", True, True),
+        ("data[0-9].py", "data7.py", False, True),
+    ])
+    def test_patterns(self, tmp_path, pattern, path, is_dir, expected):
+        spec = IgnoreSpec(str(tmp_path), [pattern])
+
+        assert spec.match(str(tmp_path / path), is_dir) is expected
+
+    def test_negation_last_match_wins(self, tmp_path):
+        spec = IgnoreSpec(str(tmp_path), ["*.py", "!keep.py"])
+
+        assert spec.match(str(tmp_path / "keep.py"), False) is False
+        assert spec.match(str(tmp_path / "drop.py"), False) is True
+
+
+class TestDiscovery:
+    def test_finds_python_and_notebooks(self, tmp_path):
+        touch(tmp_path / "a.py")
+        touch(tmp_path / "pkg" / "b.ipynb", "{}")
+        touch(tmp_path / "notes.txt")
+
+        assert found(tmp_path) == ["a.py", os.path.join("pkg", "b.ipynb")]
+
+    def test_prunes_default_excludes_and_virtualenvs(self, tmp_path):
+        touch(tmp_path / "a.py")
+        touch(tmp_path / "node_modules" / "x.py")
+        touch(tmp_path / "__pycache__" / "y.py")
+        touch(tmp_path / "build" / "z.py")
+        touch(tmp_path / "myenv" / "pyvenv.cfg")
+        touch(tmp_path / "myenv" / "lib" / "w.py")
+
+        assert found(tmp_path) == ["a.py"]
+
+    def test_honors_gitignore(self, tmp_path):
+        touch(tmp_path / ".gitignore", "generated/\n*_pb2.py\n")
+        touch(tmp_path / "a.py")
+        touch(tmp_path / "msg_pb2.py")
+        touch(tmp_path / "generated" / "b.py")
+        touch(tmp_path / "sub" / ".gitignore", "local.py\n")
+        touch(tmp_path / "sub" / "local.py")
+        touch(tmp_path / "sub" / "kept.py")
+
+        assert found(tmp_path) == ["a.py", os.path.join("sub", "kept.py")]
+
+    def test_honors_ancestor_gitignore_inside_repo(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        touch(tmp_path / ".gitignore", "src/legacy/\n")
+        touch(tmp_path / "src" / "legacy" / "old.py")
+        touch(tmp_path / "src" / "new.py")
+
+        assert found(tmp_path / "src") == ["new.py"]
+
+    def test_honors_config_exclude(self, tmp_path):
+        touch(tmp_path / "pyproject.toml", '[tool.pandas-linter]\nexclude = ["migrations/", "scratch_*.py"]\n')
+        touch(tmp_path / "app" / "migrations" / "0001.py")
+        touch(tmp_path / "scratch_1.py")
+        touch(tmp_path / "app" / "views.py")
+
+        assert found(tmp_path, resolver=ConfigResolver()) == [os.path.join("app", "views.py")]
+
+    def test_explicit_files_are_always_yielded(self, tmp_path):
+        touch(tmp_path / "build" / "setup_helper.py")
+        path = str(tmp_path / "build" / "setup_helper.py")
+
+        assert list(discover_files([path])) == [path]
+
+    def test_dedupes_symlinks(self, tmp_path):
+        touch(tmp_path / "real.py")
+        os.symlink(tmp_path / "real.py", tmp_path / "alias.py")
+
+        assert len(found(tmp_path)) == 1
+
+    def test_is_a_generator(self, tmp_path):
+        touch(tmp_path / "a.py")
+
+        files = discover_files([str(tmp_path)])
+
+        assert next(files).endswith("a.py")
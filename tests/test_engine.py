@@ -0,0 +1,354 @@
+from click.testing import CliRunner
+from pandas_lint.cli import main
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+import pytest
+from pandas_lint import engine as engine_module
+from pandas_lint import prefetch
+from pandas_lint.config import Config
+from pandas_lint.engine import (Engine, FileTimeout, analyze_batch, analyze_file, analyze_guarded, iter_batches,
+                                time_budget)
+from pandas_lint.stats import Stats
+
+
+def make_files(tmp_path, count, content="df.iterrows()\n"):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"mod_{i}.py"
+        path.write_text(content)
+        paths.append(str(path))
+    return paths
+
+
+class TestIterBatches:
+    def test_keeps_every_job_in_order(self):
+        jobs = [((f"f{i}.py", None), 100) for i in range(10)]
+
+        batches = list(iter_batches(jobs, max_bytes=250))
+
+        assert [j for b in batches for j in b] == [job for job, _ in jobs]
+        assert max(len(b) for b in batches) == 2
+
+    def test_large_file_gets_own_batch(self):
+        jobs = [(("small.py", None), 10), (("huge.py", None), 10_000), (("tiny.py", None), 1)]
+
+        batches = list(iter_batches(jobs, max_bytes=100))
+
+        assert [len(b) for b in batches] == [1, 1, 1]
+
+    def test_respects_max_files(self):
+        jobs = [((f"f{i}.py", None), 0) for i in range(10)]
+
+        batches = list(iter_batches(jobs, max_files=3))
+
+        assert max(len(b) for b in batches) == 3
+
+    def test_is_lazy(self):
+        consumed = []
+
+        def stream():
+            for i in range(100):
+                consumed.append(i)
+                yield (f"f{i}.py", None), 10
+
+        first = next(iter_batches(stream(), max_bytes=25))
+
+        assert len(first) == 2
+        assert len(consumed) == 3
+
+
+class TestEngine:
+    def test_small_runs_stay_in_process(self, tmp_path):
+        files = make_files(tmp_path, 2)
+        with Engine(jobs=4) as engine:
+            results = list(engine.run((f, None) for f in files))
+
+            assert engine._executor is None
+        assert sorted(r.path for r in results) == sorted(files)
+
+    def test_pool_returns_every_result(self, tmp_path):
+        files = make_files(tmp_path, 12)
+        with Engine(jobs=2, in_process_max_files=0, in_process_max_bytes=0) as engine:
+            results = list(engine.run((f, None) for f in files))
+
+            assert engine._executor is not None
+        assert sorted(r.path for r in results) == sorted(files)
+        assert all(r.issues[0].code == "PERF001" for r in results)
+
+    def test_results_stream_while_jobs_are_produced(self, tmp_path):
+        files = make_files(tmp_path, 20)
+        events = []
+
+        def jobs():
+            for f in files:
+                events.append("job")
+                yield f, None
+
+        with Engine(jobs=1) as engine:
+            for _ in engine.run(jobs()):
+                events.append("result")
+
+        # Only the prefetch window is produced ahead of the first result.
+        assert events.index("result") == prefetch.PREFETCH_AHEAD + 1
+
+    def test_in_process_runs_use_the_prefetch(self, tmp_path, monkeypatch):
+        files = make_files(tmp_path, 5)
+        buffers = []
+        real = engine_module.analyze_guarded
+
+        def recording(*args, data=None, **kwargs):
+            buffers.append(bytes(data))
+            return real(*args, data=data, **kwargs)
+
+        monkeypatch.setattr(engine_module, "analyze_guarded", recording)
+        with Engine(jobs=1) as engine:
+            assert len(list(engine.run((f, None) for f in files))) == 5
+
+        assert buffers == [b"df.iterrows()\n"] * 5
+
+    def test_single_job_never_spawns_pool(self, tmp_path):
+        files = make_files(tmp_path, 20)
+        with Engine(jobs=1, in_process_max_files=0, in_process_max_bytes=0) as engine:
+            list(engine.run((f, None) for f in files))
+
+            assert engine._executor is None
+
+
+class TestAnalyzeFile:
+    def test_attaches_snippet_to_issue(self, tmp_path):
+        path = make_files(tmp_path, 1, "import pandas as pd\n\nfor i, r in df.iterrows():\n    pass\n")[0]
+
+        result = analyze_file(path)
+
+        assert result.issues[0].snippet == "for i, r in df.iterrows():"
+
+    def test_cell_mapping_only_sent_with_issues(self, tmp_path):
+        notebook = tmp_path / "clean.ipynb"
+        notebook.write_text(json.dumps({"cells": [{"cell_type": "code", "source": ["x = 1\n"]}]}))
+
+        assert analyze_file("tests/test_notebook.ipynb").cell_mapping
+        assert analyze_file(str(notebook)).cell_mapping is None
+
+    def test_result_pickles_without_source(self, tmp_path):
+        path = make_files(tmp_path, 1, "df.iterrows()\n" + "x = 1\n" * 5000)[0]
+
+        payload = pickle.dumps(analyze_file(path))
+
+        assert len(payload) < 1000
+
+    def test_too_deep_to_parse_is_not_fatal(self, tmp_path):
+        path = make_files(tmp_path, 1, "x = " + " + ".join(["df.apply(f)"] * 5000) + "\ndf.iterrows()\n")[0]
+
+        # Python 3.8 and 3.9 still parse this; newer versions give up.
+        assert len(analyze_file(path).issues) in (0, 5001)
+
+
+class TestPrefetch:
+    def test_yields_every_job_in_order_with_its_content(self, tmp_path):
+        paths = []
+        for i in range(20):
+            (tmp_path / f"mod_{i}.py").write_text(f"x = {i}\n")
+            paths.append(str(tmp_path / f"mod_{i}.py"))
+        jobs = [(path, None) for path in paths]
+
+        items = [(job, bytes(data)) for job, data in prefetch.prefetched(jobs)]
+
+        assert [job for job, _ in items] == jobs
+        assert [data for _, data in items] == [f"x = {i}\n".encode() for i in range(20)]
+
+    def test_maps_notebooks_and_large_files(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(prefetch, "MMAP_MIN_BYTES", 100)
+        small = make_files(tmp_path, 1)[0]
+        (tmp_path / "large.py").write_text("x = 1\n" * 100)
+        large = str(tmp_path / "large.py")
+        seen = {}
+
+        for (path, _), data in prefetch.prefetched([(small, None), (large, None), ("tests/test_notebook.ipynb", None)]):
+            seen[path] = data
+
+        assert isinstance(seen[small], bytes)
+        # Mapped buffers are closed once the consumer moves on.
+        assert seen[large].closed and seen["tests/test_notebook.ipynb"].closed
+
+    def test_unreadable_and_oversized_files_are_left_to_the_analysis(self, tmp_path):
+        path = make_files(tmp_path, 1)[0]
+        jobs = [(str(tmp_path / "missing.py"), None), (path, Config(max_file_size=5))]
+
+        assert [data for _, data in prefetch.prefetched(jobs)] == [None, None]
+
+    def test_abandoned_iteration_releases_buffers(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(prefetch, "MMAP_MIN_BYTES", 1)
+        paths = make_files(tmp_path, 5)
+        maps = []
+        real_fetch = prefetch.fetch
+        monkeypatch.setattr(prefetch, "fetch", lambda *args: maps.append(real_fetch(*args)) or maps[-1])
+
+        items = prefetch.prefetched((path, None) for path in paths)
+        next(items)
+        items.close()
+
+        assert len(maps) == 5 and all(data.closed for data, _ in maps)
+
+    def test_can_be_turned_off(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(prefetch, "PREFETCH_THREADS", 0)
+        path = make_files(tmp_path, 1)[0]
+
+        assert list(prefetch.prefetched([(path, None)])) == [((path, None), None)]
+
+    def test_batches_report_the_same_results_and_time_io(self, tmp_path, monkeypatch):
+        paths = make_files(tmp_path, 5) + ["tests/test_notebook.ipynb"]
+        jobs = [(path, Config()) for path in paths]
+        stats = Stats()
+
+        results = analyze_batch(jobs, stats)
+        monkeypatch.setattr(prefetch, "PREFETCH_THREADS", 0)
+        unfetched = analyze_batch(jobs, Stats())
+
+        assert [r.issues for r in results] == [r.issues for r in unfetched]
+        assert results[-1].cell_mapping == unfetched[-1].cell_mapping
+        assert {"read", "io_wait"} <= set(stats.phases)
+        assert stats.bytes_read == sum(os.path.getsize(path) for path in paths)
+
+
+def crashing_batch(jobs, stats=None):
+    """Kills its worker process when handed crash.py, like a segfault in a C extension would."""
+    if any(os.path.basename(path) == "crash.py" for path, _ in jobs):
+        os._exit(1)
+    return analyze_batch(jobs, stats)
+
+
+class TestGuards:
+    def test_large_files_are_skipped_unread(self, tmp_path):
+        path = make_files(tmp_path, 1, "df.iterrows()\n" * 10)[0]
+
+        result = analyze_file(path, Config(max_file_size=100))
+
+        assert result.issues == []
+        assert result.skipped == "140 bytes of source, over the 100 byte limit"
+        assert analyze_file(path, Config(max_file_size=140)).skipped is None
+
+    def test_notebook_size_counts_code_only(self, tmp_path):
+        notebook = tmp_path / "nb.ipynb"
+        notebook.write_text(json.dumps({"cells": [
+            {"cell_type": "code", "source": "df.iterrows()\n", "outputs": [{"data": {"image/png": "A" * 10000}}]},
+        ]}))
+
+        assert analyze_file(str(notebook), Config(max_file_size=100)).issues
+        assert analyze_file(str(notebook), Config(max_file_size=10)).skipped
+
+    def test_time_budget_interrupts(self):
+        with pytest.raises(FileTimeout):
+            with time_budget(0.05):
+                time.sleep(1)
+        with time_budget(None):
+            pass
+
+    def test_time_budget_restores_the_host_timer(self):
+        import signal
+        fired = []
+        previous = signal.signal(signal.SIGALRM, lambda *args: fired.append(True))
+        try:
+            signal.setitimer(signal.ITIMER_REAL, 10, 5)
+            with time_budget(0.5):
+                pass
+            delay, interval = signal.getitimer(signal.ITIMER_REAL)
+            assert 9 < delay <= 10 and interval == 5
+
+            signal.setitimer(signal.ITIMER_REAL, 0.01)
+            with time_budget(0.5):
+                time.sleep(0.05)
+            time.sleep(0.05)
+            assert fired == [True]
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+    def test_slow_and_failing_files_are_skipped(self, tmp_path, monkeypatch):
+        path = make_files(tmp_path, 1)[0]
+        monkeypatch.setattr(engine_module, "analyze_file", lambda *args: time.sleep(1))
+        assert analyze_guarded(path, Config(timeout=0.05)).skipped == "analysis took longer than 0.05 s"
+
+        monkeypatch.setattr(engine_module, "analyze_file", lambda *args: 1 / 0)
+        assert analyze_guarded(path, Config()).skipped == "internal error: ZeroDivisionError: division by zero"
+
+    def test_dead_worker_loses_only_its_file(self, tmp_path):
+        paths = make_files(tmp_path, 20)
+        (tmp_path / "crash.py").write_text("df.iterrows()\n")
+        paths.insert(7, str(tmp_path / "crash.py"))
+
+        with Engine(jobs=2, in_process_max_files=0, in_process_max_bytes=0, batch_max_bytes=50) as engine:
+            results = {r.path: r for r in engine.run(((p, None) for p in paths), crashing_batch)}
+            # The pool is recycled for the next run.
+            assert len(list(engine.run(((p, None) for p in paths[:3]), crashing_batch))) == 3
+
+        assert set(results) == set(paths)
+        assert results[str(tmp_path / "crash.py")].skipped == "the worker process died while analyzing it"
+        assert all(r.issues for p, r in results.items() if not p.endswith("crash.py"))
+
+    def test_dead_worker_while_jobs_stream_in(self, tmp_path):
+        paths = make_files(tmp_path, 10)
+        (tmp_path / "crash.py").write_text("df.iterrows()\n")
+        paths.insert(1, str(tmp_path / "crash.py"))
+
+        def slow_jobs():
+            for path in paths:
+                time.sleep(0.05)
+                yield path, None
+
+        with Engine(jobs=2, in_process_max_files=0, in_process_max_bytes=0, batch_max_bytes=50) as engine:
+            results = {r.path: r for r in engine.run(slow_jobs(), crashing_batch)}
+
+        assert set(results) == set(paths)
+        assert results[str(tmp_path / "crash.py")].skipped == "the worker process died while analyzing it"
+        assert all(r.issues for p, r in results.items() if not p.endswith("crash.py"))
+
+
+def test_cli_reports_skipped_files(tmp_path):
+    (tmp_path / "big.py").write_text("df.iterrows()\n" * 100)
+    (tmp_path / "small.py").write_text("x = 1\n")
+
+    result = CliRunner().invoke(main, [str(tmp_path), "--max-file-size", "1KB", "--cache-dir", str(tmp_path / "cache")])
+    again = CliRunner().invoke(main, [str(tmp_path), "--cache-dir", str(tmp_path / "cache")])
+
+    assert result.exit_code == 0
+    assert "Skipped 1 file(s):" in result.output
+    assert "big.py: 1400 bytes of source, over the 1024 byte limit" in result.output
+    # Skipped files are not cached as clean.
+    assert again.exit_code == 1
+
+
+def test_cli_rejects_bad_size(tmp_path):
+    result = CliRunner().invoke(main, [str(tmp_path), "--max-file-size", "lots"])
+
+    assert result.exit_code == 2
+    assert "invalid size" in result.output
+
+
+def test_cli_jobs_option(tmp_path):
+    make_files(tmp_path, 3)
+
+    result = CliRunner().invoke(main, [str(tmp_path), '--jobs', '1', '--no-cache'])
+
+    assert result.exit_code == 1
+    assert "Found 3" in result.output
+
+
+class TestImports:
+    def check_loaded(self, statement):
+        code = f"import json, sys; {statement}; print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}})))"
+        output = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, check=True).stdout
+        return set(json.loads(output))
+
+    def test_engine_does_not_import_rich_or_libcst(self):
+        loaded = self.check_loaded("import pandas_lint.engine")
+
+        assert not loaded & {"rich", "libcst", "pygments", "click"}
+
+    def test_cli_defers_rich_and_libcst(self):
+        loaded = self.check_loaded("import pandas_lint.cli")
+
+        assert not loaded & {"rich", "libcst", "pygments"}
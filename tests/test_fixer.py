@@ -1,5 +1,9 @@
+import json
 import pytest
-from pandas_lint.fixer import fix_code
+from pandas_lint.config import Config
+from pandas_lint.engine import Engine, analyze_file, fix_batch
+from pandas_lint.fixer import collect_fixes, fix_code
+from pandas_lint.rules import RuleRegistry
 
 
 class TestAutoFixer:
@@ -35,6 +39,45 @@ class TestAutoFixer:
         
         assert ".dt.month" in fixed
 
+    def test_keeps_method_arguments(self):
+        assert fix_code("df['col'].apply(lambda x: x.strip('$'))") == "df['col'].str.strip('$')"
+
+    def test_leaves_lambdas_not_reducible_to_an_accessor(self):
+        for code in (
+            "s.apply(lambda x: x.strip(x[0]))",
+            "s.apply(lambda x: y.upper())",
+            "s.apply(lambda x: y.year)",
+            "s.apply(lambda x, n=1: x.upper())",
+        ):
+            assert fix_code(code) == code
+
+    def test_skips_ignored_rules(self):
+        code = "df['col'].apply(lambda x: x.upper())"
+
+        assert fix_code(code, ["PERF002"]) == code
+        assert RuleRegistry.get_fixable(["PERF002"]) == frozenset()
+
+    def test_skips_ignored_codes(self):
+        code = "df['a'].apply(lambda x: x.upper())\ndf['d'].apply(lambda x: x.year)\n"
+
+        assert fix_code(code, ["PERF003"]) == "df['a'].apply(lambda x: x.upper())\ndf['d'].dt.year\n"
+        assert fix_code(code, ["PERF004"]) == "df['a'].str.upper()\ndf['d'].apply(lambda x: x.year)\n"
+        assert fix_code(code, ["PERF003", "PERF004"]) == code
+        assert [fix.replacement for fix in collect_fixes(code, ["PERF003"])] == ["df['d'].dt.year"]
+        assert RuleRegistry.get_fixable(["PERF003"]) == frozenset(["PERF004"])
+
+    def test_repeats_until_nothing_changes(self, monkeypatch):
+        import libcst as cst
+
+        def rename(new):
+            return lambda node: node.with_changes(func=node.func.with_changes(attr=cst.Name(new)))
+
+        # A replacement is not visited again in the pass that made it.
+        monkeypatch.setattr(RuleRegistry, "get_fixers", classmethod(
+            lambda cls, ignored=(): {"a": (rename("b"),), "b": (rename("c"),)}))
+
+        assert fix_code("x.a()") == "x.c()"
+
     def test_preserves_non_fixable_apply(self):
         code = "df['col'].apply(lambda x: custom_func(x))"
         fixed = fix_code(code)
@@ -55,3 +98,129 @@ result = df.groupby('cat').sum()
         assert ".str.upper()" in fixed
         assert ".dt.year" in fixed
         assert "groupby" in fixed
+
+
+class TestFixFile:
+    def test_rewrites_fixable_file_atomically(self, tmp_path):
+        path = tmp_path / "mod.py"
+        path.write_text("df['a'].apply(lambda x: x.upper())\r\n")
+        path.chmod(0o640)
+
+        result = analyze_file(str(path), fix=True)
+
+        assert result.fixed and result.error is None
+        assert result.issues == []
+        assert path.read_bytes() == b"df['a'].str.upper()\r\n"
+        assert path.stat().st_mode & 0o777 == 0o640
+        assert [p.name for p in tmp_path.iterdir()] == ["mod.py"]
+
+    def test_writes_through_symlinks(self, tmp_path):
+        (tmp_path / "real").mkdir()
+        (tmp_path / "src").mkdir()
+        target = tmp_path / "real" / "m.py"
+        target.write_text("df['a'].apply(lambda x: x.upper())\n")
+        link = tmp_path / "src" / "m.py"
+        link.symlink_to(target)
+
+        result = analyze_file(str(link), fix=True)
+
+        assert result.fixed
+        assert link.is_symlink()
+        assert target.read_text() == "df['a'].str.upper()\n"
+        assert [p.name for p in (tmp_path / "real").iterdir()] == ["m.py"]
+
+    def test_skips_libcst_without_fixable_issues(self, tmp_path, monkeypatch):
+        import pandas_lint.fixer
+
+        def fail(code):
+            raise AssertionError("libcst should not run")
+
+        monkeypatch.setattr(pandas_lint.fixer, "fix_code", fail)
+        plain = tmp_path / "plain.py"
+        plain.write_text("df.iterrows()\n")
+        custom = tmp_path / "custom.py"
+        custom.write_text("df['a'].apply(lambda x: custom(x))\n")
+
+        assert not analyze_file(str(plain), fix=True).fixed
+        assert not analyze_file(str(custom), fix=True).fixed
+
+    def test_notebook_rewrites_only_changed_sources(self, tmp_path):
+        notebook = {"cells": [
+            {"cell_type": "markdown", "metadata": {}, "source": ["df['a'].apply(lambda x: x.upper())\n"]},
+            {"cell_type": "code", "execution_count": 1, "metadata": {"tags": ["keep"]},
+             "outputs": [{"output_type": "stream", "name": "stdout", "text": ["caf\u00e9\n"]}],
+             "source": ["df['a'] = df['a'].apply(lambda x: x.upper())\n", "df['d'].apply(lambda x: x.year)"]},
+            {"cell_type": "code", "execution_count": 2, "metadata": {}, "outputs": [], "source": "df.iterrows()\n"},
+        ], "metadata": {"kernelspec": {"name": "python3"}}, "nbformat": 4, "nbformat_minor": 5}
+        original = json.dumps(notebook, indent=1, ensure_ascii=False) + "\n"
+        path = tmp_path / "nb.ipynb"
+        path.write_text(original, encoding="utf-8")
+
+        result = analyze_file(str(path), Config(), fix=True)
+
+        assert result.fixed and result.error is None
+        assert [issue.code for issue in result.issues] == ["PERF001"]
+        assert path.read_text(encoding="utf-8") == original.replace(
+            '    "df[\'a\'] = df[\'a\'].apply(lambda x: x.upper())\\n",\n    "df[\'d\'].apply(lambda x: x.year)"',
+            '    "df[\'a\'] = df[\'a\'].str.upper()\\n",\n    "df[\'d\'].dt.year"',
+        )
+        assert [p.name for p in tmp_path.iterdir()] == ["nb.ipynb"]
+
+    def test_notebook_cells_libcst_cannot_parse_are_kept(self, tmp_path):
+        path = tmp_path / "nb.ipynb"
+        path.write_text(json.dumps({"cells": [
+            {"cell_type": "code", "source": "df['a'].apply(lambda x: x.upper())\n"},
+            {"cell_type": "code", "source": "df['b'].apply(lambda x: x.lower()) +\n"},
+        ]}))
+
+        analyze_file(str(path), Config(), fix=True)
+
+        assert [cell["source"] for cell in json.loads(path.read_text())["cells"]] == [
+            "df['a'].str.upper()\n", "df['b'].apply(lambda x: x.lower()) +\n"]
+
+    def test_no_map_of_the_file_is_open_when_it_is_replaced(self, tmp_path, monkeypatch):
+        import os
+        from pandas_lint import prefetch
+        monkeypatch.setattr(prefetch, "MMAP_MIN_BYTES", 1)
+        maps = []
+        real_fetch, real_replace = prefetch.fetch, os.replace
+        monkeypatch.setattr(prefetch, "fetch", lambda path, *args: maps.append((path, real_fetch(path, *args)[0]))
+                            or (maps[-1][1], 0.0))
+        open_at_replace = []
+        monkeypatch.setattr(os, "replace", lambda src, dst: open_at_replace.append(
+            [path for path, data in maps if path == dst and not data.closed]) or real_replace(src, dst))
+        (tmp_path / "mod.py").write_text("df['a'].apply(lambda x: x.upper())\n")
+        (tmp_path / "nb.ipynb").write_text(json.dumps({"cells": [
+            {"cell_type": "code", "source": "df['a'].apply(lambda x: x.upper())\n"}]}))
+
+        results = fix_batch([(str(tmp_path / "mod.py"), Config()), (str(tmp_path / "nb.ipynb"), Config())])
+
+        assert [r.fixed for r in results] == [True, True]
+        assert open_at_replace == [[], []]
+
+    def test_fixes_on_worker_pool(self, tmp_path):
+        files = []
+        for i in range(6):
+            path = tmp_path / f"mod_{i}.py"
+            path.write_text("df['d'].apply(lambda x: x.year)\n" if i % 2 else "x = 1\n")
+            files.append(str(path))
+
+        with Engine(jobs=2, in_process_max_files=0, in_process_max_bytes=0) as engine:
+            results = list(engine.run(((f, None) for f in files), fix_batch))
+
+        assert sorted(r.path for r in results if r.fixed) == files[1::2]
+        assert all(".dt.year" in open(f).read() for f in files[1::2])
+
+    def test_cli_reports_issues_left_after_fixing(self, tmp_path):
+        from click.testing import CliRunner
+        from pandas_lint.cli import main
+
+        path = tmp_path / "mod.py"
+        path.write_text("df['a'].apply(lambda x: x.upper())\ndf.iterrows()\n")
+
+        result = CliRunner().invoke(main, [str(path), "--fix", "--no-cache"])
+
+        assert "Fixed:" in result.output and "Auto-fixed 1 files" in result.output
+        assert "PERF003" not in result.output
+        assert "PERF001" in result.output
+        assert path.read_text() == "df['a'].str.upper()\ndf.iterrows()\n"
@@ -0,0 +1,132 @@
+import os
+import subprocess
+import pytest
+from click.testing import CliRunner
+from pandas_lint.cli import main
+from pandas_lint.git import GitError, changed_files, line_in_ranges
+
+ORIGINAL = """import pandas as pd
+
+df = pd.read_csv('a.csv', usecols=['a'])
+for i, row in df.iterrows():
+    print(row)
+"""
+
+
+def git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    git(root, "init", "-q")
+    (root / "pipeline.py").write_text(ORIGINAL)
+    (root / "untouched.py").write_text("df.iterrows()\n")
+    git(root, "add", ".")
+    git(root, "commit", "-q", "-m", "initial")
+    return os.path.realpath(root)
+
+
+class TestChangedFiles:
+    def test_reports_modified_lines(self, repo):
+        with open(os.path.join(repo, "pipeline.py"), "a") as f:
+            f.write("df.to_csv('out.csv')\n")
+
+        changes = changed_files("HEAD", cwd=repo)
+
+        assert changes == {os.path.join(repo, "pipeline.py"): [(6, 6)]}
+
+    def test_untracked_files_are_fully_changed(self, repo):
+        with open(os.path.join(repo, "new.py"), "w") as f:
+            f.write("x = 1\n")
+        with open(os.path.join(repo, "notes.txt"), "w") as f:
+            f.write("ignored\n")
+
+        changes = changed_files("HEAD", cwd=repo)
+
+        assert changes == {os.path.join(repo, "new.py"): None}
+
+    def test_staged_only(self, repo):
+        with open(os.path.join(repo, "pipeline.py"), "a") as f:
+            f.write("df.to_csv('out.csv')\n")
+        with open(os.path.join(repo, "untouched.py"), "a") as f:
+            f.write("df.to_csv('out.csv')\n")
+        git(repo, "add", "pipeline.py")
+
+        assert list(changed_files(staged=True, cwd=repo)) == [os.path.join(repo, "pipeline.py")]
+
+    def test_unusual_file_names(self, repo):
+        for name in ("caf\u00e9.py", "my file.py", "plain.py"):
+            with open(os.path.join(repo, name), "w", encoding="utf-8") as f:
+                f.write("x = 1\ndf.iterrows()\n")
+        git(repo, "add", ".")
+
+        assert changed_files(staged=True, cwd=repo) == {
+            os.path.join(repo, name): [(1, 2)] for name in ("caf\u00e9.py", "my file.py", "plain.py")
+        }
+
+    def test_bad_ref_raises(self, repo):
+        with pytest.raises(GitError):
+            changed_files("no-such-ref", cwd=repo)
+
+
+def test_line_in_ranges():
+    assert line_in_ranges(3, [(1, 2), (3, 5)])
+    assert not line_in_ranges(6, [(1, 2), (3, 5)])
+    assert line_in_ranges(100, None)
+
+
+class TestChangedSinceCli:
+    def test_only_changed_files_are_linted(self, repo):
+        with open(os.path.join(repo, "pipeline.py"), "a") as f:
+            f.write("df.to_csv('out.csv')\n")
+
+        result = CliRunner().invoke(main, [repo, "--changed-since", "HEAD", "--no-cache"])
+
+        assert "pipeline.py" in result.output
+        assert "untouched.py" not in result.output
+        assert "Found 2" in result.output
+
+    def test_changed_lines_only(self, repo):
+        with open(os.path.join(repo, "pipeline.py"), "a") as f:
+            f.write("df.to_csv('out.csv')\n")
+
+        result = CliRunner().invoke(
+            main, [repo, "--changed-since", "HEAD", "--changed-lines-only", "--no-cache"]
+        )
+
+        assert "IO001" in result.output
+        assert "PERF001" not in result.output
+        assert "Found 1" in result.output
+
+    def test_git_runs_once_per_repository(self, repo, monkeypatch):
+        import pandas_lint.cli
+        os.mkdir(os.path.join(repo, "sub"))
+        paths = [os.path.join(repo, "pipeline.py"), os.path.join(repo, "untouched.py"), os.path.join(repo, "sub")]
+        for path in paths[:2]:
+            with open(path, "a") as f:
+                f.write("df.to_csv('out.csv')\n")
+        git(repo, "add", ".")
+        calls = []
+        real = pandas_lint.cli.changed_files
+        monkeypatch.setattr(pandas_lint.cli, "changed_files", lambda *args, **kwargs: calls.append(1) or real(*args, **kwargs))
+
+        result = CliRunner().invoke(main, [*paths, "--staged", "--no-cache"])
+
+        assert len(calls) == 1
+        assert "pipeline.py" in result.output and "untouched.py" in result.output
+
+    def test_clean_when_nothing_changed(self, repo):
+        result = CliRunner().invoke(main, [repo, "--changed-since", "HEAD", "--no-cache"])
+
+        assert result.exit_code == 0
+
+    def test_changed_lines_only_requires_a_mode(self, repo):
+        result = CliRunner().invoke(main, [repo, "--changed-lines-only"])
+
+        assert result.exit_code == 2
@@ -0,0 +1,209 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from pandas_lint.lsp import apply_change, issue_to_diagnostic, split_lines
+from pandas_lint.rules import Issue
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LspClient:
+    """Drives 'pandas-lint lsp' over its stdio, as an editor would."""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", "from pandas_lint.cli import main; main()", "lsp", "--debounce", "50"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=ROOT,
+        )
+        self.next_id = 0
+
+    def send(self, method, params, request=False):
+        message = {"jsonrpc": "2.0", "method": method, "params": params}
+        if request:
+            self.next_id += 1
+            message["id"] = self.next_id
+        body = json.dumps(message).encode()
+        self.process.stdin.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        self.process.stdin.flush()
+        return message.get("id")
+
+    def receive(self):
+        length = None
+        while True:
+            line = self.process.stdout.readline().strip()
+            if not line:
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return json.loads(self.process.stdout.read(length))
+
+    def request(self, method, params):
+        request_id = self.send(method, params, request=True)
+        while True:
+            message = self.receive()
+            if message.get("id") == request_id:
+                return message
+
+    def diagnostics(self, uri):
+        while True:
+            message = self.receive()
+            if message.get("method") == "textDocument/publishDiagnostics" and message["params"]["uri"] == uri:
+                return message["params"]["diagnostics"]
+
+    def close(self):
+        self.request("shutdown", None)
+        self.send("exit", None)
+        self.process.wait(timeout=10)
+
+
+@pytest.fixture
+def client():
+    client = LspClient()
+    result = client.request("initialize", {"processId": None, "rootUri": None, "capabilities": {}})
+    assert "capabilities" in result["result"]
+    client.send("initialized", {})
+    yield client
+    client.close()
+
+
+URI = "file:///tmp/pandas_lint_lsp_test.py"
+
+
+class TestLanguageServer:
+    def test_publishes_diagnostics_on_open(self, client):
+        client.send("textDocument/didOpen", {"textDocument": {
+            "uri": URI, "languageId": "python", "version": 1, "text": "for i, r in df.iterrows():\n    pass\n",
+        }})
+
+        diagnostics = client.diagnostics(URI)
+
+        assert [d["code"] for d in diagnostics] == ["PERF001"]
+        assert diagnostics[0]["range"]["start"] == {"line": 0, "character": 12}
+        assert diagnostics[0]["severity"] == 1
+
+    def test_debounced_incremental_change(self, client):
+        client.send("textDocument/didOpen", {"textDocument": {
+            "uri": URI, "languageId": "python", "version": 1, "text": "x = 1\n",
+        }})
+        assert client.diagnostics(URI) == []
+
+        for version, text in enumerate(["df", ".to_csv('a.csv')"], start=2):
+            end = 0 if version == 2 else 2
+            client.send("textDocument/didChange", {
+                "textDocument": {"uri": URI, "version": version},
+                "contentChanges": [{"range": {"start": {"line": 1, "character": end},
+                                              "end": {"line": 1, "character": end}}, "text": text}],
+            })
+
+        assert [d["code"] for d in client.diagnostics(URI)] == ["IO001"]
+
+    def test_quick_fix_from_auto_fixer(self, client):
+        text = "df['b'] = df['a'].apply(lambda x: x.upper())\n"
+        client.send("textDocument/didOpen", {"textDocument": {
+            "uri": URI, "languageId": "python", "version": 1, "text": text,
+        }})
+        diagnostics = client.diagnostics(URI)
+
+        response = client.request("textDocument/codeAction", {
+            "textDocument": {"uri": URI},
+            "range": diagnostics[0]["range"],
+            "context": {"diagnostics": diagnostics},
+        })
+
+        quick_fix = [a for a in response["result"] if a["kind"] == "quickfix"][0]
+        edit = quick_fix["edit"]["changes"][URI][0]
+        assert edit["newText"] == "df['a'].str.upper()"
+        assert edit["range"]["start"] == {"line": 0, "character": 10}
+
+    def test_fix_all_skips_ignored_codes(self, client, tmp_path):
+        (tmp_path / "pyproject.toml").write_text('[tool.pandas-linter]\nignore = ["PERF003"]\n')
+        uri = (tmp_path / "mod.py").as_uri()
+        client.send("textDocument/didOpen", {"textDocument": {
+            "uri": uri, "languageId": "python", "version": 1,
+            "text": "df['a'].apply(lambda x: x.upper())\ndf['d'].apply(lambda x: x.year)\n",
+        }})
+        client.diagnostics(uri)
+
+        response = client.request("textDocument/codeAction", {
+            "textDocument": {"uri": uri},
+            "range": {"start": {"line": 0, "character": 0}, "end": {"line": 0, "character": 0}},
+            "context": {"diagnostics": [], "only": ["source.fixAll"]},
+        })
+
+        [fix_all] = response["result"]
+        assert [e["newText"] for e in fix_all["edit"]["changes"][uri]] == ["df['d'].dt.year"]
+
+    def test_notebook_only_changed_cells_are_republished(self, client):
+        nb = "file:///tmp/analysis.ipynb"
+        cells = [f"vscode-notebook-cell:/tmp/analysis.ipynb#c{i}" for i in range(3)]
+        client.send("notebookDocument/didOpen", {
+            "notebookDocument": {"uri": nb, "notebookType": "jupyter-notebook", "version": 1,
+                                 "cells": [{"kind": 2, "document": c} for c in cells]},
+            "cellTextDocuments": [
+                {"uri": cells[0], "languageId": "python", "version": 1, "text": "import pandas as datos\n"},
+                {"uri": cells[1], "languageId": "python", "version": 1, "text": "datos.read_csv('a.csv')\n"},
+                {"uri": cells[2], "languageId": "python", "version": 1, "text": "df.iterrows()\n"},
+            ],
+        })
+        opened = {}
+        while len(opened) < 3:
+            message = client.receive()
+            opened[message["params"]["uri"]] = [d["code"] for d in message["params"]["diagnostics"]]
+        assert opened == {cells[0]: [], cells[1]: ["MEM001"], cells[2]: ["PERF001"]}
+
+        client.send("notebookDocument/didChange", {
+            "notebookDocument": {"uri": nb, "version": 2},
+            "change": {"cells": {"textContent": [{
+                "document": {"uri": cells[2], "version": 2},
+                "changes": [{"text": "df.to_csv('b.csv')\n"}],
+            }]}},
+        })
+        message = client.receive()
+
+        assert message["params"]["uri"] == cells[2]
+        assert [d["code"] for d in message["params"]["diagnostics"]] == ["IO001"]
+
+    def test_unknown_request_returns_error(self, client):
+        response = client.request("workspace/unknownThing", {})
+
+        assert response["error"]["code"] == -32601
+
+    def test_malformed_messages_do_not_stop_the_server(self, client):
+        response = client.request("textDocument/codeAction", {})
+        client.send("textDocument/didChange", {"textDocument": {"uri": URI}})
+        logged = client.receive()
+        client.send("textDocument/didOpen", {
+            "textDocument": {"uri": URI, "languageId": "python", "version": 1, "text": "df.iterrows()\n"},
+        })
+
+        assert response["error"]["code"] == -32602
+        assert logged["method"] == "window/logMessage" and "KeyError" in logged["params"]["message"]
+        assert [d["code"] for d in client.diagnostics(URI)] == ["PERF001"]
+
+
+def test_apply_change_ranges():
+    text = "abc\ndef\n"
+    change = {"range": {"start": {"line": 1, "character": 1}, "end": {"line": 1, "character": 2}}, "text": "X"}
+
+    assert apply_change(text, change) == "abc\ndXf\n"
+    assert apply_change(text, {"text": "new"}) == "new"
+
+
+def test_only_lsp_line_breaks_count():
+    text = "x = 1\x0cy\u2028z\r\ndf\rend"
+    change = {"range": {"start": {"line": 1, "character": 0}, "end": {"line": 1, "character": 2}}, "text": "zz"}
+
+    assert apply_change(text, change) == "x = 1\x0cy\u2028z\r\nzz\rend"
+    assert split_lines(text) == ["x = 1\x0cy\u2028z", "df", "end"]
+    assert split_lines("a\n\nb\n", keepends=True) == ["a\n", "\n", "b\n"]
+
+
+def test_diagnostic_columns_are_utf16():
+    issue = Issue(1, len("é = ".encode("utf-8")), "IO001", "msg", "INFO")
+
+    diagnostic = issue_to_diagnostic(issue, ["é = df.to_csv('x')"])
+
+    assert diagnostic["range"]["start"]["character"] == 4
@@ -0,0 +1,163 @@
+import json
+import pytest
+from click.testing import CliRunner
+from pandas_lint.cache import CellCache
+from pandas_lint.cli import main
+from pandas_lint.config import Config
+from pandas_lint.engine import FileResult, analyze_file, analyze_source
+from pandas_lint.notebook import CellMap, _scan_cells, extract_code, parse_notebook, parse_notebook_string
+from pandas_lint.stats import Stats
+
+FIXTURES = ["tests/test_notebook.ipynb", "tests/test_advanced.ipynb"]
+
+
+def old_extract_code(notebook):
+    """The dict-per-line implementation CellMap replaced, as a reference."""
+    cell_mapping, current_line, parts = {}, 1, []
+    for i, cell in enumerate(notebook.get('cells', [])):
+        if cell.get('cell_type') == 'code':
+            source = cell.get('source', [])
+            source = "".join(source) if isinstance(source, list) else str(source)
+            if not source.endswith('\n'):
+                source += '\n'
+            parts.append(source)
+            for _ in range(source.count('\n')):
+                cell_mapping[current_line] = i
+                current_line += 1
+            parts.append('\n')
+            current_line += 1
+    return "".join(parts), cell_mapping
+
+
+def write_notebook(path, cells, **extra):
+    path.write_text(json.dumps({"cells": cells, "metadata": {"kernelspec": {"name": "python3"}}, **extra}, indent=1))
+    return str(path)
+
+
+class TestParseNotebook:
+    @pytest.mark.parametrize("fixture", FIXTURES)
+    def test_matches_json_load(self, fixture):
+        with open(fixture) as f:
+            expected_code, expected_mapping = old_extract_code(json.load(f))
+
+        code, cell_mapping = parse_notebook(fixture)
+
+        assert code == expected_code
+        assert dict(cell_mapping) == expected_mapping
+        assert parse_notebook_string(open(fixture).read()) == (code, cell_mapping)
+
+    def test_outputs_and_awkward_strings_are_skipped(self, tmp_path):
+        cells = [
+            {"cell_type": "markdown", "source": "# Title with \"quotes\" and ] brackets {"},
+            {"cell_type": "code", "outputs": [
+                {"output_type": "display_data", "data": {"image/png": "iVBORw0KGgo" * 1000, "text/plain": ["\\\\", "}]"]}},
+            ], "execution_count": None, "source": ["s = \"a\\\\\"\n", "df.iterrows()"]},
+            {"source": "x = 1", "metadata": {}, "cell_type": "code"},
+            {"cell_type": "raw", "source": []},
+            {"cell_type": "code", "source": []},
+        ]
+        path = write_notebook(tmp_path / "nb.ipynb", cells, nbformat=4)
+
+        assert parse_notebook(path) == extract_code(json.load(open(path)))
+        code, cell_mapping = parse_notebook(path)
+        assert code == "s = \"a\\\\\"\ndf.iterrows()\n\nx = 1\n\n\n\n"
+        assert [cell_mapping[line] for line in (1, 2, 4, 6)] == [1, 1, 2, 4]
+        assert 3 not in cell_mapping
+
+    def test_unicode_escapes_are_decoded(self, tmp_path):
+        path = tmp_path / "nb.ipynb"
+        path.write_text('{"cells": [{"cell_type": "code", "source": ["df.\\u0069terrows()"]}]}')
+
+        assert parse_notebook(str(path))[0] == "df.iterrows()\n\n"
+        assert [i.code for i in analyze_file(str(path)).issues] == ["PERF001"]
+
+    @pytest.mark.parametrize("content", ["", "{", '{"cells": [{"source": "x}', "[1, 2]"])
+    def test_invalid_notebooks_raise_value_error(self, tmp_path, content):
+        path = tmp_path / "bad.ipynb"
+        path.write_text(content)
+
+        with pytest.raises(ValueError):
+            parse_notebook(str(path))
+
+    def test_only_sources_are_decoded(self):
+        data = json.dumps({"cells": [{"cell_type": "code", "outputs": [{"data": "x" * 100}], "source": "y"}]}).encode()
+
+        assert list(_scan_cells(data)) == [(0, "code", "y")]
+
+
+class TestCellMap:
+    def test_lookup(self):
+        cell_mapping = CellMap([(1, 3, 0), (4, 5, 2)])
+
+        assert [cell_mapping.get(line) for line in range(0, 7)] == [None, 0, 0, None, 2, None, None]
+        assert list(cell_mapping) == [1, 2, 4] and len(cell_mapping) == 3
+        assert cell_mapping == {1: 0, 2: 0, 4: 2}
+
+    def test_cache_round_trip(self):
+        result = FileResult("nb.ipynb", [], CellMap([(1, 3, 0), (4, 5, 2)]))
+
+        data = json.loads(json.dumps(result.to_json()))
+
+        assert data["cell_spans"] == [[1, 3, 0], [4, 5, 2]]
+        assert FileResult.from_json(data).cell_mapping == result.cell_mapping
+
+
+def code_cell(source):
+    return {"cell_type": "code", "metadata": {}, "outputs": [], "source": source}
+
+
+class TestCellCache:
+    @pytest.mark.parametrize("fixture", FIXTURES)
+    def test_cell_by_cell_matches_whole_source(self, tmp_path, fixture):
+        code, cell_mapping = parse_notebook(fixture)
+        expected = analyze_source(code, fixture, Config(), cell_mapping)
+        cell_cache = CellCache(str(tmp_path))
+
+        cold = analyze_file(fixture, Config(), cell_cache=cell_cache)
+        warm = analyze_file(fixture, Config(), cell_cache=cell_cache)
+
+        assert cold.issues == expected.issues == warm.issues
+        assert dict(cold.cell_mapping or {}) == dict(expected.cell_mapping or {})
+
+    def test_only_edited_cells_are_analyzed(self, tmp_path):
+        cells = [code_cell(f"df{i} = load()\ndf{i}.iterrows()\n") for i in range(5)]
+        path = write_notebook(tmp_path / "nb.ipynb", cells)
+        cell_cache = CellCache(str(tmp_path))
+        analyze_file(path, Config(), cell_cache=cell_cache)
+
+        cells[2] = code_cell("x = 1\nx = 2\ndf2.iterrows()\n")
+        write_notebook(tmp_path / "nb.ipynb", cells)
+        stats = Stats()
+        result = analyze_file(path, Config(), stats=stats, cell_cache=cell_cache)
+
+        assert stats.cells_reused == 4
+        assert [(i.line, result.cell_mapping[i.line]) for i in result.issues] == [(2, 0), (5, 1), (9, 2), (12, 3), (15, 4)]
+        assert result.issues[2].snippet == "df2.iterrows()"
+
+    def test_changed_alias_invalidates_later_cells(self, tmp_path):
+        cells = [code_cell("import pandas as pd\n"), code_cell("x = 1\n"), code_cell("frame = pandas.read_csv('a.csv')\n")]
+        path = write_notebook(tmp_path / "nb.ipynb", cells)
+        cell_cache = CellCache(str(tmp_path))
+        assert analyze_file(path, Config(), cell_cache=cell_cache).issues == []
+
+        cells[0] = code_cell("import pandas\n")
+        write_notebook(tmp_path / "nb.ipynb", cells)
+        stats = Stats()
+        result = analyze_file(path, Config(), stats=stats, cell_cache=cell_cache)
+
+        assert [i.code for i in result.issues] == ["MEM001"]
+        assert stats.cells_reused == 0
+
+    def test_syntax_error_is_confined_to_its_cell(self, tmp_path):
+        path = write_notebook(tmp_path / "nb.ipynb", [code_cell("%matplotlib inline\n"), code_cell("df.iterrows()\n")])
+
+        assert [i.code for i in analyze_file(path, Config()).issues] == ["PERF001"]
+
+    def test_cli_keeps_cell_results_next_to_entries(self, tmp_path):
+        path = write_notebook(tmp_path / "nb.ipynb", [code_cell("df.iterrows()\n")])
+        cache_dir = tmp_path / "cache"
+
+        result = CliRunner().invoke(main, [path, "--cache-dir", str(cache_dir), "--format", "compact"])
+
+        assert result.output.startswith(f"{path}:1:1: PERF001")
+        assert len(list(cache_dir.glob("*/*.cells.json"))) == 1
@@ -0,0 +1,125 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import pytest
+from click.testing import CliRunner
+from pandas_lint.cli import main
+from pandas_lint.notebook import CellMap
+from pandas_lint.reporters import FORMATS, GithubReporter, cell_location, make_reporter
+from pandas_lint.rules import Issue
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ISSUES = [
+    Issue(3, 4, "PERF001", "Avoid iterrows.", "CRITICAL", "df.iterrows()"),
+    Issue(7, 0, "STY001", "Avoid inplace, really: 100%.", "INFO", "df.drop('a', inplace=True)"),
+]
+
+
+def render(name, reports):
+    stream = io.StringIO()
+    reporter = make_reporter(name, stream)
+    reporter.start()
+    for file_path, issues, cell_mapping in reports:
+        reporter.report(file_path, issues, cell_mapping)
+    reporter.finish()
+    return stream.getvalue()
+
+
+class TestReporters:
+    def test_jsonl_is_one_object_per_issue(self):
+        output = render("jsonl", [("a.py", ISSUES, None), ("nb.ipynb", ISSUES[:1], {3: 1})])
+
+        records = [json.loads(line) for line in output.splitlines()]
+        assert [r["code"] for r in records] == ["PERF001", "STY001", "PERF001"]
+        assert records[0]["cell"] is None and records[2]["cell"] == 2
+        assert records[0]["snippet"] == "df.iterrows()"
+
+    def test_compact(self):
+        output = render("compact", [("a.py", ISSUES[:1], None)])
+
+        assert output == "a.py:3:5: PERF001 [CRITICAL] Avoid iterrows.\n"
+
+    def test_github_escapes_workflow_commands(self):
+        output = render("github", [("a.py", ISSUES, None)]).splitlines()
+
+        assert output[0] == "::error file=a.py,line=3,col=5,title=PERF001::Avoid iterrows."
+        assert output[1].startswith("::notice ")
+        assert output[1].endswith("::Avoid inplace, really: 100%25.")
+
+    def test_github_escapes_properties(self):
+        stream = io.StringIO()
+        GithubReporter(stream).report("we,ird:name.py", ISSUES[:1])
+
+        assert "file=we%2Cird%3Aname.py," in stream.getvalue()
+
+    def test_sarif_is_a_valid_document(self):
+        output = render("sarif", [("a.py", ISSUES, None), ("b.py", ISSUES[:1], None)])
+
+        log = json.loads(output)
+        run = log["runs"][0]
+        assert log["version"] == "2.1.0"
+        assert "PERF001" in {rule["id"] for rule in run["tool"]["driver"]["rules"]}
+        assert [r["ruleId"] for r in run["results"]] == ["PERF001", "STY001", "PERF001"]
+        region = run["results"][0]["locations"][0]["physicalLocation"]["region"]
+        assert region == {"startLine": 3, "startColumn": 5}
+        assert run["results"][1]["level"] == "note"
+
+    def test_sarif_lists_every_reported_code(self):
+        log = json.loads(render("sarif", []))
+
+        assert {"PERF002", "PERF003", "PERF004"} <= {rule["id"] for rule in log["runs"][0]["tool"]["driver"]["rules"]}
+
+    def test_notebooks_are_located_by_cell(self):
+        cells = CellMap([(1, 4, 0), (5, 9, 2)])
+        issue = Issue(6, 4, "PERF001", "Avoid iterrows.", "CRITICAL")
+
+        sarif = json.loads(render("sarif", [("nb.ipynb", [issue], cells)]))["runs"][0]["results"][0]
+        github = render("github", [("nb.ipynb", [issue], cells)])
+
+        assert "region" not in sarif["locations"][0]["physicalLocation"]
+        assert sarif["locations"][0]["logicalLocations"] == [{"name": "cell 3", "kind": "notebookCell"}]
+        assert sarif["properties"] == {"cell": 3, "cellLine": 2, "cellColumn": 5}
+        assert github == "::error file=nb.ipynb,title=PERF001::Avoid iterrows. (cell 3, line 2)\n"
+        assert cell_location(issue, {5: 2, 6: 2}) == (3, 2)
+
+    def test_sarif_without_results(self):
+        assert json.loads(render("sarif", []))["runs"][0]["results"] == []
+
+
+def run_cli(*args):
+    """Runs the CLI in a subprocess, so stdout and stderr are told apart whatever the click version."""
+    return subprocess.run(
+        [sys.executable, "-c", "from pandas_lint.cli import main; main()", *args],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, cwd=ROOT,
+    )
+
+
+class TestFormatOption:
+    @pytest.mark.parametrize("output_format", [f for f in FORMATS if f != "table"])
+    def test_machine_formats_keep_stdout_clean(self, tmp_path, output_format):
+        path = tmp_path / "mod.py"
+        path.write_text("df.iterrows()\n")
+
+        result = run_cli(str(path), "--no-cache", "--format", output_format)
+
+        assert result.returncode == 1
+        assert "Found 1" not in result.stdout
+        assert "PERF001" in result.stdout
+        assert "Found 1" in result.stderr
+
+    def test_jsonl_streams_from_the_pool(self, tmp_path):
+        for i in range(10):
+            (tmp_path / f"m{i}.py").write_text("df.iterrows()\n")
+
+        result = run_cli(str(tmp_path), "--no-cache", "--format", "jsonl", "-j", "2")
+
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert len(records) == 10
+
+    def test_sarif_cannot_be_watched(self, tmp_path):
+        result = CliRunner().invoke(main, [str(tmp_path), "--watch", "--format", "sarif"])
+
+        assert result.exit_code == 2
@@ -1,6 +1,6 @@
 import ast
 import pytest
-from pandas_lint.rules.base import RuleRegistry
+from pandas_lint.rules.base import Prefilter, RuleRegistry, build_dispatch, build_prefilter, dispatch_key
 from pandas_lint.rules.performance import IterrowsRule, ApplyRule
 from pandas_lint.rules.memory import ReadCsvUsecolsRule
 from pandas_lint.rules.security import SqlInjectionRule
@@ -221,3 +221,124 @@ class TestRuleRegistry:
             assert hasattr(rule, 'message')
             assert hasattr(rule, 'severity')
             assert hasattr(rule, 'check')
+
+
+class TestRuleDispatch:
+    def _routed_codes(self, code):
+        table = RuleRegistry.get_dispatch()
+        node = parse_and_get_calls(code)[0]
+        node_type, attr = dispatch_key(node)
+        rules = table.get((node_type, attr))
+        if rules is None:
+            rules = table.get((node_type, None), ())
+        return [r.code for r in rules]
+
+    def test_routes_by_attribute(self):
+        codes = self._routed_codes("df.iterrows()")
+
+        assert "PERF001" in codes
+        assert "PERF002" not in codes
+        assert "IO001" not in codes
+
+    def test_unrelated_call_only_gets_wildcard_rules(self):
+        codes = self._routed_codes("logger.info('x')")
+
+        assert codes == ["STY001"]
+
+    def test_ignored_codes_are_dropped(self):
+        table = RuleRegistry.get_dispatch(["PERF001"])
+
+        assert all(r.code != "PERF001" for rules in table.values() for r in rules)
+
+    def test_preserves_registration_order(self):
+        table = build_dispatch([ApplyRule(), InplaceTrueRule()])
+
+        assert [r.code for r in table[(ast.Call, 'apply')]] == ["PERF002", "STY001"]
+
+
+# Sources exercising every rule, plus near misses.
+PREFILTER_SAMPLES = [
+    "for i, row in df.iterrows(): pass",
+    "df.apply(lambda x: x * 2)",
+    "df['a'].apply(lambda x: x.upper())",
+    "df['d'].apply(lambda x: x.year)",
+    "import pandas as pd\npd.read_csv('x.csv')",
+    "import pandas as p2\np2.read_csv('x.csv', usecols=['a'])",
+    "pd.read_sql(f'SELECT * FROM t WHERE id = {i}', con)",
+    "pd.read_sql_query('SELECT ' + cols, con)",
+    "df.to_csv('out.csv')",
+    "df.drop('a', inplace=True)",
+    "df.drop('a', \\\n    inplace=True)",
+    "df.\uff49\uff54\uff45\uff52\uff52\uff4f\uff57\uff53()",
+    "df.drop('a', \uff49nplace=True)",
+    "df.applymap(f)\nx = 'iterrows_count'",
+    "# caf\u00e9\nx = 1",
+    "",
+]
+
+
+class TestPrefilter:
+    def test_every_rule_declares_triggers(self):
+        assert all(rule.trigger_tokens() for rule in RuleRegistry.get_all())
+        assert RuleRegistry.get_prefilter() is not None
+
+    @pytest.mark.parametrize("source", PREFILTER_SAMPLES)
+    def test_never_skips_a_flagged_source(self, source):
+        from pandas_lint.engine import analyze_source
+
+        issues = analyze_source(source, "sample.py").issues
+
+        if issues:
+            assert RuleRegistry.get_prefilter().may_match(source.encode("utf-8"))
+
+    @pytest.mark.parametrize("source", PREFILTER_SAMPLES)
+    def test_each_rule_alone(self, source):
+        from pandas_lint.config import Config
+        from pandas_lint.engine import analyze_source
+
+        for rule in RuleRegistry.get_all():
+            others = frozenset(r.code for r in RuleRegistry.get_all() if r is not rule)
+            prefilter = RuleRegistry.get_prefilter(others)
+            if analyze_source(source, "sample.py", Config(ignore=others)).issues:
+                assert prefilter.may_match(source.encode("utf-8")), rule.code
+
+    def test_skips_unrelated_sources(self):
+        prefilter = RuleRegistry.get_prefilter()
+
+        assert not prefilter.may_match(b"import os\nprint(os.getcwd())\n")
+        assert not prefilter.may_match(b"df.applymap(f)\nx = 'iterrows_count'\n")
+        assert not prefilter.may_match("# caf\u00e9\nx = 1\n".encode("utf-8"))
+
+    def test_normalizes_non_ascii_identifiers(self):
+        source = "df.drop('a', \uff49nplace=True)\n".encode("utf-8")
+
+        assert RuleRegistry.get_prefilter().may_match(source)
+
+    def test_rule_without_triggers_disables_it(self):
+        class Everything(InplaceTrueRule):
+            triggers = None
+
+        assert build_prefilter([IterrowsRule(), Everything()]) is None
+
+    def test_no_tokens_matches_nothing(self):
+        assert not Prefilter([]).may_match(b"df.iterrows()")
+
+    def test_repo_fixtures_agree_with_full_analysis(self):
+        import os
+        from pandas_lint.engine import analyze_file
+        from pandas_lint.notebook import read_code_cells
+
+        fixtures = os.path.dirname(__file__)
+        for name in sorted(os.listdir(fixtures)):
+            if not name.endswith((".py", ".ipynb")):
+                continue
+            path = os.path.join(fixtures, name)
+            if not analyze_file(path).issues:
+                continue
+            prefilter = RuleRegistry.get_prefilter()
+            if name.endswith(".ipynb"):
+                assert any(prefilter.may_match_text(source) for _, source in read_code_cells(path)), name
+            else:
+                with open(path, "rb") as f:
+                    assert prefilter.may_match(f.read()), name
+
@@ -0,0 +1,97 @@
+import ast
+import json
+from click.testing import CliRunner
+from pandas_lint.analyzer import PandasVisitor
+from pandas_lint.cli import main
+from pandas_lint.config import Config
+from pandas_lint.engine import Engine, analyze_file
+from pandas_lint.stats import Stats, timed
+
+
+class TestStats:
+    def test_merge_adds_everything(self):
+        a, b = Stats(), Stats()
+        a.add_time("parse", 1.0)
+        a.add_rule("PERF001", 0.5, True)
+        b.add_time("parse", 2.0)
+        b.add_rule("PERF001", 0.25, False)
+        b.files, b.bytes_read = 3, 100
+
+        a.merge(b)
+
+        assert a.phases == {"parse": 3.0}
+        assert a.rules == {"PERF001": [2, 1, 0.75]}
+        assert (a.files, a.bytes_read) == (3, 100)
+
+    def test_timed_charges_iteration(self):
+        stats = Stats()
+
+        assert list(timed(iter([1, 2]), stats, "discovery")) == [1, 2]
+        assert stats.phases["discovery"] >= 0
+
+    def test_json_lists_known_phases_in_order(self):
+        stats = Stats()
+        stats.add_time("report", 1)
+        stats.add_time("read", 1)
+
+        assert list(stats.to_json(2.0)["phases"]) == ["read", "report"]
+
+
+class TestCollection:
+    def test_visitor_counts_invocations_and_hits(self):
+        stats = Stats()
+        visitor = PandasVisitor(Config(), stats=stats)
+        visitor.visit(ast.parse("df.iterrows()\nprint(1)\n"))
+
+        calls, hits, _ = stats.rules["PERF001"]
+        assert (calls, hits) == (1, 1)
+        assert stats.rules["STY001"][:2] == [2, 0]
+
+    def test_disabled_collects_nothing(self, tmp_path):
+        path = tmp_path / "mod.py"
+        path.write_text("df.iterrows()\n")
+
+        assert PandasVisitor().stats is None
+        assert analyze_file(str(path)).issues
+
+    def test_file_phases_and_prefilter(self, tmp_path):
+        (tmp_path / "a.py").write_text("df.iterrows()\n")
+        (tmp_path / "b.py").write_text("x = 1\n")
+        stats = Stats()
+
+        for name in ("a.py", "b.py"):
+            analyze_file(str(tmp_path / name), stats=stats)
+
+        assert stats.files == 2
+        assert stats.bytes_read == len("df.iterrows()\n") + len("x = 1\n")
+        assert stats.skipped_by_prefilter == 1
+        assert {"read", "prefilter", "parse", "analyze"} <= set(stats.phases)
+
+    def test_pool_workers_report_back(self, tmp_path):
+        files = []
+        for i in range(6):
+            path = tmp_path / f"m{i}.py"
+            path.write_text("df.iterrows()\n")
+            files.append(str(path))
+        stats = Stats()
+
+        with Engine(jobs=2, in_process_max_files=0, in_process_max_bytes=0, stats=stats) as engine:
+            results = list(engine.run((f, None) for f in files))
+
+        assert len(results) == 6
+        assert stats.files == 6
+        assert stats.rules["PERF001"][1] == 6
+        assert "transfer" in stats.phases
+
+
+def test_cli_stats_file(tmp_path):
+    (tmp_path / "mod.py").write_text("df.iterrows()\n")
+    stats_file = tmp_path / "stats.json"
+
+    result = CliRunner().invoke(main, [str(tmp_path / "mod.py"), "--no-cache", "--stats", "--stats-file", str(stats_file)])
+
+    data = json.loads(stats_file.read_text())
+    assert data["files"] == 1
+    assert data["rules"]["PERF001"]["hits"] == 1
+    assert "report" in data["phases"] and data["wall_time"] > 0
+    assert "Invocations" in result.output
@@ -0,0 +1,185 @@
+import os
+import sys
+import pytest
+from pandas_lint.discovery import FileDiscoverer
+from pandas_lint.rules import Issue
+from pandas_lint.watch import InotifyWatcher, PollingWatcher, diff_issues, make_watcher, relevant_changes
+
+
+def issue(line, code="PERF001", snippet="df.iterrows()"):
+    return Issue(line, 0, code, "message", "WARNING", snippet)
+
+
+def write(path, content="x = 1\n"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return str(path)
+
+
+class TestDiffIssues:
+    def test_shifted_lines_are_not_new(self):
+        added, resolved = diff_issues([issue(3)], [issue(10)])
+
+        assert added == []
+        assert resolved == 0
+
+    def test_reports_added_and_resolved(self):
+        old = [issue(1), issue(2, "PERF003", "df.apply(f, axis=1)")]
+        new = [issue(1), issue(5, "PERF002", "df.drop('a', inplace=True)")]
+
+        added, resolved = diff_issues(old, new)
+
+        assert [i.code for i in added] == ["PERF002"]
+        assert resolved == 1
+
+    def test_duplicates_are_counted(self):
+        added, resolved = diff_issues([issue(1)], [issue(1), issue(2)])
+
+        assert [i.line for i in added] == [2]
+        assert resolved == 0
+
+
+class TestRelevantChanges:
+    def test_classifies_paths(self, tmp_path):
+        known = write(tmp_path / "a.py")
+        new = write(tmp_path / "b.py")
+        write(tmp_path / "notes.txt")
+        gone = str(tmp_path / "gone.py")
+        discoverer = FileDiscoverer()
+
+        to_lint, deleted = relevant_changes(
+            [known, new, str(tmp_path / "notes.txt"), gone], {known, gone}, [str(tmp_path)], discoverer
+        )
+
+        assert to_lint == sorted([known, new])
+        assert deleted == [gone]
+
+    def test_new_files_outside_roots_are_ignored(self, tmp_path):
+        watched = write(tmp_path / "watched.py")
+        sibling = write(tmp_path / "sibling.py")
+
+        to_lint, _ = relevant_changes([watched, sibling], {watched}, [], FileDiscoverer())
+
+        assert to_lint == [watched]
+
+    def test_new_directory_is_scanned(self, tmp_path):
+        inner = write(tmp_path / "pkg" / "mod.py")
+        write(tmp_path / "pkg" / "__pycache__" / "x.py")
+
+        to_lint, _ = relevant_changes([str(tmp_path / "pkg")], set(), [str(tmp_path)], FileDiscoverer())
+
+        assert to_lint == [inner]
+
+    def test_gitignored_paths_are_left_out(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        write(tmp_path / ".gitignore", "gen.py\nbuild_out/\n")
+        write(tmp_path / "pkg" / ".gitignore", "local.py\n")
+        paths = [write(tmp_path / "gen.py"), write(tmp_path / "pkg" / "local.py"), write(tmp_path / "pkg" / "mod.py"),
+                 write(tmp_path / "build_out" / "x.py"), str(tmp_path / "build_out")]
+        discoverer = FileDiscoverer()
+
+        to_lint, _ = relevant_changes(paths, set(), [str(tmp_path)], discoverer)
+
+        assert to_lint == [str(tmp_path / "pkg" / "mod.py")]
+        assert to_lint == sorted(FileDiscoverer().discover([str(tmp_path)]))
+
+    def test_removed_directory_deletes_its_files(self, tmp_path):
+        known = str(tmp_path / "pkg" / "mod.py")
+
+        _, deleted = relevant_changes([str(tmp_path / "pkg")], {known}, [str(tmp_path)], FileDiscoverer())
+
+        assert deleted == [known]
+
+
+class TestPollingWatcher:
+    def test_detects_modification_creation_and_deletion(self, tmp_path):
+        a = write(tmp_path / "a.py")
+        b = write(tmp_path / "b.py")
+        watcher = PollingWatcher(lambda: FileDiscoverer().discover([str(tmp_path)]), interval=0.01)
+
+        write(tmp_path / "a.py", "x = 2  # longer\n")
+        c = write(tmp_path / "c.py")
+        os.unlink(b)
+
+        assert watcher.wait(timeout=1) == {a, b, c}
+
+    def test_timeout_without_changes(self, tmp_path):
+        write(tmp_path / "a.py")
+        watcher = PollingWatcher(lambda: FileDiscoverer().discover([str(tmp_path)]), interval=0.01)
+
+        assert watcher.wait(timeout=0.05) == set()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+class TestInotifyWatcher:
+    def test_reports_written_files(self, tmp_path):
+        discoverer = FileDiscoverer()
+        list(discoverer.discover([str(tmp_path)]))
+        watcher = make_watcher(discoverer, [str(tmp_path)])
+        assert isinstance(watcher, InotifyWatcher)
+
+        try:
+            a = write(tmp_path / "a.py")
+
+            assert a in watcher.wait(timeout=2)
+        finally:
+            watcher.close()
+
+    def test_follows_new_directories(self, tmp_path):
+        watcher = InotifyWatcher([str(tmp_path)])
+        try:
+            (tmp_path / "pkg").mkdir()
+            watcher.wait(timeout=2)
+            inner = write(tmp_path / "pkg" / "mod.py")
+
+            assert inner in watcher.wait(timeout=2)
+        finally:
+            watcher.close()
+
+    def test_polling_can_be_forced(self, tmp_path):
+        discoverer = FileDiscoverer()
+        list(discoverer.discover([str(tmp_path)]))
+
+        assert isinstance(make_watcher(discoverer, [str(tmp_path)], poll=True), PollingWatcher)
+
+
+class TestWatchCommand:
+    def test_reports_only_the_diff(self, tmp_path, monkeypatch):
+        from click.testing import CliRunner
+        from pandas_lint import watch
+        from pandas_lint.cli import main
+
+        mod = write(tmp_path / "mod.py", "for i, r in df.iterrows():\n    pass\n")
+        write(tmp_path / "other.py", "df.iterrows()\n")
+
+        class FakeWatcher:
+            def __init__(self):
+                self.calls = 0
+
+            def wait(self, timeout=None):
+                self.calls += 1
+                if self.calls > 1:
+                    raise KeyboardInterrupt
+                write(tmp_path / "mod.py", "x = 1\n\ndf.drop('a', inplace=True)\n")
+                return {mod}
+
+            def close(self):
+                pass
+
+        monkeypatch.setattr(watch, "make_watcher", lambda *args, **kwargs: FakeWatcher())
+        result = CliRunner().invoke(main, [str(tmp_path), "--watch", "--no-cache", "-j", "1"])
+
+        _, after = result.output.split("Watching 2 files")
+        after = " ".join(after.split())
+        assert "STY001" in after
+        assert "1 issue(s) resolved" in after
+        assert "other.py" not in after.split("re-checked")[0]
+        assert result.exit_code == 1
+
+    def test_rejects_fix(self, tmp_path):
+        from click.testing import CliRunner
+        from pandas_lint.cli import main
+
+        result = CliRunner().invoke(main, [str(tmp_path), "--watch", "--fix"])
+
+        assert result.exit_code == 2